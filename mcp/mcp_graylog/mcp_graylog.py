@@ -25,7 +25,35 @@ Technical Capabilities:
 - Comprehensive error handling and retry mechanisms with file logging (~/.mcp_graylog.log)
 - Time snapshot for batch queries to prevent time drift
 
-Version: 1.9.40
+Version: 1.9.44
+
+Changes in 1.9.44:
+- analyze_source_distribution, get_log_level_analysis, analyze_field_distribution: exact
+  terms counts from a Views pivot aggregation instead of downloading and counting a sample
+- analyze_time_patterns: exact counts from a date histogram (per minute, per hour beyond 7 days)
+- Results from aggregations are marked "exact": true; sampling is kept as fallback
+  when aggregations are unavailable
+
+Changes in 1.9.43:
+- Time slices planned from a count histogram of the query (Views pivot, legacy histogram API as fallback)
+- Variable-width slices sized just under the ~3000 message per-request ceiling, no slice for empty periods
+- Bursts over the ceiling re-planned from a finer histogram (down to 1s)
+- Slice fetching stops dispatching once the planned counts cover the requested limit
+- Fixed-size slicing kept as fallback when no histogram is available
+
+Changes in 1.9.42:
+- Time slices of the breakthrough strategies are fetched concurrently (SliceScheduler)
+- Bounded concurrency (--slice-concurrency / GRAYLOG_SLICE_CONCURRENCY, default 4)
+- Adaptive backoff on 429/5xx: concurrency halved, throttled empty slices fetched again
+- No new slice is dispatched once the requested limit is collected
+- Per-slice latency logged to tune the concurrency per cluster
+- Normal and source time slicing now also slice absolute time ranges
+
+Changes in 1.9.41:
+- One HTTP connection pool (httpx.AsyncClient) shared by all tool calls, opened at server start
+- Keep-alive with tuned pool limits, HTTP/2 when the h2 package is installed
+- Authentication and default headers set once on the client instead of per request
+- Requests failing on a pooled connection closed by Graylog are retried on a new one
 
 Changes in 1.9.40:
 - Fixed TransportSecurityMiddleware crash on SSE/streamable-http startup
@@ -113,12 +141,13 @@ Jason Cheng (Jason Tools) - AI Collaboration
 """
 
 import asyncio
+import contextvars
 import json
 import logging
 import os
 import sys
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import csv
 import io
@@ -134,7 +163,7 @@ from mcp.types import Resource, Tool, TextContent, ImageContent, EmbeddedResourc
 import mcp.types as types
 
 # Version information
-__version__ = "1.9.40"
+__version__ = "1.9.44"
 __author__ = "Jason Cheng (Jason Tools) - AI Collaboration"
 __license__ = "MIT"
 
@@ -149,6 +178,32 @@ _file_handler.setLevel(logging.DEBUG)
 _file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
 logger.addHandler(_file_handler)
 
+# Histogram intervals (seconds, Graylog time unit), finest first
+HISTOGRAM_INTERVALS = [
+    (1, "1s"), (5, "5s"), (10, "10s"), (30, "30s"), (60, "1m"), (300, "5m"), (600, "10m"),
+    (1800, "30m"), (3600, "1h"), (10800, "3h"), (43200, "12h"), (86400, "1d"),
+]
+# Intervals of the legacy /search/universal/absolute/histogram API
+LEGACY_HISTOGRAM_INTERVALS = [(60, "minute"), (3600, "hour"), (86400, "day")]
+
+# Connection pool shared by all tool calls: back-to-back calls reuse open
+# connections instead of paying a new TCP+TLS handshake each time.
+# keepalive_expiry stays below the usual 60s idle timeout of Graylog/proxies.
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+CSV_HEADERS = {'Accept': 'text/csv'}
+# 429/5xx responses of the SliceScheduler fetch running in the current task
+# (a one-item counter, so requests made by sub-tasks of the fetch count too)
+_SLICE_THROTTLE_EVENTS: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "slice_throttle_events", default=None)
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
 class GraylogError(Exception):
     """Custom exception for Graylog related errors"""
     pass
@@ -266,8 +321,11 @@ class LogAnalyzer:
             if timestamp:
                 level_timeline[level].append(timestamp)
         
-        # Calculate error rate
-        total = len(messages)
+        return LogAnalyzer._summarize_levels(level_counts, len(messages))
+    
+    @staticmethod
+    def _summarize_levels(level_counts: Counter, total: int) -> Dict:
+        """Level distribution and error/warning rates from level counts"""
         error_count = level_counts.get('error', 0) + level_counts.get('critical', 0) + level_counts.get('fatal', 0)
         warning_count = level_counts.get('warning', 0) + level_counts.get('warn', 0)
         
@@ -280,6 +338,67 @@ class LogAnalyzer:
             "most_common_level": level_counts.most_common(1)[0] if level_counts else ("info", 0)
         }
     
+    @staticmethod
+    def levels_from_counts(terms: Dict) -> Dict:
+        """analyze_levels() result from exact counts (see GraylogClient.aggregate_terms)"""
+        level_counts = Counter()
+        for value, count in terms["values"]:
+            level_counts[value.lower()] += count
+        # Messages without a level count as info, as in analyze_levels()
+        missing = terms["total"] - terms["with_field"]
+        if missing > 0:
+            level_counts['info'] += missing
+        return LogAnalyzer._summarize_levels(level_counts, terms["total"])
+    
+    @staticmethod
+    def sources_from_counts(terms: Dict) -> Dict:
+        """analyze_sources() result from exact counts (see GraylogClient.aggregate_terms)"""
+        total = terms["total"]
+        return {
+            "total_unique_sources": terms["unique"],
+            "top_sources": [
+                {"source": value, "count": count, "pct": round((count / total) * 100, 2) if total else 0}
+                for value, count in terms["values"]
+            ]
+        }
+    
+    @staticmethod
+    def field_distribution_from_counts(terms: Dict, field_name: str) -> Dict:
+        """analyze_field_distribution() result from exact counts (see GraylogClient.aggregate_terms)"""
+        total = terms["total"]
+        return {
+            "field_name": field_name,
+            "total_unique_values": terms["unique"],
+            "coverage_rate": round((terms["with_field"] / total) * 100, 2) if total else 0,
+            "top_values": [
+                {"value": value, "count": count, "pct": round((count / total) * 100, 2) if total else 0}
+                for value, count in terms["values"]
+            ]
+        }
+    
+    @staticmethod
+    def time_patterns_from_histogram(bucket_seconds: int, buckets: Dict[datetime, int]) -> Dict:
+        """analyze_time_patterns() result from exact counts per time bucket (UTC)"""
+        hourly_counts = defaultdict(int)
+        daily_counts = defaultdict(int)
+        minute_counts = defaultdict(int)
+        
+        for start, count in buckets.items():
+            if count <= 0:
+                continue
+            hourly_counts[start.strftime('%H:00')] += count
+            daily_counts[start.strftime('%Y-%m-%d')] += count
+            if bucket_seconds <= 60:
+                minute_counts[start.strftime('%H:%M')] += count
+        
+        return {
+            "hourly_distribution": dict(hourly_counts),
+            "daily_distribution": dict(daily_counts),
+            "minute_distribution": dict(minute_counts),
+            "peak_hours": sorted(hourly_counts.items(), key=lambda x: x[1], reverse=True)[:5],
+            "peak_minutes": sorted(minute_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        }
+    
     @staticmethod
     def extract_error_patterns(messages: List[Dict]) -> Dict:
         """Extract error patterns"""
@@ -414,11 +533,111 @@ class LogAnalyzer:
             "top_values": top_values
         }
 
+class SliceScheduler:
+    """
+    Fetch time slices with bounded concurrency and adaptive backoff.
+
+    Slices are dispatched in order, at most `concurrency` at a time. When
+    Graylog answers 429 or 5xx the concurrency is halved and dispatching
+    pauses (exponential backoff); every clean slice lets it grow back by one.
+    A throttled slice that returned nothing is fetched again. No new slice is
+    dispatched once `limit` messages were collected, or are expected from the
+    slices in flight when the slices carry a planned "count".
+    """
+
+    BACKOFF_INITIAL = 0.5  # Seconds of the first pause after a throttled slice
+    BACKOFF_MAX = 8.0
+    MAX_RETRIES = 2  # Fetches again of a throttled empty slice
+
+    def __init__(self, client: "GraylogClient", concurrency: int, label: str):
+        self.client = client
+        self.max_concurrency = max(1, concurrency)
+        self.concurrency = self.max_concurrency
+        self.label = label
+        self.backoff = 0.0
+        self.resume_at = 0.0
+
+    async def _fetch(self, index: int, fetch, slice_timerange: Dict):
+        # Runs in its own task: the counter only sees the responses of this slice
+        throttle_events = [0]
+        _SLICE_THROTTLE_EVENTS.set(throttle_events)
+        start = time.monotonic()
+        messages = await fetch(slice_timerange)
+        elapsed = time.monotonic() - start
+        return index, messages or [], throttle_events[0], elapsed
+
+    def _throttled(self, events: int):
+        """Halve the concurrency and double the pause once per 429/5xx response"""
+        for _ in range(events):
+            self.concurrency = max(1, self.concurrency // 2)
+            self.backoff = min(self.BACKOFF_MAX, self.backoff * 2 or self.BACKOFF_INITIAL)
+        self.resume_at = time.monotonic() + self.backoff
+
+    async def run(self, slices: List[Dict], fetch, limit: int) -> List[Dict]:
+        """Messages of all fetched slices, in slice order"""
+        results: List[Optional[List[Dict]]] = [None] * len(slices)
+        retries = defaultdict(int)
+        pending = list(range(len(slices)))  # Slice indexes still to dispatch
+        in_flight = set()
+        in_flight_indexes = set()
+        collected = 0
+        latencies = []
+        done = set()
+
+        try:
+            while pending or in_flight:
+                now = time.monotonic()
+                expected = sum(slices[i].get("count", 0) for i in in_flight_indexes)
+                while (pending and collected + expected < limit and len(in_flight) < self.concurrency
+                       and now >= self.resume_at):
+                    index = pending.pop(0)
+                    in_flight.add(asyncio.ensure_future(self._fetch(index, fetch, slices[index])))
+                    in_flight_indexes.add(index)
+                    expected += slices[index].get("count", 0)
+                if not in_flight:
+                    if not pending or collected >= limit:
+                        break
+                    await asyncio.sleep(self.resume_at - now)
+                    continue
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, messages, throttle_events, elapsed = task.result()
+                    in_flight_indexes.discard(index)
+                    latencies.append(elapsed)
+                    logger.info(f"{self.label} slice {index + 1}/{len(slices)}: {len(messages)} messages "
+                                f"in {elapsed * 1000:.0f} ms (concurrency {self.concurrency}"
+                                f"{f', throttled x{throttle_events}' if throttle_events else ''})")
+                    if throttle_events:
+                        self._throttled(throttle_events)
+                        if not messages and retries[index] < self.MAX_RETRIES:
+                            retries[index] += 1
+                            pending.insert(0, index)
+                            continue
+                    else:
+                        self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+                        self.backoff = 0.0
+                    results[index] = messages
+                    collected += len(messages)
+        except BaseException:
+            # A failed slice (or a cancelled tool call) must not leave fetches running
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, *done, return_exceptions=True)
+            raise
+
+        if latencies:
+            logger.info(f"{self.label}: {sum(1 for r in results if r is not None)}/{len(slices)} slices, "
+                        f"{collected} messages, latency avg {statistics.mean(latencies) * 1000:.0f} ms, "
+                        f"max {max(latencies) * 1000:.0f} ms")
+        return [msg for slice_messages in results if slice_messages for msg in slice_messages]
+
 class GraylogClient:
     """Graylog API Client - Complete version + Source analysis fix"""
     
     def __init__(self, host: str, username: str = None, password: str = None, 
-                 api_token: str = None, verify_ssl: bool = False, timeout: float = 30.0):
+                 api_token: str = None, verify_ssl: bool = False, timeout: float = 30.0,
+                 slice_concurrency: int = 4):
         self.host = host.rstrip('/')
         self.username = username
         self.password = password
@@ -426,6 +645,9 @@ class GraylogClient:
         self.verify_ssl = verify_ssl
         self.timeout = timeout
         self.session = None
+        self._owns_session = False
+        self._views_pivot_available = True  # Cleared when /views/search/sync pivots fail
+        self._views_pivot_style = None  # "fields" or "field", see _aggregate
         
         # Key fix: Add source analysis configuration while retaining all original configurations
         self.api_breakthrough_config = {
@@ -446,12 +668,29 @@ class GraylogClient:
             "source_analysis_min_sample": 10000, # Minimum sample size
             "source_time_slices": 10,            # Time slices for source analysis
             "source_slice_seconds": 60,          # Time slice duration for source analysis
+            "slice_concurrency": slice_concurrency,  # Time slices fetched at the same time
+            # Histogram-planned slices (see _plan_histogram_slices)
+            "slice_message_ceiling": 3000,       # Observed per-request message limit
+            "slice_fill_ratio": 0.9,             # Slices are sized to this share of the ceiling
+            "histogram_max_buckets": 500,        # Finest histogram interval giving at most this many buckets
         }
         
-    async def __aenter__(self):
-        self.session = httpx.AsyncClient(
+    def _auth(self):
+        """Authentication for httpx: API token or username/password"""
+        if self.api_token:
+            return (self.api_token, 'token')
+        elif self.username and self.password:
+            return (self.username, self.password)
+        return None
+
+    def _create_session(self) -> httpx.AsyncClient:
+        """HTTP client with keep-alive pool (and HTTP/2 when the h2 package is installed)"""
+        return httpx.AsyncClient(
             verify=self.verify_ssl, 
             timeout=httpx.Timeout(self.api_breakthrough_config["export_timeout"]),
+            auth=self._auth(),
+            limits=HTTP_POOL_LIMITS,
+            http2=_http2_available(),
             headers={
                 'User-Agent': f'Graylog-MCP-Server/{__version__}',
                 'Accept': 'application/json',
@@ -459,10 +698,17 @@ class GraylogClient:
                 'X-Requested-By': 'Graylog MCP Server'
             }
         )
+
+    async def __aenter__(self):
+        # Reuse the process-wide connection pool when the server opened one
+        self.session = get_shared_session()
+        self._owns_session = self.session is None
+        if self._owns_session:
+            self.session = self._create_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.aclose()
 
     async def _make_request_with_retry(self, method: str, path: str, params: Optional[Dict] = None, 
@@ -476,6 +722,10 @@ class GraylogClient:
                 return await self._make_request(method, path, params, data, expect_csv)
             except Exception as e:
                 last_exception = e
+                if isinstance(e.__cause__, (httpx.RemoteProtocolError, httpx.ReadError)) and attempt < max_retries - 1:
+                    # A pooled keep-alive connection closed by the server: retry on a new one
+                    logger.debug(f"Stale connection on attempt {attempt + 1}, retrying: {e.__cause__}")
+                    continue
                 if "timeout" in str(e).lower() or "timed out" in str(e).lower():
                     if attempt < max_retries - 1:
                         wait_time = (attempt + 1) * 3
@@ -491,39 +741,20 @@ class GraylogClient:
         """Make HTTP request with proper headers"""
         url = f"{self.host}/api{path}"
         
-        # Prepare authentication
-        auth = None
-        if self.api_token:
-            auth = (self.api_token, 'token')
-        elif self.username and self.password:
-            auth = (self.username, self.password)
-        
-        # Set headers based on expected response type
-        headers = {
-            'X-Requested-By': 'Graylog MCP Server',
-            'User-Agent': f'Graylog-MCP-Server/{__version__}'
-        }
-        
-        if method.upper() == 'POST' and data:
-            headers['Content-Type'] = 'application/json'
-            if expect_csv:
-                headers['Accept'] = 'text/csv'
-            else:
-                headers['Accept'] = 'application/json'
-        else:
-            headers['Accept'] = 'application/json'
+        # Authentication and default headers are set on the session; only CSV exports differ
+        headers = CSV_HEADERS if method.upper() == 'POST' and data and expect_csv else None
         
         try:
             logger.debug(f"Making {method} request to {url}")
             
             if method.upper() == 'GET':
-                response = await self.session.get(url, params=params, headers=headers, auth=auth)
+                response = await self.session.get(url, params=params, headers=headers)
             elif method.upper() == 'POST':
-                response = await self.session.post(url, json=data, params=params, headers=headers, auth=auth)
+                response = await self.session.post(url, json=data, params=params, headers=headers)
             elif method.upper() == 'PUT':
-                response = await self.session.put(url, json=data, params=params, headers=headers, auth=auth)
+                response = await self.session.put(url, json=data, params=params, headers=headers)
             elif method.upper() == 'DELETE':
-                response = await self.session.delete(url, params=params, headers=headers, auth=auth)
+                response = await self.session.delete(url, params=params, headers=headers)
             else:
                 raise GraylogError(f"Unsupported HTTP method: {method}")
             
@@ -533,6 +764,9 @@ class GraylogClient:
             if response.status_code >= 400:
                 error_text = response.text
                 logger.error(f"HTTP Error: {response.status_code} - {error_text}")
+                throttle_events = _SLICE_THROTTLE_EVENTS.get()
+                if throttle_events is not None and (response.status_code == 429 or response.status_code >= 500):
+                    throttle_events[0] += 1
                 
                 # Check for specific OpenSearch errors
                 if "too_many_nested_clauses" in error_text:
@@ -564,7 +798,7 @@ class GraylogClient:
         except httpx.TimeoutException:
             raise GraylogError("Request timed out - try reducing the time range or limit")
         except httpx.RequestError as e:
-            raise GraylogError(f"Network error: {e}")
+            raise GraylogError(f"Network error: {e}") from e
         except GraylogError:
             raise
         except Exception as e:
@@ -957,9 +1191,13 @@ class GraylogClient:
         try:
             # Strategy 1: Use denser time slicing
             logger.info("Source Analysis: Dense Time Slicing")
-            time_slice_messages = await self._enhanced_time_slicing_for_sources(
-                query_string, timerange, fields, streams, target_sample
+            time_slice_messages = await self._try_histogram_time_slicing(
+                query_string, timerange, fields or ["timestamp", "source", "level"], streams, target_sample
             )
+            if time_slice_messages is None:
+                time_slice_messages = await self._enhanced_time_slicing_for_sources(
+                    query_string, timerange, fields, streams, target_sample
+                )
             
             if time_slice_messages:
                 all_messages.extend(time_slice_messages)
@@ -1013,37 +1251,11 @@ class GraylogClient:
         
         logger.info(f"Enhanced time slicing: {actual_slices} slices of {slice_seconds}s each, {slice_limit} per slice")
         
-        messages = []
-        
-        if timerange["type"] == "relative":
-            total_seconds = timerange["range"]
-            
-            for i in range(actual_slices):
-                start_offset = i * slice_seconds
-                end_offset = min((i + 1) * slice_seconds, total_seconds)
-                
-                if start_offset >= total_seconds:
-                    break
-                
-                slice_timerange = {
-                    "type": "absolute",
-                    "from": (datetime.utcnow() - timedelta(seconds=end_offset)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                    "to": (datetime.utcnow() - timedelta(seconds=start_offset)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                    "range_seconds": end_offset - start_offset
-                }
-                
-                slice_messages = await self._single_high_limit_search(
-                    query_string, slice_timerange, fields or ["timestamp", "source", "level"], streams, slice_limit
-                )
-                
-                if slice_messages:
-                    messages.extend(slice_messages)
-                    logger.debug(f"Enhanced slice {i+1}: {len(slice_messages)} messages, total: {len(messages)}")
-                
-                if len(messages) >= target_limit:
-                    break
-                
-                await asyncio.sleep(0.02)  # Reduce delay
+        slices = self._build_time_slices(timerange, slice_seconds, actual_slices)
+        messages = await self._fetch_time_slices(
+            "Enhanced", query_string, slices, fields or ["timestamp", "source", "level"], streams,
+            slice_limit, target_limit
+        )
         
         logger.info(f"Enhanced time slicing completed: {len(messages)} messages")
         return messages
@@ -1107,16 +1319,21 @@ class GraylogClient:
             logger.info("Attempting Strategy 2: Time Slicing")
             remaining_target = actual_target - len(all_messages)
             if remaining_target > 0:
-                # If we're far from target, use more aggressive slicing
-                if len(all_messages) < actual_target * 0.5:
-                    logger.info("Using aggressive time slicing due to low retrieval rate")
-                    time_slice_messages = await self._try_aggressive_time_slicing(
-                        query_string, timerange, fields, streams, remaining_target
-                    )
-                else:
-                    time_slice_messages = await self._try_time_slicing_breakthrough(
-                        query_string, timerange, fields, streams, remaining_target
-                    )
+                # Slices sized from a count histogram; fixed slices when none is available
+                time_slice_messages = await self._try_histogram_time_slicing(
+                    query_string, timerange, fields, streams, remaining_target
+                )
+                if time_slice_messages is None:
+                    # If we're far from target, use more aggressive slicing
+                    if len(all_messages) < actual_target * 0.5:
+                        logger.info("Using aggressive time slicing due to low retrieval rate")
+                        time_slice_messages = await self._try_aggressive_time_slicing(
+                            query_string, timerange, fields, streams, remaining_target
+                        )
+                    else:
+                        time_slice_messages = await self._try_time_slicing_breakthrough(
+                            query_string, timerange, fields, streams, remaining_target
+                        )
                 
                 if time_slice_messages:
                     all_messages.extend(time_slice_messages)
@@ -1263,90 +1480,13 @@ class GraylogClient:
         # Based on observed ~3000 message API limit
         slice_seconds = 20  # 20 second slices for better coverage
         overlap_seconds = 1  # 1 second overlap to catch boundary messages
-        # Don't reduce the step size too much - it creates too many requests
-        step_seconds = slice_seconds  # Keep original step size
-        max_slices = math.ceil(range_seconds / step_seconds) + 1  # +1 for safety
+        max_slices = math.ceil(range_seconds / slice_seconds) + 1  # +1 for safety
         
         logger.info(f"Aggressive time slicing: {max_slices} slices of {slice_seconds}s each")
         
-        messages = []
-        
-        if timerange["type"] == "relative":
-            total_seconds = timerange["range"]
-            
-            for i in range(max_slices):
-                # Each slice starts where the previous one started + step_seconds
-                slice_start_offset = i * step_seconds
-                slice_end_offset = min(slice_start_offset + slice_seconds + overlap_seconds, total_seconds)
-                
-                if slice_start_offset >= total_seconds:
-                    break
-                    
-                start_offset = slice_start_offset
-                end_offset = slice_end_offset
-                
-                if start_offset >= total_seconds:
-                    break
-                
-                slice_timerange = {
-                    "type": "absolute",
-                    "from": (datetime.utcnow() - timedelta(seconds=end_offset)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                    "to": (datetime.utcnow() - timedelta(seconds=start_offset)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                    "range_seconds": end_offset - start_offset
-                }
-                
-                # Request up to 1000 messages per slice to stay under API limits
-                slice_messages = await self._single_high_limit_search(
-                    query_string, slice_timerange, fields, streams, 1000
-                )
-                
-                if slice_messages:
-                    messages.extend(slice_messages)
-                    logger.info(f"Aggressive slice {i+1}/{max_slices}: {len(slice_messages)} messages, total: {len(messages)}")
-                
-                if len(messages) >= limit:
-                    break
-                
-                await asyncio.sleep(0.05)  # Minimal delay
-        else:
-            # Handle absolute time ranges
-            from_dt = datetime.fromisoformat(timerange["from"].replace('Z', '+00:00')).replace(tzinfo=None)
-            to_dt = datetime.fromisoformat(timerange["to"].replace('Z', '+00:00')).replace(tzinfo=None)
-            total_seconds = (to_dt - from_dt).total_seconds()
-            
-            for i in range(max_slices):
-                # Each slice starts where the previous one started + step_seconds
-                slice_start_time = from_dt + timedelta(seconds=i * step_seconds)
-                slice_end_time = min(from_dt + timedelta(seconds=i * step_seconds + slice_seconds + overlap_seconds), to_dt)
-                
-                if slice_start_time >= to_dt:
-                    break
-                    
-                slice_start = slice_start_time
-                slice_end = slice_end_time
-                
-                if slice_start >= to_dt:
-                    break
-                
-                slice_timerange = {
-                    "type": "absolute",
-                    "from": slice_start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                    "to": slice_end.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                    "range_seconds": (slice_end - slice_start).total_seconds()
-                }
-                
-                slice_messages = await self._single_high_limit_search(
-                    query_string, slice_timerange, fields, streams, 1000
-                )
-                
-                if slice_messages:
-                    messages.extend(slice_messages)
-                    logger.info(f"Aggressive slice {i+1}/{max_slices}: {len(slice_messages)} messages, total: {len(messages)}")
-                
-                if len(messages) >= limit:
-                    break
-                
-                await asyncio.sleep(0.05)
+        # Request up to 1000 messages per slice to stay under API limits
+        slices = self._build_time_slices(timerange, slice_seconds, max_slices, overlap_seconds)
+        messages = await self._fetch_time_slices("Aggressive", query_string, slices, fields, streams, 1000, limit)
         
         logger.info(f"Aggressive time slicing completed: {len(messages)} messages")
         return messages
@@ -1366,39 +1506,349 @@ class GraylogClient:
         
         logger.info(f"Time slicing: {actual_slices} slices, {slice_limit} per slice")
         
-        messages = []
+        slices = self._build_time_slices(timerange, slice_seconds, actual_slices)
+        messages = await self._fetch_time_slices("Time", query_string, slices, fields, streams, slice_limit, limit)
         
+        logger.info(f"Time slicing completed: {len(messages)} messages")
+        return messages
+
+    def _build_time_slices(self, timerange: Dict, slice_seconds: int, max_slices: int,
+                           overlap_seconds: int = 0) -> List[Dict]:
+        """
+        Absolute time ranges of up to max_slices consecutive slices: newest first
+        for a relative range, oldest first for an absolute one. Each slice is
+        extended by overlap_seconds to catch boundary messages.
+        """
+        slices = []
         if timerange["type"] == "relative":
             total_seconds = timerange["range"]
-            
-            for i in range(actual_slices):
+            now = datetime.utcnow()  # One reference time for every slice
+            for i in range(max_slices):
                 start_offset = i * slice_seconds
-                end_offset = min((i + 1) * slice_seconds, total_seconds)
-                
                 if start_offset >= total_seconds:
                     break
-                
-                slice_timerange = {
+                end_offset = min(start_offset + slice_seconds + overlap_seconds, total_seconds)
+                slices.append({
                     "type": "absolute",
-                    "from": (datetime.utcnow() - timedelta(seconds=end_offset)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                    "to": (datetime.utcnow() - timedelta(seconds=start_offset)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                    "from": (now - timedelta(seconds=end_offset)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                    "to": (now - timedelta(seconds=start_offset)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
                     "range_seconds": end_offset - start_offset
-                }
-                
-                slice_messages = await self._single_high_limit_search(
-                    query_string, slice_timerange, fields, streams, slice_limit
-                )
-                
-                if slice_messages:
-                    messages.extend(slice_messages)
-                    logger.info(f"Time slice {i+1}: {len(slice_messages)} messages, total: {len(messages)}")
-                
-                if len(messages) >= limit:
+                })
+        else:
+            from_dt = datetime.fromisoformat(timerange["from"].replace('Z', '+00:00')).replace(tzinfo=None)
+            to_dt = datetime.fromisoformat(timerange["to"].replace('Z', '+00:00')).replace(tzinfo=None)
+            for i in range(max_slices):
+                slice_start = from_dt + timedelta(seconds=i * slice_seconds)
+                if slice_start >= to_dt:
                     break
-                
-                await asyncio.sleep(0.1)
+                slice_end = min(slice_start + timedelta(seconds=slice_seconds + overlap_seconds), to_dt)
+                slices.append({
+                    "type": "absolute",
+                    "from": slice_start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                    "to": slice_end.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                    "range_seconds": (slice_end - slice_start).total_seconds()
+                })
+        return slices
+
+    async def _fetch_time_slices(self, label: str, query_string: str, slices: List[Dict],
+                                 fields: List[str], streams: List[str],
+                                 slice_limit: int, limit: int) -> List[Dict]:
+        """Search every slice (up to slice_limit messages each) concurrently, see SliceScheduler"""
         
-        logger.info(f"Time slicing completed: {len(messages)} messages")
+        async def fetch(slice_timerange: Dict) -> List[Dict]:
+            return await self._single_high_limit_search(
+                query_string, slice_timerange, fields, streams, slice_limit
+            )
+        
+        scheduler = SliceScheduler(self, self.api_breakthrough_config["slice_concurrency"], f"{label} slicing")
+        return await scheduler.run(slices, fetch, limit)
+
+    async def _run_views_pivots(self, query_string: str, timerange: Dict, streams: List[str],
+                                pivots: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        Run pivots ({id: {"row_groups": [...], "series": [...]}}) in one request to
+        the Views synchronous search API and return {id: pivot result}
+        """
+        query = {
+            "id": "q",
+            "query": {"type": "elasticsearch", "query_string": query_string},
+            "timerange": self._build_api_timerange(timerange),
+            "search_types": [{
+                "id": pivot_id,
+                "type": "pivot",
+                "row_groups": spec["row_groups"],
+                "column_groups": [],
+                "series": spec["series"],
+                "rollup": False,
+                "sort": []
+            } for pivot_id, spec in pivots.items()]
+        }
+        if streams:
+            query["filter"] = {"type": "or", "filters": [{"type": "stream", "id": sid} for sid in streams]}
+        
+        response = await self._make_request_with_retry("POST", "/views/search/sync", data={"queries": [query]})
+        
+        result = (response.get("results") or {}).get("q") if isinstance(response, dict) else None
+        search_types = (result or {}).get("search_types") or {}
+        if any(pivot_id not in search_types for pivot_id in pivots):
+            errors = (result or {}).get("errors") or (response.get("errors") if isinstance(response, dict) else None)
+            raise GraylogError(f"Views pivot returned no result: {errors}")
+        return {pivot_id: search_types[pivot_id] for pivot_id in pivots}
+
+    async def _aggregate(self, query_string: str, timerange: Dict, streams: List[str],
+                         build_pivots) -> Optional[Dict[str, Dict]]:
+        """
+        Run the pivots built by build_pivots(style) for the field syntax of this
+        Graylog version ("fields" list since 5.0, "field" before). Returns None
+        when pivots are unavailable; the client then does not try them again.
+        """
+        if not self._views_pivot_available:
+            return None
+        styles = [self._views_pivot_style] if self._views_pivot_style else ["fields", "field"]
+        for style in styles:
+            try:
+                results = await self._run_views_pivots(query_string, timerange, streams, build_pivots(style))
+                self._views_pivot_style = style
+                return results
+            except Exception as e:
+                logger.debug(f"Views pivot ({style}) failed: {e}")
+        logger.info("Views aggregations unavailable, falling back to sampling")
+        self._views_pivot_available = False
+        return None
+
+    @staticmethod
+    def _pivot_group(group_type: str, field: str, style: str, **options) -> Dict:
+        """Pivot row group on one field in the given style (see _aggregate)"""
+        group = {"type": group_type}
+        if style == "fields":
+            group["fields"] = [field]
+        else:
+            group["field"] = field
+        group.update(options)
+        return group
+
+    @staticmethod
+    def _pivot_rows(result: Dict) -> List[Dict]:
+        """Leaf rows of a pivot result"""
+        return [row for row in result.get("rows", []) if row.get("source") == "leaf"]
+
+    @staticmethod
+    def _pivot_value(row: Dict, series_id: str) -> int:
+        """Value of one series in a pivot row"""
+        for value in row.get("values", []):
+            if value.get("key") and value["key"][-1] == series_id:
+                return int(value.get("value") or 0)
+        return 0
+
+    async def aggregate_terms(self, query_string: str, from_time: str, to_time: str, field: str,
+                              streams: List[str] = None, size: int = 50) -> Optional[Dict]:
+        """
+        Exact counts of the top values of a field, computed by Graylog/OpenSearch:
+        {"total", "with_field", "unique", "values": [(value, count), ...]}.
+        Returns None when aggregations are unavailable (sample messages instead).
+        """
+        timerange = self._build_timerange(from_time, to_time)
+        
+        def build_pivots(style: str) -> Dict[str, Dict]:
+            return {
+                "terms": {
+                    "row_groups": [self._pivot_group("values", field, style, limit=size)],
+                    "series": [{"id": "count()", "type": "count"}]
+                },
+                "totals": {
+                    "row_groups": [],
+                    "series": [
+                        {"id": "count()", "type": "count"},
+                        {"id": f"count({field})", "type": "count", "field": field},
+                        {"id": f"card({field})", "type": "card", "field": field}
+                    ]
+                }
+            }
+        
+        results = await self._aggregate(query_string, timerange, streams, build_pivots)
+        if results is None:
+            return None
+        
+        totals = next((row for row in results["totals"].get("rows", []) if not row.get("key")), {})
+        values = [(str(row["key"][0]), self._pivot_value(row, "count()"))
+                  for row in self._pivot_rows(results["terms"]) if row.get("key")]
+        values.sort(key=lambda item: item[1], reverse=True)
+        total = self._pivot_value(totals, "count()") or int(results["totals"].get("total") or 0)
+        
+        logger.info(f"Terms aggregation on '{field}': {len(values)} values, {total} messages")
+        return {
+            "total": total,
+            "with_field": self._pivot_value(totals, f"count({field})"),
+            "unique": self._pivot_value(totals, f"card({field})"),
+            "values": values[:size]
+        }
+
+    async def aggregate_time_histogram(self, query_string: str, from_time: str, to_time: str,
+                                       streams: List[str] = None) -> Optional[Tuple[int, Dict[datetime, int]]]:
+        """
+        Exact message counts per minute (per hour beyond 7 days), see _get_count_histogram.
+        Returns None when no histogram API is available.
+        """
+        reference_time = datetime.utcnow()
+        timerange = self._build_timerange(self._convert_to_absolute_time(from_time, reference_time),
+                                          self._convert_to_absolute_time(to_time, reference_time))
+        interval_seconds = 60 if timerange.get("range_seconds", 0) <= 7 * 86400 else 3600
+        return await self._get_count_histogram(query_string, timerange, streams, interval_seconds)
+
+    async def _get_count_histogram(self, query_string: str, timerange: Dict, streams: List[str],
+                                   interval_seconds: int) -> Optional[Tuple[int, Dict[datetime, int]]]:
+        """
+        Message counts of the query per time bucket: (bucket seconds, {bucket start: count}),
+        or None when neither the Views API nor the legacy histogram API answered.
+        Empty buckets may be missing.
+        """
+        timeunit = next((unit for secs, unit in HISTOGRAM_INTERVALS if secs == interval_seconds), "1m")
+        
+        def build_pivots(style: str) -> Dict[str, Dict]:
+            return {"histogram": {
+                "row_groups": [self._pivot_group("time", "timestamp", style,
+                                                 interval={"type": "timeunit", "timeunit": timeunit})],
+                "series": [{"id": "count()", "type": "count"}]
+            }}
+        
+        results = await self._aggregate(query_string, timerange, streams, build_pivots)
+        if results is not None:
+            buckets = {}
+            for row in self._pivot_rows(results["histogram"]):
+                start = datetime.fromisoformat(row["key"][0].replace('Z', '+00:00')).replace(tzinfo=None)
+                buckets[start] = self._pivot_value(row, "count()")
+            return interval_seconds, buckets
+        
+        # Legacy API: minute resolution at best
+        legacy_seconds, legacy_interval = next(
+            ((secs, name) for secs, name in LEGACY_HISTOGRAM_INTERVALS if secs >= interval_seconds),
+            LEGACY_HISTOGRAM_INTERVALS[-1])
+        params = {
+            'query': query_string,
+            'interval': legacy_interval,
+            'from': timerange["from"],
+            'to': timerange["to"]
+        }
+        if streams:
+            params['filter'] = " OR ".join(f"streams:{stream_id}" for stream_id in streams)
+        try:
+            response = await self._make_request_with_retry("GET", "/search/universal/absolute/histogram", params=params)
+            buckets = {datetime.utcfromtimestamp(int(epoch)): int(count)
+                       for epoch, count in (response.get("results") or {}).items()}
+            return legacy_seconds, buckets
+        except Exception as e:
+            logger.warning(f"Histogram unavailable: {e}")
+            return None
+
+    async def _plan_histogram_slices(self, query_string: str, timerange: Dict, streams: List[str],
+                                     limit: int, parent_bucket_seconds: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        Variable-width slices of an absolute time range, newest first, each
+        holding just under the per-request message ceiling according to a count
+        histogram. Empty periods get no slice; a bucket over the target is
+        planned again from a finer histogram, and split evenly when no finer
+        one is available. Planning stops once the slices hold `limit` messages,
+        so older periods are not planned (nor their buckets re-planned).
+        Returns None when no histogram (finer than parent_bucket_seconds) is available.
+        """
+        config = self.api_breakthrough_config
+        target = int(config["slice_message_ceiling"] * config["slice_fill_ratio"])
+        range_from = datetime.fromisoformat(timerange["from"].replace('Z', '+00:00')).replace(tzinfo=None)
+        range_to = datetime.fromisoformat(timerange["to"].replace('Z', '+00:00')).replace(tzinfo=None)
+        range_seconds = max(1.0, (range_to - range_from).total_seconds())
+        interval_seconds = next(
+            (secs for secs, _ in HISTOGRAM_INTERVALS if range_seconds / secs <= config["histogram_max_buckets"]),
+            HISTOGRAM_INTERVALS[-1][0])
+        
+        histogram = await self._get_count_histogram(query_string, timerange, streams, interval_seconds)
+        if histogram is None:
+            return None
+        bucket_seconds, buckets = histogram
+        if parent_bucket_seconds is not None and bucket_seconds >= parent_bucket_seconds:
+            return None  # No finer resolution (legacy API)
+        
+        def make_slice(start: datetime, end: datetime, count: int) -> Dict:
+            start, end = max(start, range_from), min(end, range_to)
+            return {
+                "type": "absolute",
+                "from": start.strftime("%Y-%m-%dT%H:%M:%S.") + f"{start.microsecond // 1000:03d}Z",
+                "to": end.strftime("%Y-%m-%dT%H:%M:%S.") + f"{end.microsecond // 1000:03d}Z",
+                "range_seconds": (end - start).total_seconds(),
+                "count": count
+            }
+        
+        # Walk the buckets from the newest: a slice ends where the previous (newer) one starts
+        slices = []
+        planned = 0
+        slice_end, slice_start, slice_count = range_to, None, 0
+        for start in sorted(buckets, reverse=True):
+            count = buckets[start]
+            if count <= 0:
+                continue
+            if slice_count and slice_count + count > target:
+                slices.append(make_slice(slice_start, slice_end, slice_count))
+                planned += slice_count
+                slice_end, slice_start, slice_count = slice_start, None, 0
+            if planned >= limit:
+                break
+            if count > target:
+                # One bucket over the target: plan it again at a finer interval
+                oversized = make_slice(start, slice_end, count)
+                finer = None
+                finest = HISTOGRAM_INTERVALS[0][0] if self._views_pivot_available else LEGACY_HISTOGRAM_INTERVALS[0][0]
+                if bucket_seconds > finest:
+                    finer = await self._plan_histogram_slices(query_string, oversized, streams,
+                                                              limit - planned, bucket_seconds)
+                if finer and len(finer) > 1:
+                    slices.extend(finer)
+                    planned += sum(finer_slice["count"] for finer_slice in finer)
+                else:
+                    parts = math.ceil(count / target)
+                    step = (min(slice_end, range_to) - max(start, range_from)) / parts
+                    logger.debug(f"Histogram bucket {oversized['from']} ({count} messages) split evenly into {parts}")
+                    for k in range(parts):
+                        part_end = min(slice_end, range_to) - step * k
+                        slices.append(make_slice(part_end - step, part_end, math.ceil(count / parts)))
+                    planned += count
+                slice_end = start
+                continue
+            slice_start = start
+            slice_count += count
+        if slice_count:
+            slices.append(make_slice(slice_start, slice_end, slice_count))
+            planned += slice_count
+        
+        if parent_bucket_seconds is None:
+            logger.info(f"Histogram plan: {planned} of {sum(buckets.values())} messages in {len(slices)} slices "
+                        f"(bucket {bucket_seconds}s, target {target} per slice, limit {limit})")
+        return slices
+
+    async def _try_histogram_time_slicing(self, query_string: str, timerange: Dict,
+                                          fields: List[str], streams: List[str],
+                                          limit: int) -> Optional[List[Dict]]:
+        """
+        Time slicing planned from a count histogram: as few requests as the
+        per-request ceiling allows, none for empty periods. Returns None when
+        no histogram is available (the caller falls back to fixed slices).
+        """
+        if timerange["type"] == "relative":
+            now = datetime.utcnow()
+            timerange = {
+                "type": "absolute",
+                "from": (now - timedelta(seconds=timerange["range"])).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "to": now.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "range_seconds": timerange["range"]
+            }
+        
+        slices = await self._plan_histogram_slices(query_string, timerange, streams, limit)
+        if slices is None:
+            return None
+        
+        messages = await self._fetch_time_slices(
+            "Histogram", query_string, slices, fields, streams,
+            self.api_breakthrough_config["slice_message_ceiling"], limit
+        )
+        logger.info(f"Histogram time slicing completed: {len(messages)} messages")
         return messages
 
     async def _try_pagination_breakthrough(self, query_string: str, timerange: Dict, 
@@ -1975,6 +2425,30 @@ class GraylogClient:
 
 # Global client instance and config
 graylog_config = None
+shared_session = None  # Process-wide httpx.AsyncClient, see open_shared_session()
+
+def get_shared_session() -> Optional[httpx.AsyncClient]:
+    """The shared HTTP client (reopened if it was closed), or None when the server did not open one"""
+    global shared_session
+    if shared_session is not None and shared_session.is_closed:
+        logger.warning("Shared HTTP connection pool was closed, reopening it")
+        shared_session = get_graylog_client()._create_session()
+    return shared_session
+
+async def open_shared_session():
+    """Create the process-wide HTTP client (called once when the server starts)"""
+    global shared_session
+    if shared_session is None:
+        shared_session = get_graylog_client()._create_session()
+        logger.info(f"Shared HTTP connection pool opened (HTTP/2: {_http2_available()})")
+    return shared_session
+
+async def close_shared_session():
+    """Close the process-wide HTTP client and its pooled connections"""
+    global shared_session
+    if shared_session is not None:
+        await shared_session.aclose()
+        shared_session = None
 
 def get_graylog_client():
     """Get Graylog client from global config"""
@@ -1989,7 +2463,8 @@ def get_graylog_client():
         password=graylog_config.get('password'),
         api_token=graylog_config.get('api_token'),
         verify_ssl=graylog_config['verify_ssl'],
-        timeout=graylog_config['timeout']
+        timeout=graylog_config['timeout'],
+        slice_concurrency=graylog_config.get('slice_concurrency', 4)
     )
 
 # Create MCP server
@@ -2421,6 +2896,18 @@ async def execute_tool(name: str, arguments: dict) -> Union[dict, str]:
                 # Apply stream filter to query as workaround for API stream parameter issues
                 filtered_query = LogAnalyzer._add_stream_filter_to_query(query, streams)
                 
+                # Exact counts from a date histogram; sampling only when no histogram API is available
+                histogram = await client.aggregate_time_histogram(filtered_query, range_from, range_to)
+                if histogram is not None:
+                    bucket_seconds, buckets = histogram
+                    return {
+                        "time_patterns": LogAnalyzer.time_patterns_from_histogram(bucket_seconds, buckets),
+                        "total_count": sum(buckets.values()),
+                        "exact": True,
+                        "query": query,
+                        "time_range": {"from": range_from, "to": range_to}
+                    }
+                
                 # Use safe method to get messages
                 messages, accurate_total_count = await client._safe_get_messages(
                     query_string=filtered_query,
@@ -2468,6 +2955,17 @@ async def execute_tool(name: str, arguments: dict) -> Union[dict, str]:
                 # Apply stream filter to query as workaround for API stream parameter issues
                 filtered_query = LogAnalyzer._add_stream_filter_to_query(query, streams)
                 
+                # Exact counts from a terms aggregation; sampling only when aggregations are unavailable
+                terms = await client.aggregate_terms(filtered_query, range_from, range_to, "source", size=top_n)
+                if terms is not None:
+                    return {
+                        "source_distribution": LogAnalyzer.sources_from_counts(terms),
+                        "total_count": terms["total"],
+                        "exact": True,
+                        "query": query,
+                        "time_range": {"from": range_from, "to": range_to}
+                    }
+                
                 # Fix: First get accurate total count
                 accurate_total_count = await client.get_accurate_total_count(filtered_query, range_from, range_to, None)
                 logger.info(f"Accurate total count: {accurate_total_count}")
@@ -2594,6 +3092,17 @@ async def execute_tool(name: str, arguments: dict) -> Union[dict, str]:
                 # Apply stream filter to query as workaround for API stream parameter issues
                 filtered_query = LogAnalyzer._add_stream_filter_to_query(query, streams)
                 
+                # Exact counts from a terms aggregation; sampling only when aggregations are unavailable
+                terms = await client.aggregate_terms(filtered_query, range_from, range_to, "level", size=20)
+                if terms is not None:
+                    return {
+                        "level_analysis": LogAnalyzer.levels_from_counts(terms),
+                        "total_count": terms["total"],
+                        "exact": True,
+                        "query": query,
+                        "time_range": {"from": range_from, "to": range_to}
+                    }
+                
                 # Use safe method to get messages
                 messages, accurate_total_count = await client._safe_get_messages(
                     query_string=filtered_query,
@@ -2654,6 +3163,22 @@ async def execute_tool(name: str, arguments: dict) -> Union[dict, str]:
                 elif "_" in field_name:
                     fields.append(field_name.replace("_", "-"))
                 
+                # Exact counts from a terms aggregation; sampling only when aggregations are unavailable
+                terms = await client.aggregate_terms(query, range_from, range_to, field_name, streams, size=top_n)
+                if terms is not None and not terms["with_field"] and len(fields) > 3:
+                    alternate = await client.aggregate_terms(query, range_from, range_to, fields[3], streams, size=top_n)
+                    if alternate is not None and alternate["with_field"]:
+                        terms = alternate
+                if terms is not None:
+                    return {
+                        "field_analysis": LogAnalyzer.field_distribution_from_counts(terms, field_name),
+                        "total_count": terms["total"],
+                        "exact": True,
+                        "field_name": field_name,
+                        "query": query,
+                        "time_range": {"from": range_from, "to": range_to}
+                    }
+                
                 # Retrieve messages using safe method with smart pagination
                 messages, accurate_total_count = await client._safe_get_messages(
                     query_string=query,
@@ -3444,6 +3969,7 @@ def parse_args():
         'api_token': os.getenv("GRAYLOG_API_TOKEN", ""),
         'verify_ssl': os.getenv("GRAYLOG_VERIFY_SSL", "false").lower() in ("true", "1", "yes"),
         'timeout': float(os.getenv("GRAYLOG_TIMEOUT", "30")),
+        'slice_concurrency': int(os.getenv("GRAYLOG_SLICE_CONCURRENCY", "4")),
         'transport': os.getenv("MCP_TRANSPORT", "stdio"),
         'http_host': os.getenv("MCP_HTTP_HOST", "0.0.0.0"),
         'http_port': int(os.getenv("MCP_HTTP_PORT", "8000")),
@@ -3473,6 +3999,9 @@ def parse_args():
             i += 1
         elif arg == '--verify-ssl':
             config['verify_ssl'] = True
+        elif arg == '--slice-concurrency' and i + 1 < len(args):
+            config['slice_concurrency'] = int(args[i + 1])
+            i += 1
         elif arg == '--test':
             config['test'] = True
         elif arg == '--debug':
@@ -3512,6 +4041,18 @@ async def main():
         if config['help']:
             print(f"Graylog MCP Server v{__version__}")
             print()
+            print("New in v1.9.44:")
+            print("  [OK] Exact server-side aggregations for source/level/field/time analysis")
+            print()
+            print("New in v1.9.43:")
+            print("  [OK] Time slices planned from a count histogram (fewest requests, no truncated slices)")
+            print()
+            print("New in v1.9.42:")
+            print("  [OK] Concurrent time-slice fetching with adaptive backoff (--slice-concurrency)")
+            print()
+            print("New in v1.9.41:")
+            print("  [OK] Shared HTTP connection pool: no reconnect per tool call (HTTP/2 with h2)")
+            print()
             print("New in v1.9.40:")
             print("  [OK] SSE transport with API key auth (--transport sse --api-key)")
             print("  [OK] No DNS rebinding issue (manual Starlette, no 421 error)")
@@ -3534,6 +4075,7 @@ async def main():
             print("  GRAYLOG_API_TOKEN - API token (alternative to user/pass)")
             print("  GRAYLOG_VERIFY_SSL - Verify SSL certificates (default: false)")
             print("  GRAYLOG_TIMEOUT - Request timeout in seconds (default: 30)")
+            print("  GRAYLOG_SLICE_CONCURRENCY - Time slices fetched at the same time (default: 4)")
             print("  MCP_TRANSPORT - Transport mode: stdio, streamable-http, or sse (default: stdio)")
             print("  MCP_HTTP_HOST - HTTP listen host (default: 0.0.0.0)")
             print("  MCP_HTTP_PORT - HTTP listen port (default: 8000)")
@@ -3611,6 +4153,9 @@ async def main():
         
         # Store config globally
         graylog_config = config
+
+        # One HTTP connection pool for the whole process, reused by every tool call
+        await open_shared_session()
         
         # Test connection if requested
         if config['test']:
@@ -3831,6 +4376,8 @@ async def main():
         import traceback
         print(f"Traceback: {traceback.format_exc()}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        await close_shared_session()
 
 if __name__ == "__main__":
     asyncio.run(main())
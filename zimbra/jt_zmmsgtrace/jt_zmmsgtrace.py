@@ -20,26 +20,49 @@ Python rewrite (jt_zmmsgtrace):
 """
 
 import re
+import os
 import sys
-import gzip
+import glob
+import base64
+import binascii
 import bz2
+import zlib
+import io
+import shutil
 import argparse
+import bisect
+import calendar
 import html
+import unicodedata
 import json
+import multiprocessing
+import socket
+import ssl
+import http.client
 import urllib.parse
+import xml.etree.ElementTree as ET
+import sqlite3
 import subprocess
+import time
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional, Set, Tuple
-from dataclasses import dataclass, field
-from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field, fields
+from collections import Counter, OrderedDict, defaultdict
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from socketserver import ThreadingMixIn
+import email.message
+from email import message_from_string
 from email.header import decode_header
+from xml.sax.saxutils import escape as xml_escape, quoteattr
 import threading
+import queue
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 VERSION = "2.3.2"
 DEFAULT_LOGFILE = "/var/log/zimbra.log"
+DEFAULT_INDEX_DB = "/var/lib/jt_zmmsgtrace/index.db"
+DEFAULT_REFRESH_INTERVAL = 60  # Seconds between background parses of the live log in Web UI mode
 
 # Language translations
 TRANSLATIONS = {
@@ -83,8 +106,10 @@ TRANSLATIONS = {
         'hint_recipient': '例: user@domain.com',
         'hint_msgid': '例: ABC123@domain.com',
         'hint_srchost': '例: mail.example.com',
+        'hint_subject': '例: 會議 通知',
         'hint_time': '例: 202501,202501',
         'regex_supported': '支援正則表達式',
+        'subject_words': '所有字詞都須出現（不分大小寫，中文可輸入主旨中的任一段文字）',
         'includes_dedup': '包含被去重的收件者',
 
         # Search results
@@ -116,6 +141,20 @@ TRANSLATIONS = {
         'show_details': '展開詳細資訊',
         'hide_details': '收合',
 
+        # Statistics dashboard
+        'statistics': '統計',
+        'stats_messages': '郵件數',
+        'stats_recipients': '收件者數',
+        'hourly_volume': '每小時郵件量',
+        'top_senders': '寄件者排行',
+        'top_recipient_domains': '收件者網域排行',
+        'recipient_domain': '收件者網域',
+        'relay_status': '各轉送主機遞送狀態（延遲/退回多者在前）',
+        'amavis_results': 'Amavis 掃描結果',
+        'disposition': '處理結果',
+        'reason': '原因',
+        'total': '合計',
+
         # Delivery status
         'status': '狀態',
         'delivered': '已送達',
@@ -295,8 +334,10 @@ TRANSLATIONS = {
         'hint_recipient': 'e.g.: user@domain.com',
         'hint_msgid': 'e.g.: ABC123@domain.com',
         'hint_srchost': 'e.g.: mail.example.com',
+        'hint_subject': 'e.g.: meeting notice',
         'hint_time': 'e.g.: 202501,202501',
         'regex_supported': 'Regular expressions supported',
+        'subject_words': 'All words must appear (case-insensitive; Chinese text matches anywhere in the subject)',
         'includes_dedup': 'Includes deduplicated recipients',
 
         # Search results
@@ -328,6 +369,20 @@ TRANSLATIONS = {
         'show_details': 'Show Details',
         'hide_details': 'Hide',
 
+        # Statistics dashboard
+        'statistics': 'Statistics',
+        'stats_messages': 'Messages',
+        'stats_recipients': 'Recipients',
+        'hourly_volume': 'Hourly Volume',
+        'top_senders': 'Top Senders',
+        'top_recipient_domains': 'Top Recipient Domains',
+        'recipient_domain': 'Recipient Domain',
+        'relay_status': 'Delivery Status per Relay (most deferred/bounced first)',
+        'amavis_results': 'Amavis Results',
+        'disposition': 'Disposition',
+        'reason': 'Reason',
+        'total': 'Total',
+
         # Delivery status
         'status': 'Status',
         'delivered': 'Delivered',
@@ -499,6 +554,119 @@ MONTH_MAP = {
     'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'
 }
 
+# Log line patterns, compiled once. parse_postfix_line / parse_amavis_line only
+# try a pattern after a plain substring check for its keyword succeeded.
+LOG_LINE_RE = re.compile(
+    r'^(\w{3}\s+\d+\s+\d{2}:\d{2}:\d{2})\s+'
+    r'(?:<[^>]+>\s+)?'
+    r'(\S+)\s+'
+    r'([^\[]+)\[(\d+)\]:\s+'
+    r'(?:\[ID\s+\d+\s+\w+\.\w+\]\s+)?'
+    r'(.*)$'
+)
+POSTFIX_QID_RE = re.compile(f'^({POSTFIX_QID_PATTERN}|NOQUEUE): (.*)$')
+POSTFIX_MESSAGE_ID_RE = re.compile(r'message-id=<([^>]+)>')
+POSTFIX_SUBJECT_RE = re.compile(r'header Subject:\s+(.+?)\s+from\s+')
+POSTFIX_CLIENT_RE = re.compile(r'client=([^\[]+)\[([^\]]+)\]')
+POSTFIX_FROM_RE = re.compile(r'from=<(.*)>, size=(\d+)')
+POSTFIX_DELIVERY_RE = re.compile(
+    r'to=<([^>]*)>(?:,\s+orig_to=<([^>]*)>)?,\s+'
+    r'relay=([^\[,]+)(?:\[([^\]]*)\](:\d+))?,\s+'
+    r'delay=\S+,\s+delays=\S+,\s+dsn=\S+\s+'
+    r'status=(\S+)\s+(.*)'
+)
+POSTFIX_AMAVIS_ID_RE = re.compile(r'id=([^ ,]+)')
+POSTFIX_QUEUED_AS_RE = re.compile(r'queued as ([^ )]+)')
+POSTFIX_REJECT_RE = re.compile(
+    r'RCPT\s+from\s+([^\[]+)\[([^\]]+)\]:\s+([^;]+);\s+'
+    r'from=<(.*?)>\s+to=<(.*?)>'
+)
+AMAVIS_ID_RE = re.compile(r'^\(([^)]+)\)\s')
+AMAVIS_RESULT_RE = re.compile(
+    r'^\(([^)]+)\)\s+'  # 1: am_id
+    r'(Passed|Blocked)\s+'  # 2: disposition
+    r'([^,{]+(?:\{[^}]*\})?),\s+'  # 3: reason (CLEAN, SPAM {DiscardedInbound,Quarantined}, etc.)
+    r'(?:[^\[]*)?\[([^\]]+)\]\s+'  # 4: from IP
+    r'(?:\[([^\]]+)\]\s+)?'  # 5: orig IP (optional)
+    r'<([^>]*)>\s+'  # 6: sender
+    r'->\s+'
+    r'(<[^>]+>(?:,<[^>]+>)*),\s*'  # 7: recipients (IMPORTANT!)
+    r'(?:quarantine:\s+.+?,\s+(?=\S*[Ii][Dd]:\s))?'
+    r'(?:Queue-ID:\s+([^,]+),\s*)?'  # 8: queue_id
+    r'(?:Message-ID:\s+<([^>]+)>,\s*)?'  # 9: message_id
+    r'(?:Resent-Message-ID:\s+<[^>]+>,\s*)?'
+    r'mail_id:\s+\S+,\s+'
+    r'Hits:\s+(\S+),\s+'  # 10: hits
+    r'size:\s+\d+,\s*'
+    r'(?:dkim_id=\S+,)?'
+    r'(?:queued_as:\s+\S+,)?'
+    r'(?:dkim_id=\S+,)?'
+    r'\s+(\d+)\s+ms',  # 11: ms
+    re.VERBOSE
+)
+TIME_SPEC_RE = re.compile(r'^(\d{4})(\d{2})(\d{2})?(\d{2})?(\d{2})?(\d{2})?$')
+
+
+def logdate_to_number(timestamp: str, year: int) -> Optional[str]:
+    """Convert log timestamp (e.g. 'Jan 10 12:00:00') to YYYYMMDDHHMMSS format"""
+    if not timestamp:
+        return None
+    try:
+        parts = timestamp.split()
+        month = MONTH_MAP.get(parts[0])
+        if not month:
+            return None
+        day = parts[1]
+        time_str = parts[2].replace(':', '')
+        return f"{year}{month}{day.zfill(2)}{time_str}"
+    except (IndexError, ValueError):
+        return None
+
+
+LOG_DATE_RE = re.compile(rb'^(\w{3}\s+\d+\s+\d{2}:\d{2}:\d{2})\s')
+TIME_SEEK_MARGIN = 3600  # Seconds of log read around a --time window, for queue stages before/after it
+
+
+def line_time(raw: bytes, year: int) -> Optional[int]:
+    """Timestamp of a raw log line as YYYYMMDDHHMMSS integer (None if it has none)"""
+    match = LOG_DATE_RE.match(raw)
+    if not match:
+        return None
+    number = logdate_to_number(match.group(1).decode('ascii'), year)
+    return int(number) if number else None
+
+
+def shift_time_number(number: int, seconds: int) -> int:
+    """Add seconds to a YYYYMMDDHHMMSS integer"""
+    try:
+        shifted = datetime.strptime(str(number), '%Y%m%d%H%M%S') + timedelta(seconds=seconds)
+    except ValueError:
+        # Day 31 of a --time end in a shorter month etc.: compare unshifted
+        return number
+    return int(shifted.strftime('%Y%m%d%H%M%S'))
+
+
+def time_to_number(time_str: str, max_values: bool = False) -> Optional[str]:
+    """Convert YYYYMM[DD[HH[MM[SS]]]] to YYYYMMDDHHMMSS"""
+    if not time_str:
+        return None
+
+    # Default values: 0 for start, max for end
+    defaults = [31, 23, 59, 59] if max_values else [1, 0, 0, 0]
+
+    match = TIME_SPEC_RE.match(time_str)
+    if not match:
+        return None
+
+    groups = match.groups()
+    year, month = groups[0], groups[1]
+    day = groups[2] or str(defaults[0]).zfill(2)
+    hour = groups[3] or str(defaults[1]).zfill(2)
+    minute = groups[4] or str(defaults[2]).zfill(2)
+    second = groups[5] or str(defaults[3]).zfill(2)
+
+    return f"{year}{month}{day.zfill(2)}{hour.zfill(2)}{minute.zfill(2)}{second.zfill(2)}"
+
 
 def debug_print(message: str, file=sys.stderr):
     """Print debug message with timestamp"""
@@ -545,6 +713,28 @@ def decode_header_value(value: str) -> str:
         return value
 
 
+def slotted(cls):
+    """
+    Recreate a dataclass with __slots__ (what dataclass(slots=True) does on
+    Python 3.10+). Instances then have no per-object __dict__, which matters
+    for the millions of Message / RecipientInfo objects of a large log.
+    """
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict['__slots__'] = field_names
+    for name in field_names:
+        cls_dict.pop(name, None)  # Class level defaults would conflict with the slots
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    """Intern a repetitive string (host, IP, status, address, log date) so all copies share one object"""
+    return sys.intern(value) if value else value
+
+
+@slotted
 @dataclass
 class RecipientInfo:
     """Information about a recipient's delivery"""
@@ -561,6 +751,7 @@ class RecipientInfo:
     from_amavis_only: bool = False
 
 
+@slotted
 @dataclass
 class AmavisRecord:
     """Amavis scan record"""
@@ -579,11 +770,13 @@ class AmavisRecord:
     ms: str
 
 
+@slotted
 @dataclass
 class Message:
     """Represents an email message"""
     message_id: str
     arrive_time: Optional[str] = None
+    arrive_num: Optional[int] = None  # arrive_time as YYYYMMDDHHMMSS integer (set by LogParser)
     sender: Optional[str] = None
     subject: Optional[str] = None  # Email subject
     host: Optional[str] = None
@@ -591,10 +784,166 @@ class Message:
     prev_ip: Optional[str] = None
     bytes_size: Optional[int] = None
     recipients: Dict[str, RecipientInfo] = field(default_factory=dict)
-    queue_ids: Set[str] = field(default_factory=set)
+    queue_ids: Tuple[str, ...] = ()  # Usually one queue ID, a tuple is much smaller than a set
     source_file: Optional[str] = None  # Track which log file this message came from
 
 
+def amavis_to_dict(record: AmavisRecord) -> Dict:
+    """Convert an AmavisRecord to a JSON serializable dict"""
+    return {
+        'log_date': record.log_date,
+        'host': record.host,
+        'pid': record.pid,
+        'disposition': record.disposition,
+        'reason': record.reason,
+        'from_ip': record.from_ip,
+        'orig_ip': record.orig_ip,
+        'sender': record.sender,
+        'recipients': list(record.recipients),
+        'queue_id': record.queue_id,
+        'message_id': record.message_id,
+        'hits': record.hits,
+        'ms': record.ms,
+    }
+
+
+def amavis_from_dict(data: Dict) -> AmavisRecord:
+    """Rebuild an AmavisRecord from amavis_to_dict() output"""
+    record = AmavisRecord(**data)
+    for name in ('log_date', 'host', 'disposition', 'reason', 'from_ip', 'orig_ip', 'sender'):
+        setattr(record, name, intern_str(getattr(record, name)))
+    record.recipients = [intern_str(r) for r in record.recipients]
+    return record
+
+
+READ_BUFFER_SIZE = 1 << 20  # Bytes read from a log file or decompressor at a time
+DECOMPRESS_TOOLS = {  # External decompressors, in order of preference (parallel ones first)
+    '.gz': ('pigz', 'gzip'),
+    '.bz': ('lbzip2', 'pbzip2', 'bzip2'),
+    '.bz2': ('lbzip2', 'pbzip2', 'bzip2'),
+}
+DECOMPRESSORS = {  # In-process fallback
+    '.gz': lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    '.bz': bz2.BZ2Decompressor,
+    '.bz2': bz2.BZ2Decompressor,
+}
+
+
+class DecompressorPipe:
+    """Output of an external decompressor (pigz, lbzip2, ...) as a binary file object"""
+
+    def __init__(self, tool: str, filepath: str):
+        self.tool = tool
+        self.filepath = filepath
+        self.proc = subprocess.Popen([tool, '-dc', filepath], stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, bufsize=READ_BUFFER_SIZE)
+
+    def __iter__(self):
+        return iter(self.proc.stdout)
+
+    def close(self):
+        """Stop the decompressor; OSError if it failed (e.g. a corrupt file)"""
+        self.proc.stdout.close()
+        errors = self.proc.stderr.read()
+        self.proc.stderr.close()
+        # Closing the pipe early ends the tool with SIGPIPE (negative return code)
+        if self.proc.wait() > 0:
+            raise OSError(f"{os.path.basename(self.tool)} failed on {self.filepath}: "
+                          f"{errors.decode('utf-8', errors='replace').strip()}")
+
+
+class ThreadedDecompressor(io.RawIOBase):
+    """
+    Compressed log file decompressed by a background thread, in large blocks.
+    zlib and bz2 release the GIL, so decompression overlaps with parsing.
+    Wrap it in an io.BufferedReader to read lines.
+    """
+
+    def __init__(self, filepath: str, factory: Callable):
+        self.filepath = filepath
+        self.factory = factory
+        self.blocks = queue.Queue(maxsize=8)
+        self.pending = memoryview(b'')
+        self.done = False
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._decompress, daemon=True)
+        self.thread.start()
+
+    def _put(self, item) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.blocks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _decompress(self):
+        try:
+            decompressor = self.factory()
+            with open(self.filepath, 'rb') as fh:
+                while not self.stopped.is_set():
+                    data = fh.read(READ_BUFFER_SIZE)
+                    if not data:
+                        break
+                    # Concatenated gzip members / bzip2 streams
+                    while data:
+                        if decompressor.eof:
+                            decompressor = self.factory()
+                        block = decompressor.decompress(data)
+                        data = decompressor.unused_data if decompressor.eof else b''
+                        if block and not self._put(block):
+                            return
+            if not decompressor.eof:
+                raise EOFError(f"Compressed file ended before the end-of-stream marker was reached: {self.filepath}")
+            self._put(None)
+        except Exception as e:
+            self._put(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending:
+            if self.done:
+                return 0
+            item = self.blocks.get()
+            if item is None:
+                self.done = True
+                return 0
+            if isinstance(item, Exception):
+                self.done = True
+                raise item
+            self.pending = memoryview(item)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        self.stopped.set()
+        super().close()
+
+
+def open_log_file(filepath: str, external: bool = True):
+    """
+    Open a log file for reading lines as bytes. Compressed logs are read in
+    large blocks and decompressed concurrently with parsing: by an external tool
+    (pigz, lbzip2, gzip, bzip2) when one is installed and external is True,
+    otherwise by a background thread.
+    """
+    suffix = Path(filepath).suffix
+    if suffix not in DECOMPRESSORS:
+        # Plain files: the OS reads ahead, a larger buffer does not pay off
+        return open(filepath, 'rb')
+    if external:
+        for tool in DECOMPRESS_TOOLS[suffix]:
+            tool_path = shutil.which(tool)
+            if tool_path:
+                return DecompressorPipe(tool_path, filepath)
+    return io.BufferedReader(ThreadedDecompressor(filepath, DECOMPRESSORS[suffix]), READ_BUFFER_SIZE)
+
+
 class LogParser:
     """Parser for Zimbra mail logs"""
 
@@ -606,54 +955,55 @@ class LogParser:
         self.amavis_records: Dict[str, AmavisRecord] = {}
         self.saved_lines: Dict[str, str] = {}  # for multi-line amavis logs
         self.qid_to_msg: Dict[str, Tuple[str, Message]] = {}  # queue_id -> (message_id, Message)
+        self.delivery_chains: Dict[str, Tuple[str, ...]] = {}  # message_id -> queue IDs, root first (see delivery_chain)
         self.current_file: Optional[str] = None  # Track current file being parsed
-
-        # Compile regex patterns
-        self.log_pattern = re.compile(
-            r'^(\w{3}\s+\d+\s+\d{2}:\d{2}:\d{2})\s+'
-            r'(?:<[^>]+>\s+)?'
-            r'(\S+)\s+'
-            r'([^\[]+)\[(\d+)\]:\s+'
-            r'(?:\[ID\s+\d+\s+\w+\.\w+\]\s+)?'
-            r'(.*)$'
-        )
-        self.postfix_qid_pattern = re.compile(f'^({POSTFIX_QID_PATTERN}|NOQUEUE): (.*)$')
+        self.line_offset: int = 0  # Byte offset of the line being parsed in current_file
+        self.line_date: Optional[str] = None  # Timestamp of the line being parsed
+        self.first_line_date: Optional[str] = None  # Timestamp of the first postfix/amavis line parsed
+        self.file_positions: Dict[str, Tuple[int, int]] = {}  # filepath -> (inode, offset) for ingest()
+        self.lines_read: int = 0  # Log lines read by parse_file() (throughput statistics)
+        self.provisional: Dict[str, Tuple[str, str, 'Message']] = {}  # key -> (message_id, qid, Message)
+        self.refinalized: Dict[str, Tuple] = {}  # key -> (queue entry, Message) of repeatedly finalized rejects
+        self.amavis_dirty: Set[str] = set()  # amavis record ids not integrated yet
+        self.amavis_by_message_id: Dict[str, Set[str]] = defaultdict(set)  # message_id -> amavis record ids
+        # Partial-result mode (see parse_file_partial): collect raw queue entries
+        # and orphaned amavis continuation lines instead of building Messages
+        self.finalized_objs: Optional[List[Tuple[int, str, str, Dict]]] = None
+        self.orphan_continuations: Optional[List[Tuple]] = None
+        # Optional hooks: on_finalize(qid, msg) and on_amavis(record_id, record)
+        self.on_finalize: Optional[Callable[[str, 'Message'], None]] = None
+        self.on_amavis: Optional[Callable[[str, 'AmavisRecord'], None]] = None
+        # Secondary search indexes, built on demand by update_search_index()
+        self.search_index: Optional['SearchIndex'] = None
+        self.changed_message_ids: Set[str] = set()  # message ids to re-index
+        self.date_numbers: Dict[str, int] = {}  # log timestamp -> arrive_num cache
+        # message_id -> postfix_tmp keys of its queue entries not 'removed' yet
+        # (only tracked when set to a dict, see StreamTracer)
+        self.open_queues: Optional[Dict[str, Set[str]]] = None
+
+        # Regex patterns (compiled once at module level)
+        self.log_pattern = LOG_LINE_RE
+        self.postfix_qid_pattern = POSTFIX_QID_RE
 
     def logdate_to_number(self, timestamp: str) -> Optional[str]:
         """Convert log timestamp to YYYYMMDDHHMMSS format"""
-        if not timestamp:
-            return None
-        try:
-            parts = timestamp.split()
-            month = MONTH_MAP.get(parts[0])
-            if not month:
-                return None
-            day = parts[1]
-            time_str = parts[2].replace(':', '')
-            return f"{self.year}{month}{day.zfill(2)}{time_str}"
-        except (IndexError, ValueError):
-            return None
+        return logdate_to_number(timestamp, self.year)
 
     def time_to_number(self, time_str: str, max_values: bool = False) -> Optional[str]:
         """Convert YYYYMM[DD[HH[MM[SS]]]] to YYYYMMDDHHMMSS"""
-        if not time_str:
-            return None
-
-        # Default values: 0 for start, max for end
-        defaults = [31, 23, 59, 59] if max_values else [1, 0, 0, 0]
-
-        match = re.match(r'^(\d{4})(\d{2})(\d{2})?(\d{2})?(\d{2})?(\d{2})?$', time_str)
-        if not match:
-            return None
-
-        groups = match.groups()
-        year, month = groups[0], groups[1]
-        day = groups[2] or str(defaults[0]).zfill(2)
-        hour = groups[3] or str(defaults[1]).zfill(2)
-        minute = groups[4] or str(defaults[2]).zfill(2)
-        second = groups[5] or str(defaults[3]).zfill(2)
-
-        return f"{year}{month}{day.zfill(2)}{hour.zfill(2)}{minute.zfill(2)}{second.zfill(2)}"
+        return time_to_number(time_str, max_values)
+
+    def arrive_number(self, timestamp: Optional[str]) -> Optional[int]:
+        """Log timestamp as YYYYMMDDHHMMSS integer (Message.arrive_num), cached per timestamp"""
+        number = self.date_numbers.get(timestamp)
+        if number is None and timestamp:
+            text = self.logdate_to_number(timestamp)
+            if not text:
+                return None
+            if len(self.date_numbers) >= 100000:
+                self.date_numbers.clear()
+            number = self.date_numbers[timestamp] = int(text)
+        return number
 
     def parse_postfix_line(self, log_date: str, host: str, app: str, pid: str, msg: str):
         """Parse a Postfix log line"""
@@ -681,47 +1031,54 @@ class LogParser:
             self._handle_postfix_reject(obj, qid, log_date, content[8:])
             return
 
-        # Handle removed
+        # Handle removed (queue entry is complete, nothing more will be logged for it)
         if content.startswith('removed'):
+            self.postfix_tmp.pop(key, None)
+            self._close_queue(key, obj)
             self._finalize_postfix_message(obj, qid)
             return
 
+        # Each pattern is only tried when its keyword is in the line; the order
+        # of the checks is the order in which the patterns take precedence.
+
         # message-id
-        match = re.search(r'message-id=<([^>]+)>', content)
-        if match:
-            obj['message_id'] = match.group(1)
-            obj['arrive_time'] = log_date
-            return
+        if 'message-id=<' in content:
+            match = POSTFIX_MESSAGE_ID_RE.search(content)
+            if match:
+                obj['message_id'] = match.group(1)
+                obj['arrive_time'] = log_date
+                if self.open_queues is not None:
+                    self.open_queues.setdefault(obj['message_id'], set()).add(key)
+                return
 
         # subject
-        match = re.search(r'header Subject:\s+(.+?)\s+from\s+', content)
-        if match:
-            # Decode RFC 2047 encoded subject (e.g., =?utf-8?B?5ris6Kmm?=)
-            obj['subject'] = decode_header_value(match.group(1).strip())
-            return
+        if 'header Subject:' in content:
+            match = POSTFIX_SUBJECT_RE.search(content)
+            if match:
+                # Decode RFC 2047 encoded subject (e.g., =?utf-8?B?5ris6Kmm?=)
+                obj['subject'] = decode_header_value(match.group(1).strip())
+                return
 
         # client
-        match = re.search(r'client=([^\[]+)\[([^\]]+)\]', content)
-        if match:
-            obj['prev_host'] = match.group(1)
-            obj['prev_ip'] = match.group(2)
-            return
+        if 'client=' in content:
+            match = POSTFIX_CLIENT_RE.search(content)
+            if match:
+                obj['prev_host'] = match.group(1)
+                obj['prev_ip'] = match.group(2)
+                return
 
         # from
-        match = re.search(r'from=<(.*)>, size=(\d+)', content)
-        if match:
-            obj['sender'] = match.group(1) or 'postmaster'
-            obj['bytes'] = int(match.group(2))
-            return
+        if 'from=<' in content:
+            match = POSTFIX_FROM_RE.search(content)
+            if match:
+                obj['sender'] = match.group(1) or 'postmaster'
+                obj['bytes'] = int(match.group(2))
+                return
 
         # to (delivery record)
-        match = re.search(
-            r'to=<([^>]*)>(?:,\s+orig_to=<([^>]*)>)?,\s+'
-            r'relay=([^\[,]+)(?:\[([^\]]*)\](:\d+))?,\s+'
-            r'delay=\S+,\s+delays=\S+,\s+dsn=\S+\s+'
-            r'status=(\S+)\s+(.*)',
-            content
-        )
+        if 'to=<' not in content:
+            return
+        match = POSTFIX_DELIVERY_RE.search(content)
         if match:
             recip = match.group(1)
             orig_recip = match.group(2)
@@ -744,12 +1101,12 @@ class LogParser:
                 recip_info['orig_recip'] = orig_recip
 
             # Extract amavis ID
-            amav_match = re.search(r'id=([^ ,]+)', status_msg)
+            amav_match = POSTFIX_AMAVIS_ID_RE.search(status_msg) if 'id=' in status_msg else None
             if amav_match:
                 recip_info['amavis_id'] = amav_match.group(1)
 
             # Extract next queue ID
-            queue_match = re.search(r'queued as ([^ )]+)', status_msg)
+            queue_match = POSTFIX_QUEUED_AS_RE.search(status_msg) if 'queued as ' in status_msg else None
             if queue_match:
                 recip_info['next_queue_id'] = queue_match.group(1)
 
@@ -759,11 +1116,7 @@ class LogParser:
 
     def _handle_postfix_reject(self, obj: Dict, qid: str, log_date: str, content: str):
         """Handle rejected message"""
-        match = re.search(
-            r'RCPT\s+from\s+([^\[]+)\[([^\]]+)\]:\s+([^;]+);\s+'
-            r'from=<(.*?)>\s+to=<(.*?)>',
-            content
-        )
+        match = POSTFIX_REJECT_RE.search(content)
         if match:
             obj['prev_host'] = match.group(1)
             obj['prev_ip'] = match.group(2)
@@ -777,55 +1130,354 @@ class LogParser:
                     'status': 'reject',
                     'status_msg': status_msg
                 }
+                changed = [recip]
+            else:
+                changed = []
+        else:
+            changed = []
 
         obj['arrive_time'] = log_date
         obj.setdefault('message_id', f"[reject:{qid}]")
-        self._finalize_postfix_message(obj, qid)
+        # NOQUEUE rejects keep accumulating in one queue entry, only pass what changed
+        self._finalize_postfix_message(obj, qid, changed_recipients=changed)
+
+    def _finalize_postfix_message(self, obj: Dict, qid: str, provisional: bool = False,
+                                  changed_recipients: Optional[List[str]] = None):
+        """
+        Finalize and store a postfix message (one Message per queue_id).
+        A provisional Message (see snapshot_pending) is replaced by the next
+        finalize of the same queue entry.
+
+        changed_recipients: for a queue entry that is finalized again and again
+        (NOQUEUE rejects), the only recipients changed since its last finalize.
+        The stored Message is then updated in place instead of being rebuilt
+        from all recipients collected so far.
+        """
+        key = f"{qid}:{obj.get('host')}"
+        if self.finalized_objs is not None and not provisional:
+            if changed_recipients is not None:
+                if self.refinalized.get(key, (None,))[0] is obj:
+                    return  # Already listed, the merge builds it from the final state
+                self.refinalized[key] = (obj, None)
+            self.finalized_objs.append((self.line_offset, key, qid, obj))
+            return
+        self._drop_provisional(key)
 
-    def _finalize_postfix_message(self, obj: Dict, qid: str):
-        """Finalize and store a postfix message (one Message per queue_id)"""
         msg_id = obj.get('message_id', f"[unknown:{qid}]")
 
         # Create message_id entry if not exists
         if msg_id not in self.messages:
             self.messages[msg_id] = {}
 
-        # Create a separate Message object for this queue_id
-        msg = Message(message_id=msg_id)
-        msg.arrive_time = obj.get('arrive_time')
-        msg.sender = obj.get('sender')
-        msg.subject = obj.get('subject')
-        msg.host = obj.get('host')
-        msg.prev_host = obj.get('prev_host')
-        msg.prev_ip = obj.get('prev_ip')
-        msg.bytes_size = obj.get('bytes')
-        msg.queue_ids.add(qid)
-        msg.source_file = self.current_file  # Record source file
-
-        # Add recipients for this specific queue stage
-        for recip_addr, recip_data in obj.get('recipients', {}).items():
-            recip_info = RecipientInfo(address=recip_addr)
-            recip_info.leave_time = recip_data.get('leave_time')
-            recip_info.status = recip_data.get('status')
-            recip_info.status_msg = recip_data.get('status_msg')
-            recip_info.next_host = recip_data.get('next_host')
-            recip_info.next_ip = recip_data.get('next_ip')
-            recip_info.next_queue_id = recip_data.get('next_queue_id')
-            recip_info.amavis_id = recip_data.get('amavis_id')
-            recip_info.orig_recip = recip_data.get('orig_recip')
-            msg.recipients[recip_addr] = recip_info
+        previous = self.refinalized.get(key)
+        if (changed_recipients is not None and previous and previous[0] is obj
+                and self.messages[msg_id].get(qid) is previous[1]):
+            msg = previous[1]
+            self._fill_message(msg, obj)
+            for recip_addr in changed_recipients:
+                msg.recipients[recip_addr] = self._recipient_info(recip_addr, obj['recipients'][recip_addr])
+        else:
+            # Create a separate Message object for this queue_id
+            msg = Message(message_id=msg_id)
+            self._fill_message(msg, obj)
+            msg.queue_ids = (qid,)
+
+            # Add recipients for this specific queue stage
+            for recip_addr, recip_data in obj.get('recipients', {}).items():
+                msg.recipients[recip_addr] = self._recipient_info(recip_addr, recip_data)
+        if changed_recipients is not None and not provisional:
+            self.refinalized[key] = (obj, msg)
 
         # Store in two-dimensional structure
         self.messages[msg_id][qid] = msg
         self.qid_to_msg[qid] = (msg_id, msg)
+        self.delivery_chains.pop(msg_id, None)
+        if self.search_index is not None:
+            self.changed_message_ids.add(msg_id)
+
+        # Amavis records for this queue / message must be (re)integrated
+        if qid in self.amavis_records:
+            self.amavis_dirty.add(qid)
+        if msg_id in self.amavis_by_message_id:
+            self.amavis_dirty.update(self.amavis_by_message_id[msg_id])
+
+        if provisional:
+            self.provisional[key] = (msg_id, qid, msg)
+            return
 
         if self.debug > 1:
             print(f"DEBUG: Finalized queue {qid} for message {msg_id}, recipients: {list(msg.recipients.keys())}", file=sys.stderr)
 
+        if self.on_finalize:
+            self.on_finalize(qid, msg)
+
+    def _fill_message(self, msg: Message, obj: Dict):
+        """Copy the per-queue fields of a postfix queue entry into a Message"""
+        msg.arrive_time = intern_str(obj.get('arrive_time'))
+        msg.arrive_num = self.arrive_number(msg.arrive_time)
+        msg.sender = intern_str(obj.get('sender'))
+        msg.subject = obj.get('subject')
+        msg.host = intern_str(obj.get('host'))
+        msg.prev_host = intern_str(obj.get('prev_host'))
+        msg.prev_ip = intern_str(obj.get('prev_ip'))
+        msg.bytes_size = obj.get('bytes')
+        msg.source_file = intern_str(self.current_file)  # Record source file
+
+    @staticmethod
+    def _recipient_info(recip_addr: str, recip_data: Dict) -> RecipientInfo:
+        """Build the RecipientInfo of one recipient of a postfix queue entry"""
+        recip_info = RecipientInfo(address=intern_str(recip_addr))
+        recip_info.leave_time = intern_str(recip_data.get('leave_time'))
+        recip_info.status = intern_str(recip_data.get('status'))
+        recip_info.status_msg = recip_data.get('status_msg')
+        recip_info.next_host = intern_str(recip_data.get('next_host'))
+        recip_info.next_ip = intern_str(recip_data.get('next_ip'))
+        recip_info.next_queue_id = recip_data.get('next_queue_id')
+        recip_info.amavis_id = recip_data.get('amavis_id')
+        recip_info.orig_recip = intern_str(recip_data.get('orig_recip'))
+        return recip_info
+
+    def _drop_provisional(self, key: str):
+        """Remove the provisional Message of a queue entry, if any"""
+        entry = self.provisional.pop(key, None)
+        if not entry:
+            return
+        msg_id, qid, msg = entry
+        self.delivery_chains.pop(msg_id, None)
+        if self.search_index is not None:
+            self.changed_message_ids.add(msg_id)
+        queues = self.messages.get(msg_id)
+        if queues and queues.get(qid) is msg:
+            del queues[qid]
+            if not queues:
+                del self.messages[msg_id]
+        if qid in self.qid_to_msg and self.qid_to_msg[qid][1] is msg:
+            del self.qid_to_msg[qid]
+
+    def add_message(self, qid: str, msg: Message):
+        """Store an already finalized Message (e.g. loaded from the index)"""
+        if msg.arrive_num is None:
+            msg.arrive_num = self.arrive_number(msg.arrive_time)
+        if msg.message_id not in self.messages:
+            self.messages[msg.message_id] = {}
+        self.messages[msg.message_id][qid] = msg
+        self.qid_to_msg[qid] = (msg.message_id, msg)
+        self.delivery_chains.pop(msg.message_id, None)
+        if self.search_index is not None:
+            self.changed_message_ids.add(msg.message_id)
+
+    def root_message(self, msg_id: str) -> Optional[Message]:
+        """Return the first queue stage of a message (the queue no other stage relays to)"""
+        chain = self.delivery_chain(msg_id)
+        return self.messages[msg_id][chain[0]] if chain else None
+
+    def delivery_chain(self, msg_id: str) -> Tuple[str, ...]:
+        """
+        Queue IDs of a message in delivery order: the root queue (the one no
+        other stage relays to) first, then the queues it relays to, hop by hop.
+
+        The hop graph is walked once per message and the result kept until one
+        of its queues changes; SearchIndex.update() fills it for every new or
+        changed message, so searches only look it up. Single-queue messages
+        are not stored.
+        """
+        queue_dict = self.messages.get(msg_id)
+        if not queue_dict:
+            return ()
+        if len(queue_dict) == 1:
+            return tuple(queue_dict)
+        chain = self.delivery_chains.get(msg_id)
+        if chain is None:
+            chain = self.delivery_chains[msg_id] = self._build_delivery_chain(queue_dict)
+        return chain
+
+    @staticmethod
+    def _build_delivery_chain(queue_dict: Dict[str, Message]) -> Tuple[str, ...]:
+        """Order the queues of a message along next_queue_id (see delivery_chain)"""
+        next_qids = {}
+        for qid, msg in queue_dict.items():
+            next_qids[qid] = sorted(set(recip.next_queue_id for recip in msg.recipients.values()
+                                        if recip.next_queue_id in queue_dict and recip.next_queue_id != qid))
+        referenced_qids = set(q for qids in next_qids.values() for q in qids)
+        # The root first, then queues nothing relays to and those in a relay loop
+        starts = sorted(set(queue_dict) - referenced_qids) + sorted(referenced_qids)
+
+        chain = []
+        seen = set()
+        for start in starts:
+            if start in seen:
+                continue
+            seen.add(start)
+            level = [start]
+            while level:
+                chain.extend(level)
+                next_level = []
+                for qid in level:
+                    for next_qid in next_qids[qid]:
+                        if next_qid not in seen:
+                            seen.add(next_qid)
+                            next_level.append(next_qid)
+                level = next_level
+        return tuple(chain)
+
+    def delivery_hops(self, msg: Message, recip: RecipientInfo) -> List[Tuple[Message, RecipientInfo]]:
+        """
+        Queue stages a recipient went through, starting at msg: follows
+        next_queue_id through qid_to_msg, visiting each queue once.
+        """
+        hops = [(msg, recip)]
+        addr = recip.address
+        seen = set(msg.queue_ids)
+        while recip.next_queue_id and recip.next_queue_id not in seen:
+            entry = self.qid_to_msg.get(recip.next_queue_id)
+            if not entry or addr not in entry[1].recipients:
+                break
+            seen.add(recip.next_queue_id)
+            msg = entry[1]
+            recip = msg.recipients[addr]
+            hops.append((msg, recip))
+        return hops
+
+    def update_search_index(self) -> 'SearchIndex':
+        """Build the secondary search indexes, or re-index messages changed since the last call"""
+        if self.search_index is None:
+            self.search_index = SearchIndex(self.year)
+            changed = list(self.messages.keys())
+        else:
+            changed = self.changed_message_ids
+        self.search_index.update(self, changed)
+        self.changed_message_ids = set()
+        return self.search_index
+
+    def add_amavis_record(self, record_id: str, record: AmavisRecord):
+        """Store an Amavis record and mark it for integration"""
+        self.amavis_records[record_id] = record
+        self.amavis_dirty.add(record_id)
+        if record.message_id:
+            self.amavis_by_message_id[record.message_id].add(record_id)
+
+    def finalize_pending(self, state: Optional[Dict] = None):
+        """Finalize all queue entries still open in postfix_tmp (or in an exported state)"""
+        if state is not None:
+            for obj in state.get('postfix_tmp', {}).values():
+                self._finalize_postfix_message(obj, obj['qid'])
+            return
+        for key in list(self.postfix_tmp.keys()):
+            obj = self.postfix_tmp.pop(key)
+            qid = obj['qid']
+            self._close_queue(key, obj)
+            self._finalize_postfix_message(obj, qid)
+
+    def _close_queue(self, key: str, obj: Dict):
+        """Forget a queue entry leaving postfix_tmp in open_queues"""
+        if self.open_queues is None or 'message_id' not in obj:
+            return
+        keys = self.open_queues.get(obj['message_id'])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.open_queues[obj['message_id']]
+
+    def snapshot_pending(self):
+        """
+        Make queue entries that are still in flight visible to searches without
+        closing them: each open entry is stored as a provisional Message that
+        is replaced once the entry is really finalized.
+        """
+        for key, obj in self.postfix_tmp.items():
+            self._finalize_postfix_message(obj, obj['qid'], provisional=True)
+
+    def ingest(self, filepath: str) -> int:
+        """
+        Incrementally parse the lines appended to a log file since the last call.
+
+        The byte offset is remembered per file and queue entries that have not
+        been 'removed' yet stay open in postfix_tmp across calls, so queue IDs
+        still in flight are not finalized too early. A new inode or a shrunk
+        file (rotation / truncation) restarts from the beginning of the file,
+        keeping the open state so entries continue across the rotation.
+
+        Returns:
+            Number of bytes read
+        """
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return 0
+
+        inode, offset = self.file_positions.get(filepath, (None, 0))
+        if Path(filepath).suffix in ['.gz', '.bz', '.bz2']:
+            # Compressed logs never grow, parse them once
+            if inode == st.st_ino:
+                return 0
+            self.parse_file(filepath, finalize=False)
+            self.file_positions[filepath] = (st.st_ino, st.st_size)
+            return st.st_size
+
+        if inode != st.st_ino or st.st_size < offset:
+            offset = 0
+        if st.st_size == offset:
+            self.file_positions[filepath] = (st.st_ino, offset)
+            return 0
+
+        end_offset = self.parse_file(filepath, start_offset=offset, finalize=False)
+        self.file_positions[filepath] = (st.st_ino, end_offset)
+        return end_offset - offset
+
+    def ingest_part(self, part: Dict, inode: int):
+        """
+        Continue like ingest() with the parse_file_partial() results of the
+        lines appended to a file, read by someone else from the offset this
+        parser stopped at (LogIndex.update), instead of parsing them again.
+
+        The queue entries the part finalized or left open replace those in
+        postfix_tmp, merged with what this parser already collected for them
+        (e.g. the beginning of an entry in an older file).
+        """
+        filepath = part['file']
+        self.current_file = filepath
+        self.lines_read += part['lines']
+        for args in part['orphans']:
+            self.parse_amavis_line(*args)
+        # Only the file being read can continue amavis lines
+        self.saved_lines = dict(part['saved_lines'])
+
+        merged = {}
+        for offset, key, qid, obj in part['finalized']:
+            older = self.postfix_tmp.pop(key, None)
+            if older is not None and older is not obj:
+                _merge_postfix_obj(older, obj)
+            merged[key] = obj
+            self.line_offset = offset
+            self._finalize_postfix_message(obj, qid)
+        for offset, record_id, record in part['amavis']:
+            self.add_amavis_record(record_id, record)
+        for key, obj in part['pending'].items():
+            # NOQUEUE rejects stay open after being finalized
+            older = merged.get(key) or self.postfix_tmp.get(key)
+            if older is not None and older is not obj:
+                _merge_postfix_obj(older, obj)
+            self.postfix_tmp[key] = obj
+        self.file_positions[filepath] = (inode, part['end_offset'])
+
+    def export_pending(self) -> Dict:
+        """Return the still-open parse state (JSON serializable)"""
+        return {
+            'postfix_tmp': self.postfix_tmp,
+            'saved_lines': self.saved_lines,
+        }
+
+    def import_pending(self, state: Dict):
+        """Restore parse state saved with export_pending()"""
+        if not state:
+            return
+        self.postfix_tmp.update(state.get('postfix_tmp', {}))
+        self.saved_lines.update(state.get('saved_lines', {}))
+
     def parse_amavis_line(self, log_date: str, host: str, app: str, pid: str, msg: str):
         """Parse an Amavis log line"""
         # Extract amavis ID
-        am_id_match = re.match(r'^\(([^)]+)\)\s', msg)
+        am_id_match = AMAVIS_ID_RE.match(msg) if msg.startswith('(') else None
         if not am_id_match:
             return
 
@@ -833,6 +1485,10 @@ class LogParser:
 
         # Handle continuation lines
         if msg.startswith(f'({am_id}) ...'):
+            if am_id not in self.saved_lines and self.orphan_continuations is not None:
+                # Beginning of the line is in the previous log file
+                self.orphan_continuations.append((log_date, host, app, pid, msg))
+                return
             saved = self.saved_lines.pop(am_id, '')
             msg = saved + msg[len(f'({am_id}) ...'):]
 
@@ -842,34 +1498,11 @@ class LogParser:
             return
 
         # Only process Passed/Blocked lines
-        if not re.search(r'(Passed|Blocked)', msg):
+        if 'Passed' not in msg and 'Blocked' not in msg:
             return
 
         # Parse the full amavis log line
-        pattern = re.compile(
-            r'^\(([^)]+)\)\s+'  # 1: am_id
-            r'(Passed|Blocked)\s+'  # 2: disposition
-            r'([^,]+),\s+'  # 3: reason (CLEAN, BAD-HEADER, etc.)
-            r'(?:[^\[]*)?\[([^\]]+)\]\s+'  # 4: from IP
-            r'(?:\[([^\]]+)\]\s+)?'  # 5: orig IP (optional)
-            r'<([^>]*)>\s+'  # 6: sender
-            r'->\s+'
-            r'(<[^>]+>(?:,<[^>]+>)*),\s*'  # 7: recipients (IMPORTANT!)
-            r'(?:quarantine:\s+.+?,(?=\s\S*[Ii][Dd]:\s))?'
-            r'(?:Queue-ID:\s+([^,]+),)?'  # 8: queue_id
-            r'(?:Message-ID:\s+<([^>]+)>,)?'  # 9: message_id
-            r'(?:Resent-Message-ID:\s+<[^>]+>,)?'
-            r'\s+mail_id:\s+\S+,\s+'
-            r'Hits:\s+(\S+),\s+'  # 10: hits
-            r'size:\s+\d+,\s*'
-            r'(?:dkim_id=\S+,)?'
-            r'(?:queued_as:\s+\S+,)?'
-            r'(?:dkim_id=\S+,)?'
-            r'\s+(\d+)\s+ms',  # 11: ms
-            re.VERBOSE
-        )
-
-        match = pattern.search(msg)
+        match = AMAVIS_RESULT_RE.search(msg)
         if not match:
             if self.debug:
                 print(f"DEBUG: Amavis line not matched: {msg[:100]}...", file=sys.stderr)
@@ -879,17 +1512,17 @@ class LogParser:
 
         # Parse recipients - THIS IS THE KEY FIX!
         recipients_str = groups[6]  # "<a@x.com>,<b@x.com>,<c@x.com>"
-        recipients = [r.strip('<>') for r in recipients_str.split(',')]
+        recipients = [intern_str(r.strip('<>')) for r in recipients_str.split(',')]
 
         record = AmavisRecord(
-            log_date=log_date,
-            host=host,
+            log_date=intern_str(log_date),
+            host=intern_str(host),
             pid=groups[0],
-            disposition=groups[1],
-            reason=groups[2],
-            from_ip=groups[3],
-            orig_ip=groups[4],
-            sender=groups[5],
+            disposition=intern_str(groups[1]),
+            reason=intern_str(groups[2]),
+            from_ip=intern_str(groups[3]),
+            orig_ip=intern_str(groups[4]),
+            sender=intern_str(groups[5]),
             recipients=recipients,  # Store as list
             queue_id=groups[7],
             message_id=groups[8],
@@ -899,13 +1532,28 @@ class LogParser:
 
         # Store by queue_id or amavis_id
         record_id = record.queue_id or record.pid
-        self.amavis_records[record_id] = record
+        self.add_amavis_record(record_id, record)
 
         if self.debug > 1:
             print(f"DEBUG: Amavis record {record_id}: {len(recipients)} recipients", file=sys.stderr)
 
-    def parse_file(self, filepath: str):
-        """Parse a log file"""
+        if self.on_amavis:
+            self.on_amavis(record_id, record)
+
+    def parse_file(self, filepath: str, start_offset: int = 0, finalize: bool = True) -> int:
+        """
+        Parse a log file.
+
+        Args:
+            filepath: Log file (plain, .gz or .bz2)
+            start_offset: Byte offset to resume a plain log file from
+            finalize: Finalize queue entries still open at end of file. With
+                      finalize=False they stay in postfix_tmp (see export_pending)
+                      and an unterminated last line is left for the next call.
+
+        Returns:
+            Byte offset parsing stopped at
+        """
         # Set current file for tracking
         self.current_file = filepath
 
@@ -916,18 +1564,30 @@ class LogParser:
         path = Path(filepath)
         if not path.exists():
             print(f"Error: File '{filepath}' not found", file=sys.stderr)
-            return
+            return start_offset
 
-        if path.suffix == '.gz':
-            fh = gzip.open(filepath, 'rt', encoding='utf-8', errors='ignore')
-        elif path.suffix in ['.bz', '.bz2']:
-            fh = bz2.open(filepath, 'rt', encoding='utf-8', errors='ignore')
-        else:
-            fh = open(filepath, 'r', encoding='utf-8', errors='ignore')
+        fh = open_log_file(filepath)
 
+        offset = start_offset
+        lines = 0
         try:
-            for line in fh:
-                line = line.strip()
+            if start_offset:
+                fh.seek(start_offset)
+
+            for raw in fh:
+                if not finalize and not raw.endswith(b'\n'):
+                    # Line is still being written, pick it up on the next call
+                    break
+                self.line_offset = offset
+                offset += len(raw)
+                lines += 1
+
+                # Only postfix and amavis lines are of interest: skip everything
+                # else before decoding and running the line pattern
+                if b'postfix' not in raw and b'amavis' not in raw:
+                    continue
+
+                line = raw.decode('utf-8', errors='ignore').strip()
                 if not line:
                     continue
 
@@ -936,6 +1596,9 @@ class LogParser:
                     continue
 
                 log_date, host, app, pid, msg = match.groups()
+                self.line_date = log_date
+                if self.first_line_date is None:
+                    self.first_line_date = log_date
 
                 if app.startswith('postfix'):
                     self.parse_postfix_line(log_date, host, app, pid, msg)
@@ -943,25 +1606,40 @@ class LogParser:
                     self.parse_amavis_line(log_date, host, app, pid, msg)
         finally:
             fh.close()
+            self.lines_read += lines
 
         # Finalize remaining postfix messages
-        for key in list(self.postfix_tmp.keys()):
-            obj = self.postfix_tmp.pop(key)
-            qid = obj['qid']
-            self._finalize_postfix_message(obj, qid)
+        if finalize:
+            self.finalize_pending()
+
+        return offset
 
-    def integrate_amavis_data(self):
+    def integrate_amavis_data(self, only_dirty: bool = False, record_ids: Optional[List[str]] = None):
         """
         Integrate Amavis data with messages.
         CRITICAL: Add recipients found in Amavis but not in Postfix (deduplication victims)
+
+        With only_dirty=True only records that are new, or whose queue / message
+        was finalized since the last call, are processed (incremental ingest).
+        With record_ids only the given records are processed (StreamTracer).
         """
         if self.debug:
             print(f"Integrating Amavis data...", file=sys.stderr)
 
         # qid_to_msg is already built in _finalize_postfix_message
 
+        if record_ids is not None:
+            records = [(rid, self.amavis_records[rid]) for rid in record_ids if rid in self.amavis_records]
+            self.amavis_dirty.difference_update(record_ids)
+        elif only_dirty:
+            records = [(rid, self.amavis_records[rid]) for rid in self.amavis_dirty if rid in self.amavis_records]
+            self.amavis_dirty.clear()
+        else:
+            records = list(self.amavis_records.items())
+            self.amavis_dirty.clear()
+
         # Process each Amavis record
-        for record_id, amav in self.amavis_records.items():
+        for record_id, amav in records:
             # Find the corresponding message
             msg_id = None
             msg = None
@@ -972,13 +1650,13 @@ class LogParser:
                 msg_id, msg = self.qid_to_msg[amav.queue_id]
                 qid = amav.queue_id
 
-            # Try to find by message_id (use first queue_id)
+            # Try to find by message_id (use the root queue, the one scanned before relaying)
             if not msg and amav.message_id and amav.message_id in self.messages:
                 msg_id = amav.message_id
-                queues = self.messages[amav.message_id]
-                if queues:
-                    qid = list(queues.keys())[0]
-                    msg = queues[qid]
+                chain = self.delivery_chain(msg_id)
+                if chain:
+                    qid = chain[0]
+                    msg = self.messages[msg_id][qid]
 
             # If still not found, create a new message entry
             if not msg and amav.message_id:
@@ -987,26 +1665,30 @@ class LogParser:
                 msg = Message(message_id=msg_id)
                 msg.sender = amav.sender
                 msg.arrive_time = amav.log_date
+                msg.arrive_num = self.arrive_number(msg.arrive_time)
                 msg.host = amav.host
                 msg.prev_ip = amav.from_ip
                 msg.source_file = self.current_file  # Record source file for Amavis-only messages
                 if amav.queue_id:
-                    msg.queue_ids.add(amav.queue_id)
+                    msg.queue_ids = (amav.queue_id,)
 
                 if msg_id not in self.messages:
                     self.messages[msg_id] = {}
                 self.messages[msg_id][qid] = msg
                 self.qid_to_msg[qid] = (msg_id, msg)
+                self.delivery_chains.pop(msg_id, None)
 
             if not msg:
                 continue
+            if self.search_index is not None:
+                self.changed_message_ids.add(msg_id)
 
             # KEY FIX: Add ALL recipients from Amavis
             for recip_addr in amav.recipients:
                 if recip_addr not in msg.recipients:
                     # This recipient was not in Postfix logs (likely deduplicated)
                     msg.recipients[recip_addr] = RecipientInfo(
-                        address=recip_addr,
+                        address=intern_str(recip_addr),
                         from_amavis_only=True,
                         status='processed'  # Indicate it was processed by Amavis
                     )
@@ -1020,106 +1702,811 @@ class LogParser:
                     r.amavis_id = record_id
 
 
-class MessageFilter:
-    """Filter messages based on search criteria"""
-
-    def __init__(self, args):
-        self.args = args
-        # Safely compile regex patterns with error handling to prevent regex injection
-        self.id_pattern = self._safe_compile(args.id, re.IGNORECASE if not args.id else 0) if args.id else None
-        self.sender_pattern = self._safe_compile(args.sender, re.IGNORECASE) if args.sender else None
-        self.recipient_pattern = self._safe_compile(args.recipient, re.IGNORECASE) if args.recipient else None
-        self.srchost_pattern = self._safe_compile(args.srchost, re.IGNORECASE) if args.srchost else None
-        self.desthost_pattern = self._safe_compile(args.desthost, re.IGNORECASE) if args.desthost else None
-
-    def _safe_compile(self, pattern: str, flags: int = 0):
-        """Safely compile regex pattern with error handling"""
-        try:
-            # Limit pattern length to prevent ReDoS
-            if len(pattern) > 500:
-                raise ValueError("Pattern too long (max 500 characters)")
-            return re.compile(pattern, flags)
-        except re.error as e:
-            raise ValueError(f"Invalid regex pattern: {e}")
-        except Exception as e:
-            raise ValueError(f"Invalid pattern: {e}")
+def parse_file_partial(filepath: str, year: int, debug: int = 0,
+                       start_offset: int = 0, pending: Optional[Dict] = None) -> Dict:
+    """
+    Parse one log file into partial, picklable results (process pool worker).
+
+    Returns a dict with the raw finalized queue entries ('finalized':
+    [(offset, key, qid, obj)]), Amavis records ('amavis': [(offset, record_id,
+    record)]), the queue entries and amavis lines still open at end of file
+    ('pending', 'saved_lines'), amavis continuation lines whose beginning is in
+    the previous file ('orphans'), the offset parsing stopped at and the time
+    range of the lines read ('first_time', 'last_time').
+    """
+    parser = LogParser(year, debug)
+    parser.import_pending(pending)
+    parser.finalized_objs = []
+    parser.orphan_continuations = []
+    amavis = []
+    parser.on_amavis = lambda record_id, record: amavis.append((parser.line_offset, record_id, record))
+    end_offset = parser.parse_file(filepath, start_offset=start_offset, finalize=False)
+    first_time = parser.first_line_date and logdate_to_number(parser.first_line_date, year)
+    last_time = parser.line_date and logdate_to_number(parser.line_date, year)
+    return {
+        'file': filepath,
+        'finalized': parser.finalized_objs,
+        'amavis': amavis,
+        'pending': parser.postfix_tmp,
+        'saved_lines': parser.saved_lines,
+        'orphans': parser.orphan_continuations,
+        'start_offset': start_offset,
+        'end_offset': end_offset,
+        'lines': parser.lines_read,
+        'first_time': int(first_time) if first_time else None,
+        'last_time': int(last_time) if last_time else None,
+    }
 
-    def matches(self, msg: Message) -> bool:
-        """Check if message matches all filter criteria"""
-        parser = LogParser(self.args.year)
 
-        # Message ID filter
-        if self.id_pattern and not self.id_pattern.search(msg.message_id or ''):
-            return False
+def _merge_postfix_obj(older: Dict, newer: Dict):
+    """Merge a queue entry left open in an older file into its continuation (in place)"""
+    for field_name, value in older.items():
+        if field_name != 'recipients' and field_name not in newer:
+            newer[field_name] = value
+    recipients = {}
+    for addr, info in older.get('recipients', {}).items():
+        recipients[addr] = dict(info)
+    for addr, info in newer.get('recipients', {}).items():
+        recipients.setdefault(addr, {}).update(info)
+    newer['recipients'] = recipients
 
-        # Time filter
-        if self.args.time:
-            start_time, end_time = self.args.time
-            if msg.arrive_time:
-                msg_time = parser.logdate_to_number(msg.arrive_time)
-                if msg_time:
-                    if start_time and msg_time < start_time:
-                        return False
-                    if end_time and msg_time > end_time:
-                        return False
 
-        # Sender filter
-        if self.sender_pattern and not self.sender_pattern.search(msg.sender or ''):
-            return False
+def merge_partial_results(parts, year: int, debug: int = 0, finalize: bool = True) -> LogParser:
+    """
+    Deterministically merge parse_file_partial() results into one LogParser.
 
-        # Recipient filter
-        if self.recipient_pattern:
-            matched = False
-            for recip in msg.recipients.values():
-                if self.recipient_pattern.search(recip.address):
-                    matched = True
-                    break
-                if recip.orig_recip and self.recipient_pattern.search(recip.orig_recip):
-                    matched = True
-                    break
-            if not matched:
-                return False
+    Parts must be in chronological order. Queue entries still open at the end
+    of a file are stitched with their continuation in the next file (rotation
+    boundary); entries that do not continue there are finalized, attributed to
+    the file they started in. With finalize=False the entries open at the end
+    of the last file stay in postfix_tmp for LogParser.ingest().
+    """
+    parser = LogParser(year, debug)
+    carry: Dict[str, Tuple[Dict, str]] = {}  # key -> (open queue entry, source file)
+    carry_saved: Dict[str, str] = {}
+
+    for part in parts:
+        filepath = part['file']
+        parser.lines_read += part['lines']
+
+        # Amavis lines split across the rotation boundary
+        parser.saved_lines = carry_saved
+        parser.current_file = filepath
+        for args in part['orphans']:
+            parser.parse_amavis_line(*args)
+        parser.saved_lines = {}
+
+        origin: Dict[int, str] = {}  # id(obj) -> file the stitched entry started in
+        for offset, key, qid, obj in part['finalized']:
+            if key in carry:
+                older, older_file = carry.pop(key)
+                _merge_postfix_obj(older, obj)
+                origin[id(obj)] = older_file
+            parser.current_file = origin.get(id(obj), filepath)
+            parser.line_offset = offset
+            parser._finalize_postfix_message(obj, qid)
+
+        parser.current_file = filepath
+        for offset, record_id, record in part['amavis']:
+            parser.add_amavis_record(record_id, record)
+
+        next_carry = {}
+        for key, obj in part['pending'].items():
+            source = origin.get(id(obj), filepath)
+            if key in carry:
+                older, source = carry.pop(key)
+                _merge_postfix_obj(older, obj)
+            if obj['qid'] == 'NOQUEUE':
+                # Rejects accumulate in one entry across files, as in a sequential parse
+                parser.current_file = source = filepath
+                parser._finalize_postfix_message(obj, obj['qid'])
+            next_carry[key] = (obj, source)
+
+        # Open at the end of the previous file but not continued in this one
+        for key, (obj, source) in carry.items():
+            if obj['qid'] == 'NOQUEUE':
+                next_carry[key] = (obj, source)  # Already stored, later files may add rejects
+                continue
+            parser.current_file = source
+            parser._finalize_postfix_message(obj, obj['qid'])
+
+        carry = next_carry
+        carry_saved = part['saved_lines']
+        parser.current_file = filepath
+
+    last_file = parser.current_file
+    if finalize:
+        for key, (obj, source) in carry.items():
+            parser.current_file = source
+            parser._finalize_postfix_message(obj, obj['qid'])
+        parser.current_file = last_file
+    else:
+        parser.postfix_tmp.update({key: obj for key, (obj, source) in carry.items()})
+        parser.saved_lines.update(carry_saved)
+    return parser
 
-        # Source host filter
-        if self.srchost_pattern:
-            hosts = [h for h in [msg.prev_host, msg.prev_ip] if h]
-            if not any(self.srchost_pattern.search(h) for h in hosts):
-                return False
 
-        # Destination host filter
-        if self.desthost_pattern:
-            hosts = []
-            for recip in msg.recipients.values():
-                if recip.next_host:
-                    hosts.append(recip.next_host.rstrip(':0123456789'))
-                if recip.next_ip:
-                    hosts.append(recip.next_ip.rstrip(':0123456789'))
-            if not any(self.desthost_pattern.search(h) for h in hosts):
-                return False
+def process_pool(jobs: int) -> ProcessPoolExecutor:
+    """
+    Process pool for parsing log files. Workers come from a fork server (spawned
+    where there is none) rather than a fork of this process: the Web UI uses
+    the pool from its threads, and a fork copies locks other threads hold.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context(method))
 
-        return True
 
+def parse_files_parallel(log_files: List[str], year: int, debug: int = 0,
+                         jobs: int = 0, finalize: bool = True,
+                         start_offsets: Optional[Dict[str, int]] = None) -> LogParser:
+    """
+    Parse log files in a process pool and merge the partial results.
 
-class OutputFormatter:
-    """Format and display trace results"""
+    Files are merged oldest first (by mtime) so queue IDs spanning a rotation
+    boundary are stitched together. jobs=0 uses one worker per CPU.
+    start_offsets: byte offset to start plain files at (see time_start_offsets)
+    """
+    files = [f for f in log_files if os.path.exists(f)]
+    for missing in set(log_files) - set(files):
+        print(f"Error: File '{missing}' not found", file=sys.stderr)
+    files.sort(key=lambda f: os.path.getmtime(f))
 
-    def __init__(self, parser: LogParser, amavis_records: Dict[str, AmavisRecord], qid_to_msg: Dict[str, Message]):
-        self.parser = parser
-        self.amavis_records = amavis_records
-        self.qid_to_msg = qid_to_msg
+    jobs = min(jobs or os.cpu_count() or 1, len(files))
+    if debug:
+        print(f"Parsing {len(files)} file(s) with {max(jobs, 1)} worker(s)...", file=sys.stderr)
 
-    def display_message(self, msg: Message, recipient_filter: Optional[re.Pattern] = None):
-        """Display a single message trace"""
-        # Display message ID
-        print(f"Message ID: {msg.message_id}")
+    offsets = [(start_offsets or {}).get(f, 0) for f in files]
+    if jobs <= 1:
+        parts = (parse_file_partial(f, year, debug, offset) for f, offset in zip(files, offsets))
+        return merge_partial_results(parts, year, debug, finalize)
 
-        # Display source file as separate field
-        if msg.source_file:
-            print(f"Log: {msg.source_file}")
+    with process_pool(jobs) as pool:
+        parts = pool.map(parse_file_partial, files, [year] * len(files), [debug] * len(files), offsets)
+        return merge_partial_results(parts, year, debug, finalize)
 
-        print(f"From: {msg.sender or 'unknown'}")
 
-        # Display subject if available
+def log_file_time_range(filepath: str, year: int) -> Tuple[Optional[int], Optional[int]]:
+    """
+    First and last timestamp of a log file (YYYYMMDDHHMMSS integers), without
+    reading the whole file: the first line, and the last line of a plain file.
+    A compressed file is not decompressed to its end; its mtime, which
+    gzip/bzip2 keep from the rotated log, bounds the last line instead.
+    None where a timestamp cannot be read.
+    """
+    first = last = None
+    try:
+        fh = open_log_file(filepath)
+        try:
+            for count, raw in enumerate(fh):
+                first = line_time(raw, year)
+                if first or count >= 100:
+                    break
+        finally:
+            fh.close()
+
+        if Path(filepath).suffix in DECOMPRESSORS:
+            mtime = datetime.fromtimestamp(os.path.getmtime(filepath))
+            last = int(f"{year}{mtime:%m%d%H%M%S}")
+        else:
+            with open(filepath, 'rb') as fh:
+                size = fh.seek(0, os.SEEK_END)
+                fh.seek(max(size - 65536, 0))
+                tail = fh.read().split(b'\n')
+                if size > 65536:
+                    tail = tail[1:]  # Partial line
+                for raw in reversed(tail):
+                    last = line_time(raw, year)
+                    if last:
+                        break
+    except (OSError, EOFError):
+        pass
+    return first, last
+
+
+def prune_log_files(log_files: List[str], time_window: Tuple[Optional[int], Optional[int]], year: int,
+                    index: Optional['LogIndex'] = None, debug: int = 0) -> List[str]:
+    """
+    Drop the log files that cannot contain lines in time_window ((start, end)
+    YYYYMMDDHHMMSS integers, either may be None), widened by TIME_SEEK_MARGIN
+    for the later queue stages of messages arriving in it. Time ranges come
+    from the index for files it is up to date with, otherwise from
+    log_file_time_range(). Files whose range is unknown or not ascending (year
+    change) are kept.
+    """
+    start, end = time_window
+    start = start and shift_time_number(start, -TIME_SEEK_MARGIN)
+    end = end and shift_time_number(end, TIME_SEEK_MARGIN)
+    known = index.time_ranges(log_files) if index else {}
+    kept = []
+    for filepath in log_files:
+        first, last = known.get(filepath) or log_file_time_range(filepath, year)
+        if first and last and first > last:
+            first = last = None
+        if (end and first and first > end) or (start and last and last < start):
+            if debug:
+                print(f"Skipping '{filepath}' ({first} - {last}), outside the time window", file=sys.stderr)
+            continue
+        kept.append(filepath)
+    return kept
+
+
+def find_time_offset(filepath: str, start: int, year: int) -> int:
+    """
+    Byte offset of a plain log file to start parsing from for a time window
+    beginning at start (YYYYMMDDHHMMSS): binary search on the line timestamps
+    for a line TIME_SEEK_MARGIN seconds before start, so queue entries already
+    in flight are picked up too. 0 if the file does not begin before that, or
+    its timestamps are not ascending.
+    """
+    target = shift_time_number(start, -TIME_SEEK_MARGIN)
+    first, last = log_file_time_range(filepath, year)
+    if not first or not last or not first < target <= last:
+        return 0
+
+    with open(filepath, 'rb') as fh:
+        low, high = 0, fh.seek(0, os.SEEK_END)
+        # The first whole line after low is before target, the first one after high is not
+        while high - low > 65536:
+            middle = (low + high) // 2
+            fh.seek(middle)
+            fh.readline()
+            timestamp = None
+            for _ in range(100):
+                raw = fh.readline()
+                if not raw:
+                    break
+                timestamp = line_time(raw, year)
+                if timestamp:
+                    break
+            if timestamp is not None and timestamp < target:
+                low = middle
+            else:
+                high = middle
+        fh.seek(low)
+        if low:
+            fh.readline()
+        return fh.tell()
+
+
+def time_start_offsets(log_files: List[str], time_window: Optional[Tuple[Optional[int], Optional[int]]],
+                       year: int, debug: int = 0) -> Dict[str, int]:
+    """Start offsets of the plain log files for a time window (see find_time_offset)"""
+    offsets = {}
+    if time_window and time_window[0]:
+        for filepath in log_files:
+            if Path(filepath).suffix not in DECOMPRESSORS and os.path.exists(filepath):
+                offset = find_time_offset(filepath, time_window[0], year)
+                if offset:
+                    offsets[filepath] = offset
+                    if debug:
+                        print(f"Starting '{filepath}' at byte {offset} for the time window", file=sys.stderr)
+    return offsets
+
+
+_REGEX_META = frozenset('.^$*+?{}[]|()\\')
+
+
+def _literal_prefix(pattern: str) -> Tuple[str, int]:
+    """
+    Return the literal text a regex starts with and the number of pattern
+    characters it spans. Escaped punctuation (e.g. '\\.') counts as literal;
+    a character followed by an optional quantifier ('*', '?', '{') does not.
+    """
+    literal = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break  # \d, \w, \b, ... are character classes / assertions
+            c = pattern[i + 1]
+            end = i + 2
+        elif c in _REGEX_META:
+            break
+        else:
+            end = i + 1
+        if end < len(pattern) and pattern[end] in '*?{':
+            break
+        literal.append(c)
+        i = end
+        if i < len(pattern) and pattern[i] == '+':
+            break  # 'x+' still starts with one 'x', but nothing after it is literal
+    return ''.join(literal), i
+
+
+# Scripts written without spaces between words (CJK ideographs, kana, hangul):
+# runs of them are indexed as overlapping character bigrams instead of words
+CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+SUBJECT_TERM_RE = re.compile(f'[{CJK_CHARS}]+|[^\\W_{CJK_CHARS}]+')
+CJK_RUN_RE = re.compile(f'[{CJK_CHARS}]')
+
+
+def subject_terms(text: str) -> List[str]:
+    """
+    Words and CJK character runs of a subject (or of a subject query),
+    NFKC-normalized (full-width letters and digits) and casefolded
+    """
+    return SUBJECT_TERM_RE.findall(unicodedata.normalize('NFKC', text).casefold())
+
+
+def subject_tokens(subject: str) -> Set[str]:
+    """Index tokens of a subject: its words, and the bigrams of its CJK runs"""
+    tokens = set()
+    for term in subject_terms(subject):
+        if len(term) > 1 and CJK_RUN_RE.match(term):
+            tokens.update(term[i:i + 2] for i in range(len(term) - 1))
+        else:
+            tokens.add(term)
+    return tokens
+
+
+def subject_matches(subject: Optional[str], terms: List[str]) -> bool:
+    """
+    Whether a subject contains all query terms (see subject_terms): CJK runs
+    anywhere in it, other words as the beginning of one of its words
+    """
+    if not subject:
+        return False
+    subject_text = unicodedata.normalize('NFKC', subject).casefold()
+    words = None
+    for term in terms:
+        if CJK_RUN_RE.match(term):
+            if term not in subject_text:
+                return False
+        else:
+            if words is None:
+                words = SUBJECT_TERM_RE.findall(subject_text)
+            if not any(word.startswith(term) for word in words):
+                return False
+    return True
+
+
+class _FieldIndex:
+    """Inverted index of one message field: value -> message ids"""
+
+    def __init__(self, with_domains: bool = False):
+        self.postings: Dict[str, Set[str]] = {}  # value -> message ids
+        self.by_lower: Dict[str, Set[str]] = {}  # lowercased value -> values
+        self.sorted_lower: List[str] = []  # sorted keys of by_lower (may hold removed keys)
+        self.unsorted: List[str] = []  # keys added since sorted_lower was last sorted
+        self.stale = 0  # removed keys still in sorted_lower
+        # Address fields: lowercased domain -> values (the domain index)
+        self.domains: Optional[_FieldIndex] = _FieldIndex() if with_domains else None
+
+    def add(self, value: str, msg_id: str):
+        ids = self.postings.get(value)
+        if ids is None:
+            ids = self.postings[value] = set()
+            lower = value.lower()
+            values = self.by_lower.get(lower)
+            if values is None:
+                values = self.by_lower[lower] = set()
+                self.unsorted.append(lower)
+            values.add(value)
+            if self.domains is not None and '@' in value:
+                self.domains.add(value.rsplit('@', 1)[1], value)
+        ids.add(msg_id)
+
+    def remove(self, value: str, msg_id: str):
+        ids = self.postings.get(value)
+        if ids is None:
+            return
+        ids.discard(msg_id)
+        if ids:
+            return
+        del self.postings[value]
+        lower = value.lower()
+        values = self.by_lower[lower]
+        values.discard(value)
+        if not values:
+            del self.by_lower[lower]
+            self.stale += 1
+        if self.domains is not None and '@' in value:
+            self.domains.remove(value.rsplit('@', 1)[1], value)
+
+    def sort(self):
+        """
+        Bring sorted_lower up to date with the keys added or removed. Called
+        when the index is updated: lookups only read it, so concurrent
+        searches can use the index.
+        """
+        if self.stale > len(self.by_lower):
+            self.sorted_lower = sorted(self.by_lower)
+            self.unsorted = []
+            self.stale = 0
+        elif self.unsorted:
+            # Sorted list plus a short tail: the merge is close to linear
+            self.sorted_lower.extend(self.unsorted)
+            self.sorted_lower.sort()
+            self.unsorted = []
+        if self.domains is not None:
+            self.domains.sort()
+
+    def _prefix_values(self, prefix: str) -> List[str]:
+        """Values whose lowercased form starts with prefix (binary search, see sort)"""
+        keys = self.sorted_lower
+        prefix = prefix.lower()
+        values = []
+        for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            values.extend(self.by_lower.get(keys[i], ()))
+        return values
+
+    def _candidate_values(self, pattern: str):
+        """Values that can possibly match pattern, narrowed with the indexes"""
+        if '|' in pattern:
+            return self.postings.keys()
+        if pattern.startswith('^'):
+            literal, length = _literal_prefix(pattern[1:])
+            if literal and pattern[1 + length:] == '$':
+                return self.by_lower.get(literal.lower(), ())  # Exact match
+            if literal:
+                return self._prefix_values(literal)
+        elif self.domains is not None:
+            # Any address containing 'user@dom' has a domain starting with 'dom'
+            literal, _ = _literal_prefix(pattern)
+            if '@' in literal:
+                domain_prefix = literal.split('@', 1)[1]
+                values = []
+                for domain in self.domains._prefix_values(domain_prefix):
+                    values.extend(self.domains.postings[domain])
+                return values
+        return self.postings.keys()
+
+    def lookup(self, regex) -> Set[str]:
+        """Message ids with a value matching regex (same semantics as regex.search)"""
+        ids = set()
+        for value in self._candidate_values(regex.pattern):
+            if regex.search(value):
+                ids.update(self.postings[value])
+        return ids
+
+
+class _TokenIndex:
+    """
+    Inverted index of subject tokens: token -> message ids. Lighter than
+    _FieldIndex, as most tokens (numbers, rare words) occur in one message
+    only: such a posting is the message id itself rather than a set.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, object] = {}  # token -> message id, or set of message ids
+        self.sorted_tokens: List[str] = []  # sorted tokens (may hold removed ones)
+        self.unsorted: List[str] = []  # tokens added since sorted_tokens was last sorted
+        self.stale = 0  # removed tokens still in sorted_tokens
+
+    def add(self, token: str, msg_id: str):
+        ids = self.postings.get(token)
+        if ids is None:
+            self.postings[token] = msg_id
+            self.unsorted.append(token)
+        elif isinstance(ids, set):
+            ids.add(msg_id)
+        elif ids != msg_id:
+            self.postings[token] = {ids, msg_id}
+
+    def remove(self, token: str, msg_id: str):
+        ids = self.postings.get(token)
+        if isinstance(ids, set):
+            ids.discard(msg_id)
+            if len(ids) > 1:
+                return
+            ids = next(iter(ids), None)
+            if ids is not None and ids != msg_id:
+                self.postings[token] = ids
+                return
+        elif ids is None or ids != msg_id:
+            return
+        del self.postings[token]
+        self.stale += 1
+
+    def get(self, token: str) -> Set[str]:
+        ids = self.postings.get(token)
+        if ids is None:
+            return set()
+        return ids if isinstance(ids, set) else {ids}
+
+    def sort(self):
+        """Bring sorted_tokens up to date (see _FieldIndex.sort)"""
+        if self.stale > len(self.postings):
+            self.sorted_tokens = sorted(self.postings)
+            self.unsorted = []
+            self.stale = 0
+        elif self.unsorted:
+            self.sorted_tokens.extend(self.unsorted)
+            self.sorted_tokens.sort()
+            self.unsorted = []
+
+    def prefix_ids(self, prefix: str) -> Set[str]:
+        """Message ids with a token starting with prefix (binary search, see sort)"""
+        tokens = self.sorted_tokens
+        ids = set()
+        for i in range(bisect.bisect_left(tokens, prefix), len(tokens)):
+            if not tokens[i].startswith(prefix):
+                break
+            if i and tokens[i] == tokens[i - 1]:
+                continue  # Re-added after a removal
+            ids.update(self.get(tokens[i]))
+        return ids
+
+    def containing_ids(self, text: str) -> Set[str]:
+        """Message ids with a token containing text (looks through the tokens, not the messages)"""
+        ids = set()
+        for token in [token for token in self.postings if text in token]:
+            ids.update(self.get(token))
+        return ids
+
+
+class SearchIndex:
+    """
+    Secondary indexes over the root queue stage of every message, used by
+    MessageFilter.candidates() so searches do not scan all messages.
+
+    Each field maps distinct values to message ids, so a regex is evaluated
+    once per distinct value rather than once per message; exact ('^x$'),
+    prefix ('^x') and domain ('@dom') patterns only look at values found by
+    binary search. Arrival times are kept in a sorted array for time windows.
+    Subjects are indexed by token (see subject_tokens), not by value.
+    """
+
+    def __init__(self, year: int):
+        self.year = year
+        self.message_ids = _FieldIndex()
+        self.senders = _FieldIndex(with_domains=True)
+        self.recipients = _FieldIndex(with_domains=True)
+        self.srchosts = _FieldIndex()
+        self.desthosts = _FieldIndex()
+        self.subjects = _TokenIndex()
+        self.times: List[Tuple[int, str]] = []  # sorted (arrive_num, message_id)
+        self.untimed: Set[str] = set()  # messages without a usable arrival time
+        self.entries: Dict[str, Tuple] = {}  # message_id -> what was indexed, for removal
+
+    def update(self, parser: LogParser, msg_ids):
+        """(Re)index the given message ids from parser"""
+        removed_times = set()
+        added_times = []
+        for msg_id in msg_ids:
+            old_time = self._remove(msg_id)
+            if old_time:
+                removed_times.add(old_time)
+            msg = parser.root_message(msg_id)
+            if msg:
+                new_time = self._add(msg_id, msg, parser)
+                if new_time:
+                    added_times.append(new_time)
+
+        # Keep the arrival time array sorted without quadratic inserts on big batches
+        if len(removed_times) > 64:
+            self.times = [t for t in self.times if t not in removed_times]
+        else:
+            for t in removed_times:
+                i = bisect.bisect_left(self.times, t)
+                if i < len(self.times) and self.times[i] == t:
+                    del self.times[i]
+        if len(added_times) > 64:
+            self.times.extend(added_times)
+            self.times.sort()
+        else:
+            for t in added_times:
+                bisect.insort(self.times, t)
+
+        for index in (self.message_ids, self.senders, self.recipients, self.srchosts, self.desthosts, self.subjects):
+            index.sort()
+
+    def _add(self, msg_id: str, msg: Message, parser: LogParser):
+        fields = []
+        fields.append((self.message_ids, msg_id))
+        fields.append((self.senders, msg.sender or ''))
+        for recip in msg.recipients.values():
+            fields.append((self.recipients, recip.address))
+            if recip.orig_recip:
+                fields.append((self.recipients, recip.orig_recip))
+            if recip.next_host:
+                fields.append((self.desthosts, recip.next_host.rstrip(':0123456789')))
+            if recip.next_ip:
+                fields.append((self.desthosts, recip.next_ip.rstrip(':0123456789')))
+        for host in (msg.prev_host, msg.prev_ip):
+            if host:
+                fields.append((self.srchosts, host))
+        for index, value in fields:
+            index.add(value, msg_id)
+        # Subject tokens are not kept in the entry, the subject is tokenized again for removal
+        if msg.subject:
+            for token in subject_tokens(msg.subject):
+                self.subjects.add(token, msg_id)
+
+        msg_time = msg.arrive_num
+        if not msg_time:
+            self.untimed.add(msg_id)
+        self.entries[msg_id] = (fields, msg_time, msg.subject)
+        return (msg_time, msg_id) if msg_time else None
+
+    def _remove(self, msg_id: str):
+        entry = self.entries.pop(msg_id, None)
+        if entry is None:
+            return None
+        fields, msg_time, subject = entry
+        for index, value in fields:
+            index.remove(value, msg_id)
+        if subject:
+            for token in subject_tokens(subject):
+                self.subjects.remove(token, msg_id)
+        if not msg_time:
+            self.untimed.discard(msg_id)
+        return (msg_time, msg_id) if msg_time else None
+
+    def subject_lookup(self, terms: List[str]) -> Set[str]:
+        """
+        Message ids whose subject may contain all terms (see subject_matches):
+        the intersection of the postings of each CJK bigram of the terms, and
+        of the words starting with each other term
+        """
+        ids = None
+        for term in terms:
+            if not CJK_RUN_RE.match(term):
+                found = [self.subjects.prefix_ids(term)]
+            elif len(term) == 1:
+                found = [self.subjects.containing_ids(term)]  # Only part of bigrams
+            else:
+                found = [self.subjects.get(term[i:i + 2]) for i in range(len(term) - 1)]
+            for term_ids in sorted(found, key=len):
+                ids = set(term_ids) if ids is None else ids & term_ids
+                if not ids:
+                    return set()
+        return ids if ids is not None else set()
+
+    def time_range(self, start_time: Optional[int], end_time: Optional[int]) -> Set[str]:
+        """Message ids arrived within [start_time, end_time] (plus those without a time)"""
+        lo = bisect.bisect_left(self.times, (start_time,)) if start_time else 0
+        # chr(0x10ffff) sorts after any message id with the same timestamp
+        hi = bisect.bisect_right(self.times, (end_time, chr(0x10ffff))) if end_time else len(self.times)
+        ids = {msg_id for _, msg_id in self.times[lo:hi]}
+        ids.update(self.untimed)
+        return ids
+
+
+class MessageFilter:
+    """Filter messages based on search criteria"""
+
+    def __init__(self, args):
+        self.args = args
+        # Safely compile regex patterns with error handling to prevent regex injection
+        self.id_pattern = self._safe_compile(args.id, re.IGNORECASE if not args.id else 0) if args.id else None
+        self.sender_pattern = self._safe_compile(args.sender, re.IGNORECASE) if args.sender else None
+        self.recipient_pattern = self._safe_compile(args.recipient, re.IGNORECASE) if args.recipient else None
+        self.srchost_pattern = self._safe_compile(args.srchost, re.IGNORECASE) if args.srchost else None
+        self.desthost_pattern = self._safe_compile(args.desthost, re.IGNORECASE) if args.desthost else None
+        # Subject words (not a regex), all of which must be in the subject
+        subject = getattr(args, 'subject', None)
+        self.subject_terms = subject_terms(subject) if subject else []
+        if subject and subject.strip() and not self.subject_terms:
+            raise ValueError("Subject search needs at least one word (punctuation is ignored)")
+        # Time window as YYYYMMDDHHMMSS integers, compared with Message.arrive_num
+        if args.time:
+            start_time, end_time = args.time
+            self.time_window = (int(start_time) if start_time else None, int(end_time) if end_time else None)
+        else:
+            self.time_window = None
+
+    def _safe_compile(self, pattern: str, flags: int = 0):
+        """Safely compile regex pattern with error handling"""
+        try:
+            # Limit pattern length to prevent ReDoS
+            if len(pattern) > 500:
+                raise ValueError("Pattern too long (max 500 characters)")
+            return re.compile(pattern, flags)
+        except re.error as e:
+            raise ValueError(f"Invalid regex pattern: {e}")
+        except Exception as e:
+            raise ValueError(f"Invalid pattern: {e}")
+
+    def candidates(self, index: SearchIndex) -> Optional[Set[str]]:
+        """
+        Message ids that may match, answered from the secondary indexes.
+        Returns None when no criterion is set (all messages are candidates).
+        """
+        sets = []
+        if self.id_pattern:
+            sets.append(index.message_ids.lookup(self.id_pattern))
+        if self.time_window:
+            sets.append(index.time_range(*self.time_window))
+        if self.sender_pattern:
+            sets.append(index.senders.lookup(self.sender_pattern))
+        if self.recipient_pattern:
+            sets.append(index.recipients.lookup(self.recipient_pattern))
+        if self.srchost_pattern:
+            sets.append(index.srchosts.lookup(self.srchost_pattern))
+        if self.desthost_pattern:
+            sets.append(index.desthosts.lookup(self.desthost_pattern))
+        if self.subject_terms:
+            sets.append(index.subject_lookup(self.subject_terms))
+        if not sets:
+            return None
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def matches(self, msg: Message) -> bool:
+        """Check if message matches all filter criteria"""
+        # Message ID filter
+        if self.id_pattern and not self.id_pattern.search(msg.message_id or ''):
+            return False
+
+        # Time filter
+        if self.time_window:
+            start_time, end_time = self.time_window
+            if msg.arrive_time:
+                msg_time = msg.arrive_num
+                if msg_time is None:
+                    msg_time = logdate_to_number(msg.arrive_time, self.args.year)
+                    msg_time = int(msg_time) if msg_time else None
+                if msg_time:
+                    if start_time and msg_time < start_time:
+                        return False
+                    if end_time and msg_time > end_time:
+                        return False
+
+        # Sender filter
+        if self.sender_pattern and not self.sender_pattern.search(msg.sender or ''):
+            return False
+
+        # Recipient filter
+        if self.recipient_pattern:
+            matched = False
+            for recip in msg.recipients.values():
+                if self.recipient_pattern.search(recip.address):
+                    matched = True
+                    break
+                if recip.orig_recip and self.recipient_pattern.search(recip.orig_recip):
+                    matched = True
+                    break
+            if not matched:
+                return False
+
+        # Source host filter
+        if self.srchost_pattern:
+            hosts = [h for h in [msg.prev_host, msg.prev_ip] if h]
+            if not any(self.srchost_pattern.search(h) for h in hosts):
+                return False
+
+        # Destination host filter
+        if self.desthost_pattern:
+            hosts = []
+            for recip in msg.recipients.values():
+                if recip.next_host:
+                    hosts.append(recip.next_host.rstrip(':0123456789'))
+                if recip.next_ip:
+                    hosts.append(recip.next_ip.rstrip(':0123456789'))
+            if not any(self.desthost_pattern.search(h) for h in hosts):
+                return False
+
+        # Subject filter
+        if self.subject_terms and not subject_matches(msg.subject, self.subject_terms):
+            return False
+
+        return True
+
+
+class OutputFormatter:
+    """Format and display trace results"""
+
+    def __init__(self, parser: LogParser, amavis_records: Dict[str, AmavisRecord], qid_to_msg: Dict[str, Message]):
+        self.parser = parser
+        self.amavis_records = amavis_records
+        self.qid_to_msg = qid_to_msg
+
+    def display_message(self, msg: Message, recipient_filter: Optional[re.Pattern] = None):
+        """Display a single message trace"""
+        # Display message ID
+        print(f"Message ID: {msg.message_id}")
+
+        # Display source file as separate field
+        if msg.source_file:
+            print(f"Log: {msg.source_file}")
+
+        print(f"From: {msg.sender or 'unknown'}")
+
+        # Display subject if available
         if msg.subject:
             print(f"Subject: {msg.subject}")
 
@@ -1204,6 +2591,322 @@ class OutputFormatter:
                 # Recursively display the next hop
                 self._display_recipient(next_msg, next_recip, indent, addr)
 
+    def message_to_trace(self, msg: Message, recipient_filter: Optional[re.Pattern] = None) -> Dict:
+        """
+        Trace of a message as a JSON serializable dict (--ndjson), with the
+        same content as display_message: each recipient lists its delivery
+        hops, following next_queue_id through the queues of the message.
+        """
+        recipients = []
+        for recip in sorted(msg.recipients.values(), key=lambda r: r.address):
+            entry = {
+                'address': recip.address,
+                'orig_recip': recip.orig_recip,
+                'from_amavis_only': recip.from_amavis_only,
+            }
+            if not recipient_filter or recipient_filter.search(recip.address) or (
+                    recip.orig_recip and recipient_filter.search(recip.orig_recip)):
+                entry['hops'] = self._recipient_hops(msg, recip)
+            recipients.append(entry)
+
+        return {
+            'message_id': msg.message_id,
+            'log': msg.source_file,
+            'from': msg.sender,
+            'subject': msg.subject,
+            'arrive_time': msg.arrive_time,
+            'recipients': recipients,
+        }
+
+    def _recipient_hops(self, msg: Message, recip: RecipientInfo) -> List[Dict]:
+        """Delivery hops of a recipient (the iterative counterpart of _display_recipient)"""
+        hops = []
+        for msg, recip in self.parser.delivery_hops(msg, recip):
+            amav = None
+            if recip.amavis_id and recip.amavis_id in self.amavis_records:
+                amav = self.amavis_records[recip.amavis_id]
+            elif recip.next_queue_id and recip.next_queue_id in self.amavis_records:
+                amav = self.amavis_records[recip.next_queue_id]
+
+            hops.append({
+                'queue_id': msg.queue_ids[0] if msg.queue_ids else None,
+                'arrive_time': msg.arrive_time,
+                'leave_time': recip.leave_time,
+                'host': msg.host,
+                'prev_host': msg.prev_host,
+                'prev_ip': msg.prev_ip,
+                'next_host': recip.next_host,
+                'next_ip': recip.next_ip,
+                'status': recip.status,
+                'status_msg': recip.status_msg,
+                'amavis': {
+                    'log_date': amav.log_date,
+                    'host': amav.host,
+                    'disposition': amav.disposition,
+                    'reason': amav.reason,
+                    'hits': amav.hits,
+                    'ms': amav.ms,
+                } if amav else None,
+            })
+        return hops
+
+LOCAL_RELAY_PREFIXES = ('127.', '::1')
+
+
+class StreamTracer:
+    """
+    Emit message traces while the logs are being parsed (--stream).
+
+    A message is emitted as soon as none of its queue entries is open any more
+    (all were 'removed'), the queues it was reinjected into by a local content
+    filter are there too, and an Amavis record for it has been seen. Messages
+    Amavis never reports on are emitted once nothing happened to them for
+    `grace` seconds of log time. Emitted messages and their Amavis records are
+    dropped from the parser, so memory is bounded by the mail in flight
+    instead of by the size of the logs.
+    """
+
+    def __init__(self, parser: LogParser, emit: Callable[[str], None], grace: int = 60):
+        self.parser = parser
+        self.emit = emit  # emit(message_id), called while the message is still in parser
+        self.grace = grace
+        self.waiting: 'OrderedDict[str, int]' = OrderedDict()  # message_id -> last activity (log time)
+        self.unmatched_amavis: 'OrderedDict[str, int]' = OrderedDict()  # amavis record id -> log time
+        self.emitted: 'OrderedDict[str, bool]' = OrderedDict()  # recently emitted message ids
+        self.emitted_count = 0
+        parser.open_queues = {}
+        parser.on_finalize = self._on_finalize
+        parser.on_amavis = self._on_amavis
+
+    def _log_time(self) -> int:
+        """Time of the line being parsed, in seconds"""
+        number = self.parser.arrive_number(self.parser.line_date)
+        if not number:
+            return 0
+        return calendar.timegm((number // 10000000000, number // 100000000 % 100, number // 1000000 % 100,
+                                number // 10000 % 100, number // 100 % 100, number % 100, 0, 0, 0))
+
+    def _on_finalize(self, qid: str, msg: Message):
+        now = self._log_time()
+        msg_id = msg.message_id
+        self.waiting[msg_id] = now
+        self.waiting.move_to_end(msg_id)
+        if self._is_complete(msg_id):
+            self._emit(msg_id)
+        self._expire(now)
+
+    def _on_amavis(self, record_id: str, record: AmavisRecord):
+        now = self._log_time()
+        self.unmatched_amavis[record_id] = now
+        self.unmatched_amavis.move_to_end(record_id)
+        msg_id = record.message_id
+        if not msg_id and record.queue_id in self.parser.qid_to_msg:
+            msg_id = self.parser.qid_to_msg[record.queue_id][0]
+        if msg_id in self.waiting and self._is_complete(msg_id):
+            self._emit(msg_id)
+        self._expire(now)
+
+    def _amavis_ids(self, msg_id: str) -> List[str]:
+        """Ids of the Amavis records belonging to a message"""
+        records = self.parser.amavis_records
+        ids = set(self.parser.amavis_by_message_id.get(msg_id, ()))
+        for qid, msg in self.parser.messages.get(msg_id, {}).items():
+            if qid in records:
+                ids.add(qid)
+            for recip in msg.recipients.values():
+                if recip.amavis_id in records:
+                    ids.add(recip.amavis_id)
+                if recip.next_queue_id in records:
+                    ids.add(recip.next_queue_id)
+        return sorted(ids)
+
+    def _is_complete(self, msg_id: str) -> bool:
+        if msg_id in self.parser.open_queues:
+            return False
+        queues = self.parser.messages.get(msg_id, {})
+        for msg in queues.values():
+            for recip in msg.recipients.values():
+                # Relayed to a local content filter: the reinjected queue must show up
+                if (recip.next_queue_id and recip.next_queue_id not in queues
+                        and recip.next_ip and recip.next_ip.startswith(LOCAL_RELAY_PREFIXES)):
+                    return False
+        return bool(self._amavis_ids(msg_id))
+
+    def _emit(self, msg_id: str):
+        """Integrate the Amavis records of a message, emit it and drop it"""
+        parser = self.parser
+        record_ids = self._amavis_ids(msg_id)
+        parser.integrate_amavis_data(record_ids=record_ids)
+        if msg_id in parser.messages:
+            self.emit(msg_id)
+            self.emitted_count += 1
+
+        for qid, msg in parser.messages.pop(msg_id, {}).items():
+            if parser.qid_to_msg.get(qid, (None, None))[1] is msg:
+                del parser.qid_to_msg[qid]
+            if qid == 'NOQUEUE':
+                # Rejects keep accumulating in one open queue entry: start over,
+                # so each reject is emitted once and the entry does not grow
+                obj = parser.postfix_tmp.get(f"{qid}:{msg.host}")
+                if obj:
+                    obj['recipients'].clear()
+        for record_id in record_ids:
+            parser.amavis_records.pop(record_id, None)
+            self.unmatched_amavis.pop(record_id, None)
+        parser.amavis_by_message_id.pop(msg_id, None)
+        parser.delivery_chains.pop(msg_id, None)
+        self.waiting.pop(msg_id, None)
+
+        self.emitted[msg_id] = True
+        if len(self.emitted) > 100000:
+            self.emitted.popitem(last=False)
+
+    def _expire(self, now: int):
+        """Emit messages idle for the grace window; handle Amavis records nobody claimed"""
+        while self.waiting:
+            msg_id, last_seen = next(iter(self.waiting.items()))
+            if now - last_seen < self.grace:
+                break
+            if msg_id in self.parser.open_queues:
+                # Still queued (e.g. deferred): wait for 'removed' or the end of the logs
+                self.waiting.move_to_end(msg_id)
+                self.waiting[msg_id] = now
+                continue
+            self._emit(msg_id)
+
+        while self.unmatched_amavis:
+            record_id, seen = next(iter(self.unmatched_amavis.items()))
+            if now - seen < self.grace:
+                break
+            del self.unmatched_amavis[record_id]
+            self._amavis_timeout(record_id)
+
+    def _amavis_timeout(self, record_id: str):
+        parser = self.parser
+        record = parser.amavis_records.get(record_id)
+        if record is None:
+            return
+        msg_id = record.message_id
+        if not msg_id and record.queue_id in parser.qid_to_msg:
+            msg_id = parser.qid_to_msg[record.queue_id][0]
+        if msg_id in self.waiting:
+            return  # Emitted together with its message
+        if msg_id in self.emitted or not record.message_id:
+            # Late record of a message already emitted, or nothing to attach it to
+            parser.amavis_records.pop(record_id, None)
+            parser.amavis_dirty.discard(record_id)
+            return
+        # Amavis-only message (see integrate_amavis_data)
+        parser.integrate_amavis_data(record_ids=[record_id])
+        self._emit(msg_id)
+
+    def flush(self):
+        """Emit everything still held at the end of the logs"""
+        for msg_id in list(self.waiting):
+            self._emit(msg_id)
+        for record_id in list(self.unmatched_amavis):
+            self.unmatched_amavis.pop(record_id, None)
+            self._amavis_timeout(record_id)
+        for msg_id in list(self.parser.messages):
+            self._emit(msg_id)
+
+
+STATS_TOP = 20  # Rows of the top senders / recipient domains / relays tables
+
+
+def trace_statistics(parser: LogParser, msg_ids=None, msg_filter: Optional['MessageFilter'] = None,
+                     top: int = STATS_TOP) -> Dict:
+    """
+    Aggregate the parsed traces in a single pass: top senders and recipient
+    domains, delivery status per relay, Amavis disposition/reason and hourly
+    volume (by arrival time of the first queue stage).
+
+    msg_ids: messages to aggregate (e.g. MessageFilter.candidates()), default all;
+    msg_filter: only count the messages it matches.
+    """
+    senders = Counter()
+    domains = Counter()
+    statuses = Counter()
+    relays = defaultdict(Counter)  # relay -> status -> recipients
+    amavis = Counter()  # (disposition, reason) -> scans
+    hourly = Counter()  # YYYYMMDDHH -> messages
+    message_count = recipient_count = 0
+
+    for msg_id in (parser.messages if msg_ids is None else msg_ids):
+        first_msg = parser.root_message(msg_id)
+        if not first_msg or not first_msg.recipients:
+            continue
+        if msg_filter and not msg_filter.matches(first_msg):
+            continue
+        message_count += 1
+        senders[first_msg.sender or '<>'] += 1
+        if first_msg.arrive_num:
+            hourly[first_msg.arrive_num // 10000] += 1
+        for recip in first_msg.recipients.values():
+            recipient_count += 1
+            domains[recip.address.rsplit('@', 1)[-1].lower()] += 1
+
+        # Delivery status of every queue stage (relay to Amavis, then to the mailbox, ...)
+        amavis_ids = set()
+        for msg in parser.messages.get(msg_id, {}).values():
+            for recip in msg.recipients.values():
+                if recip.status:
+                    statuses[recip.status] += 1
+                    if recip.status != 'reject':
+                        relays[recip.next_host or recip.next_ip or '-'][recip.status] += 1
+                if recip.amavis_id:
+                    amavis_ids.add(recip.amavis_id)
+        for record_id in amavis_ids:
+            record = parser.amavis_records.get(record_id)
+            if record:
+                amavis[(record.disposition, record.reason)] += 1
+
+    # Relays with the most deferred/bounced deliveries first
+    relay_rows = sorted(relays.items(), key=lambda item: (-(item[1]['deferred'] + item[1]['bounced']),
+                                                          -sum(item[1].values()), item[0]))
+    return {
+        'messages': message_count,
+        'recipients': recipient_count,
+        'statuses': dict(statuses.most_common()),
+        'top_senders': [{'sender': sender, 'count': count} for sender, count in senders.most_common(top)],
+        'top_recipient_domains': [{'domain': domain, 'count': count}
+                                  for domain, count in domains.most_common(top)],
+        'relays': [{'relay': relay, 'sent': counts['sent'], 'deferred': counts['deferred'],
+                    'bounced': counts['bounced'], 'total': sum(counts.values())}
+                   for relay, counts in relay_rows[:top]],
+        'amavis': [{'disposition': disposition, 'reason': reason, 'count': count}
+                   for (disposition, reason), count in amavis.most_common()],
+        'hourly': [{'hour': f"{hour // 1000000}-{hour // 10000 % 100:02d}-{hour // 100 % 100:02d} "
+                            f"{hour % 100:02d}:00", 'count': hourly[hour]}
+                   for hour in sorted(hourly)],
+    }
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None where /proc is not available)"""
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def memory_report(parser: LogParser, base_rss: Optional[int] = None) -> str:
+    """
+    Describe the memory held by the parsed log data, with a per-message
+    figure for sizing the host. base_rss is the RSS measured before parsing.
+    """
+    queue_count = sum(len(queues) for queues in parser.messages.values())
+    counts = (f"{len(parser.messages):,} messages, {queue_count:,} queue stages, "
+              f"{len(parser.amavis_records):,} amavis records")
+    rss = current_rss()
+    if rss is None:
+        return f"Memory: {counts} (RSS not available)"
+    used = rss - (base_rss or 0)
+    per_message = used / max(len(parser.messages), 1)
+    return (f"Memory: RSS {rss / 1048576:.1f} MB, {used / 1048576:.1f} MB for {counts} "
+            f"(~{per_message / 1024:.2f} KB per message)")
+
 
 def sort_files_by_mtime(files: List[str]) -> List[str]:
     """Sort files by modification time (newest first)"""
@@ -1211,35 +2914,1028 @@ def sort_files_by_mtime(files: List[str]) -> List[str]:
     return [f for f, _ in sorted(file_paths, key=lambda x: x[1], reverse=True)]
 
 
+class LogIndex:
+    """
+    Persistent SQLite index of parsed log files.
+
+    The raw queue entries finalized in a log file and its Amavis records are
+    stored per file together with the file's inode, size, mtime and the byte
+    offset parsing reached. The entries still open at the end of the file are
+    saved alongside them, so loading stitches queue IDs spanning a rotation
+    like a sequential parse. Rotated (compressed) files are parsed only once;
+    a plain log file that only grew is resumed from the stored offset, so only
+    the appended tail is read again.
+    """
+
+    SCHEMA_VERSION = '4'
+
+    def __init__(self, db_path: str, year: int, debug: int = 0, jobs: int = 0):
+        self.db_path = db_path
+        self.year = year
+        self.debug = debug
+        self.jobs = jobs  # Worker processes for parsing new files (0 = one per CPU)
+        self.lock = threading.Lock()
+        self.lines_read = 0  # Log lines parsed into the index by this process
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=60)
+
+    def _init_db(self):
+        """Create the schema, dropping an index written by an incompatible version"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row and row[0] != self.SCHEMA_VERSION:
+                if self.debug:
+                    debug_print(f"Index schema {row[0]} is outdated, rebuilding {self.db_path}")
+                for table in ('files', 'queues', 'amavis'):
+                    conn.execute(f'DROP TABLE IF EXISTS {table}')
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY, dev INTEGER, inode INTEGER, size INTEGER,
+                    mtime REAL, offset INTEGER, pending TEXT, indexed_at REAL,
+                    first_time INTEGER, last_time INTEGER);
+                CREATE TABLE IF NOT EXISTS queues (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT, inode INTEGER,
+                    offset INTEGER, key TEXT, qid TEXT, data TEXT);
+                CREATE INDEX IF NOT EXISTS queues_path ON queues (path, id);
+                CREATE TABLE IF NOT EXISTS amavis (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT, inode INTEGER,
+                    offset INTEGER, record_id TEXT, data TEXT);
+                CREATE INDEX IF NOT EXISTS amavis_path ON amavis (path, id);
+            ''')
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (self.SCHEMA_VERSION,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _is_compressed(filepath: str) -> bool:
+        return Path(filepath).suffix in ['.gz', '.bz', '.bz2']
+
+    def _drop_file(self, conn: sqlite3.Connection, filepath: str):
+        for table in ('files', 'queues', 'amavis'):
+            conn.execute(f'DELETE FROM {table} WHERE path = ?', (filepath,))
+
+    def _rename_file(self, conn: sqlite3.Connection, old_path: str, new_path: str):
+        self._drop_file(conn, new_path)
+        for table in ('files', 'queues', 'amavis'):
+            conn.execute(f'UPDATE {table} SET path = ? WHERE path = ?', (new_path, old_path))
+
+    def update(self, log_files: List[str], tails: Optional[Dict[str, Tuple[int, Dict]]] = None) -> bool:
+        """
+        Bring the index up to date for the given files.
+
+        tails: filled with path -> (inode, parse_file_partial() result) of the
+        files only parsed from their stored offset (see LogParser.ingest_part)
+
+        Returns:
+            True if anything was (re)indexed
+        """
+        changed = False
+        with self.lock:
+            conn = self._connect()
+            try:
+                rows = {row[0]: row for row in conn.execute(
+                    'SELECT path, dev, inode, size, mtime, offset, pending FROM files')}
+
+                stats = {}
+                for filepath in log_files:
+                    try:
+                        stats[filepath] = os.stat(filepath)
+                    except OSError:
+                        pass
+
+                # Follow logrotate renames (same inode, new path) instead of re-parsing
+                for filepath, st in stats.items():
+                    row = rows.get(filepath)
+                    if row and (row[1], row[2]) == (st.st_dev, st.st_ino):
+                        continue
+                    for old_path, old_row in list(rows.items()):
+                        if old_path == filepath or (old_row[1], old_row[2]) != (st.st_dev, st.st_ino):
+                            continue
+                        if self._is_compressed(old_path) != self._is_compressed(filepath) or old_row[5] > st.st_size:
+                            continue
+                        try:
+                            old_st = os.stat(old_path)
+                            if (old_st.st_dev, old_st.st_ino) == (st.st_dev, st.st_ino):
+                                continue
+                        except OSError:
+                            pass
+                        if self.debug:
+                            debug_print(f"Index: {old_path} was rotated to {filepath}")
+                        self._rename_file(conn, old_path, filepath)
+                        rows[filepath] = (filepath,) + old_row[1:]
+                        del rows[old_path]
+                        changed = True
+                        break
+
+                # Forget files that no longer exist
+                for filepath in list(rows):
+                    if filepath not in stats and not os.path.exists(filepath):
+                        self._drop_file(conn, filepath)
+                        del rows[filepath]
+
+                full_parse = []
+                for filepath, st in stats.items():
+                    row = rows.get(filepath)
+                    if row and tuple(row[1:5]) == (st.st_dev, st.st_ino, st.st_size, st.st_mtime):
+                        continue
+
+                    changed = True
+                    if (row and not self._is_compressed(filepath)
+                            and (row[1], row[2]) == (st.st_dev, st.st_ino) and row[5] <= st.st_size):
+                        # Appended tail only
+                        if self.debug:
+                            debug_print(f"Index: parsing {filepath} (tail from offset {row[5]})")
+                        pending = json.loads(row[6]) if row[6] else None
+                        part = parse_file_partial(filepath, self.year, self.debug, row[5], pending)
+                        self._store_part(conn, part, st)
+                        conn.commit()
+                        if tails is not None:
+                            tails[filepath] = (st.st_ino, part)
+                    else:
+                        self._drop_file(conn, filepath)
+                        full_parse.append((filepath, st))
+
+                if full_parse:
+                    if self.debug:
+                        debug_print(f"Index: parsing {len(full_parse)} file(s)")
+                    files = [filepath for filepath, st in full_parse]
+                    jobs = min(self.jobs or os.cpu_count() or 1, len(files))
+                    if jobs <= 1:
+                        parts = (parse_file_partial(f, self.year, self.debug) for f in files)
+                        for part, (filepath, st) in zip(parts, full_parse):
+                            self._store_part(conn, part, st)
+                            conn.commit()
+                    else:
+                        with process_pool(jobs) as pool:
+                            parts = pool.map(parse_file_partial, files,
+                                             [self.year] * len(files), [self.debug] * len(files))
+                            for part, (filepath, st) in zip(parts, full_parse):
+                                self._store_part(conn, part, st)
+                                conn.commit()
+                conn.commit()
+            finally:
+                conn.close()
+        return changed
+
+    def _store_part(self, conn: sqlite3.Connection, part: Dict, st: os.stat_result):
+        """Store parse_file_partial() results of a file (or of its new tail)"""
+        filepath = part['file']
+        self.lines_read += part['lines']
+        conn.executemany(
+            'INSERT INTO queues (path, inode, offset, key, qid, data) VALUES (?, ?, ?, ?, ?, ?)',
+            [(filepath, st.st_ino, offset, key, qid, json.dumps(obj))
+             for offset, key, qid, obj in part['finalized']])
+        conn.executemany(
+            'INSERT INTO amavis (path, inode, offset, record_id, data) VALUES (?, ?, ?, ?, ?)',
+            [(filepath, st.st_ino, offset, record_id, json.dumps(amavis_to_dict(record)))
+             for offset, record_id, record in part['amavis']])
+        orphans = part['orphans']
+        if part['start_offset']:
+            # Appended tail: continuation lines of the previous file were found by the first parse
+            row = conn.execute('SELECT pending FROM files WHERE path = ?', (filepath,)).fetchone()
+            if row and row[0]:
+                orphans = json.loads(row[0]).get('orphans', []) + orphans
+        pending = {'postfix_tmp': part['pending'], 'saved_lines': part['saved_lines'], 'orphans': orphans}
+        # Without the year (MMDDHHMMSS): it comes from --year, which may differ when the ranges are used
+        first_time, last_time = (t and t % 10 ** 10 for t in (part['first_time'], part['last_time']))
+        if part['start_offset']:
+            # Appended tail: the file still begins where it did
+            row = conn.execute('SELECT first_time, last_time FROM files WHERE path = ?', (filepath,)).fetchone()
+            if row:
+                first_time, last_time = row[0] or first_time, last_time or row[1]
+        conn.execute(
+            'INSERT OR REPLACE INTO files (path, dev, inode, size, mtime, offset, pending, indexed_at, '
+            'first_time, last_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (filepath, st.st_dev, st.st_ino, st.st_size, st.st_mtime, part['end_offset'],
+             json.dumps(pending), time.time(), first_time, last_time))
+
+        if self.debug:
+            debug_print(f"Index: {filepath}: {len(part['finalized'])} queue entries, "
+                        f"{len(part['amavis'])} amavis records")
+
+    def time_ranges(self, log_files: List[str]) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+        """First and last timestamp (in self.year) of the given files the index is up to date with"""
+        ranges = {}
+        conn = self._connect()
+        try:
+            for filepath in log_files:
+                row = conn.execute('SELECT dev, inode, size, mtime, first_time, last_time FROM files '
+                                   'WHERE path = ?', (filepath,)).fetchone()
+                try:
+                    st = os.stat(filepath)
+                except OSError:
+                    continue
+                if row and tuple(row[:4]) == (st.st_dev, st.st_ino, st.st_size, st.st_mtime):
+                    ranges[filepath] = tuple(t and int(f"{self.year}{t:010d}") for t in row[4:6])
+        finally:
+            conn.close()
+        return ranges
+
+    def load(self, log_files: List[str], resumable: bool = False) -> LogParser:
+        """
+        Build a LogParser from the index, as if the files were parsed in order.
+
+        Log files must be given oldest first: the stored results are merged
+        with merge_partial_results(), so queue entries still open at the end
+        of a file are stitched with their continuation in the next one. The
+        entries open at the end of the last file are finalized in memory only.
+
+        With resumable=True they stay open in the parser instead, together with
+        the offsets of the plain (live) log files, so LogParser.ingest()
+        continues where the index stopped.
+        """
+        positions = {}
+        conn = self._connect()
+        try:
+            parts = []
+            for filepath in log_files:
+                row = conn.execute('SELECT pending, inode, offset FROM files WHERE path = ?', (filepath,)).fetchone()
+                if not row:
+                    continue
+                state = json.loads(row[0]) if row[0] else {}
+                pending = state.get('postfix_tmp', {})
+                # NOQUEUE rejects stay open while listed as finalized: as in the parse,
+                # both must be the same entry for the merge to accumulate them
+                finalized = [
+                    (offset, key, qid, pending[key] if qid == 'NOQUEUE' and key in pending else json.loads(data))
+                    for offset, key, qid, data in conn.execute(
+                        'SELECT offset, key, qid, data FROM queues WHERE path = ? ORDER BY id', (filepath,))]
+                amavis = [
+                    (offset, record_id, amavis_from_dict(json.loads(data)))
+                    for offset, record_id, data in conn.execute(
+                        'SELECT offset, record_id, data FROM amavis WHERE path = ? ORDER BY id', (filepath,))]
+                parts.append({
+                    'file': filepath,
+                    'finalized': finalized,
+                    'amavis': amavis,
+                    'pending': pending,
+                    'saved_lines': state.get('saved_lines', {}),
+                    'orphans': state.get('orphans', []),
+                    'lines': 0,
+                })
+                if not self._is_compressed(filepath):
+                    positions[filepath] = (row[1], row[2])
+        finally:
+            conn.close()
+
+        parser = merge_partial_results(parts, self.year, self.debug, finalize=not resumable)
+        if resumable:
+            parser.file_positions.update(positions)
+        return parser
+
+
+SOAP_ENVELOPE_NS = 'http://www.w3.org/2003/05/soap-envelope'
+ZIMBRA_ADMIN_SOAP_URL = 'https://localhost:7071/service/admin/soap/'
+ZIMBRA_LOCALCONFIG = '/opt/zimbra/conf/localconfig.xml'
+MAILBOX_SEARCH_WORKERS = 8  # Mailboxes searched at the same time when viewing an email
+STREAM_BATCH_SIZE = 20  # Search results rendered per chunk of a streamed response
+DOWNLOAD_BLOCK_SIZE = 1 << 16  # Bytes of a raw message passed on at a time when downloading it
+DIRECTORY_CACHE_TTL = 600  # Seconds internal domains and account existence are cached
+LOCATION_CACHE_TTL = 3600  # Seconds a (Message-ID, account) -> mailbox item ID lookup is cached
+MESSAGE_CACHE_SIZE = 16  # Emails read from mailboxes kept for switching between the email and its headers
+MESSAGE_CACHE_TTL = 300  # Seconds an email read from a mailbox is kept
+MESSAGE_CACHE_MAX_CHARS = 10 << 20  # Larger emails are not kept
+STATS_CACHE_TTL = 60  # Seconds a /stats aggregation is reused while no new log lines were parsed
+ADMIN_NS = '{urn:zimbraAdmin}'
+MAIL_NS = '{urn:zimbraMail}'
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after being set.
+    Hits and misses are counted to show how well the cache works.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: 'OrderedDict[object, Tuple[object, float]]' = OrderedDict()  # key -> (value, expires at)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key, self._MISSING)
+            if entry is not self._MISSING and entry[1] > time.time():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not self._MISSING:
+                del self.entries[key]
+            self.misses += 1
+            return default
+
+    def __contains__(self, key) -> bool:
+        """Whether a live entry exists, without counting a hit or miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and entry[1] > time.time()
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.time() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or all of them when no key is given"""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class MailboxMessage:
+    """
+    Raw content of an email read from a mailbox. The MIME tree and the header
+    block are parsed on first use and kept with it, so when it is cached
+    (WebUI.message_cache) the email and headers views share one parse. Part
+    payloads stay encoded until a view asks for them.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self._message: Optional[email.message.Message] = None
+        self._split: Optional[Tuple[str, str]] = None
+
+    @property
+    def message(self) -> email.message.Message:
+        if self._message is None:
+            self._message = message_from_string(self.content)
+        return self._message
+
+    def split(self) -> Tuple[str, str]:
+        """(header block, body) on each side of the first blank line, ('', '') without one"""
+        if self._split is None:
+            headers_end = self.content.find('\n\n')
+            if headers_end != -1:
+                self._split = (self.content[:headers_end], self.content[headers_end + 2:])
+            else:
+                headers_end = self.content.find('\r\n\r\n')
+                if headers_end != -1:
+                    self._split = (self.content[:headers_end], self.content[headers_end + 4:])
+                else:
+                    self._split = ('', '')
+        return self._split
+
+
+class ZimbraSoapError(Exception):
+    """Fault returned by the Zimbra SOAP service (code e.g. 'account.NO_SUCH_ACCOUNT')"""
+
+    def __init__(self, code: str, reason: str = ''):
+        super().__init__(f"{code}: {reason}" if reason else code)
+        self.code = code
+        self.reason = reason
+
+
+class ZimbraSoapUnavailable(Exception):
+    """The SOAP service cannot be reached or used; callers fall back to zmsoap/zmprov"""
+
+
+class ZimbraSoapClient:
+    """
+    In-process client for the Zimbra admin SOAP service.
+
+    Each zmsoap/zmprov call starts a JVM, which takes several seconds. This
+    client sends the same requests over a small pool of keep-alive HTTPS
+    connections to the local admin port instead. Auth tokens are cached until
+    they expire, and batch() sends many requests in one BatchRequest round trip.
+    Like `zmsoap -z`, it authenticates as the zimbra admin from localconfig.xml;
+    mail requests (SearchRequest, GetMsgRequest) are run on behalf of a mailbox
+    by naming the account in the SOAP context header.
+    """
+
+    AUTH_FAULTS = ('service.AUTH_EXPIRED', 'service.AUTH_REQUIRED')
+
+    def __init__(self, url: str = ZIMBRA_ADMIN_SOAP_URL, localconfig: str = ZIMBRA_LOCALCONFIG,
+                 pool_size: int = 8, timeout: int = 30, debug: int = 0):
+        parts = urllib.parse.urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 443
+        self.path = parts.path or '/'
+        self.localconfig = localconfig
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.debug = debug
+        # Self-signed certificate on localhost, as with curl -k
+        self.ssl_context = ssl.create_default_context()
+        self.ssl_context.check_hostname = False
+        self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.idle: List[http.client.HTTPSConnection] = []  # Keep-alive connections ready for reuse
+        self.lock = threading.Lock()
+        self.tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}  # (kind, account) -> (token, expires at)
+        self.zadmin: Optional[Tuple[str, str]] = None
+        self.round_trips = 0
+
+    def _zadmin_credentials(self) -> Tuple[str, str]:
+        """zimbra_ldap_user / zimbra_ldap_password from localconfig.xml (what zmsoap -z uses)"""
+        if self.zadmin is None:
+            try:
+                root = ET.parse(self.localconfig).getroot()
+            except (OSError, ET.ParseError) as e:
+                raise ZimbraSoapUnavailable(f"Cannot read {self.localconfig}: {e}")
+            values = {key.get('name'): key.findtext('value') or '' for key in root.iter('key')}
+            if not values.get('zimbra_ldap_password'):
+                raise ZimbraSoapUnavailable(f"No zimbra_ldap_password in {self.localconfig}")
+            self.zadmin = (values.get('zimbra_ldap_user') or 'zimbra', values['zimbra_ldap_password'])
+        return self.zadmin
+
+    def _post(self, body: bytes) -> Tuple[int, bytes]:
+        """POST a SOAP envelope on a pooled connection; returns (HTTP status, response body)"""
+        with self.lock:
+            conn = self.idle.pop() if self.idle else None
+        for attempt in range(2):
+            if conn is None:
+                conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                                   context=self.ssl_context)
+            try:
+                conn.request('POST', self.path, body, {'Content-Type': 'application/soap+xml; charset=utf-8'})
+                response = conn.getresponse()
+                data = response.read()
+            except (ConnectionResetError, BrokenPipeError) as e:
+                # Keep-alive connection closed by the server: retry once on a new one
+                conn.close()
+                conn = None
+                if attempt:
+                    raise ZimbraSoapUnavailable(f"{self.host}:{self.port}: {e}")
+                continue
+            except socket.timeout:
+                conn.close()
+                raise ZimbraSoapError('service.TIMEOUT', f"No response within {self.timeout} seconds")
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise ZimbraSoapUnavailable(f"{self.host}:{self.port}: {e}")
+
+            with self.lock:
+                self.round_trips += 1
+                if not response.will_close and len(self.idle) < self.pool_size:
+                    self.idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+            return response.status, data
+
+    def _send(self, request: str, token: Optional[str] = None, account: Optional[str] = None) -> ET.Element:
+        """Send one request element (XML string) and return the response element"""
+        context = '<nosession/>'
+        if token:
+            context += f'<authToken>{xml_escape(token)}</authToken>'
+        if account:
+            context += f'<account by="name">{xml_escape(account)}</account>'
+        envelope = (f'<soap:Envelope xmlns:soap="{SOAP_ENVELOPE_NS}"><soap:Header>'
+                    f'<context xmlns="urn:zimbra">{context}</context></soap:Header>'
+                    f'<soap:Body>{request}</soap:Body></soap:Envelope>')
+        status, data = self._post(envelope.encode('utf-8'))
+        try:
+            body = ET.fromstring(data).find(f'{{{SOAP_ENVELOPE_NS}}}Body')
+        except ET.ParseError:
+            body = None
+        if body is None or not len(body):
+            raise ZimbraSoapError('soap.INVALID_RESPONSE', f"HTTP {status}")
+        if body[0].tag == f'{{{SOAP_ENVELOPE_NS}}}Fault':
+            raise self._fault(body[0])
+        return body[0]
+
+    @staticmethod
+    def _fault(element: ET.Element) -> ZimbraSoapError:
+        return ZimbraSoapError(element.findtext('.//{urn:zimbra}Code') or 'soap.FAULT',
+                               element.findtext(f'.//{{{SOAP_ENVELOPE_NS}}}Text') or '')
+
+    @staticmethod
+    def _token_ttl(lifetime_ms: int) -> float:
+        """Seconds a token is reused: its lifetime (in ms) less a minute of margin"""
+        return max(lifetime_ms / 1000 - 60, 0) if lifetime_ms else 3600
+
+    def authenticate(self, name: str, password: str) -> Tuple[str, int]:
+        """
+        Admin AuthRequest, never cached (used to check a password).
+
+        Returns:
+            (auth token, lifetime as reported by Zimbra)
+        """
+        response = self._send(f'<AuthRequest xmlns="urn:zimbraAdmin"><name>{xml_escape(name)}</name>'
+                              f'<password>{xml_escape(password)}</password></AuthRequest>')
+        token = response.findtext(f'{ADMIN_NS}authToken')
+        if not token:
+            raise ZimbraSoapError('soap.INVALID_RESPONSE', 'AuthResponse without authToken')
+        return token, int(response.findtext(f'{ADMIN_NS}lifetime') or 0)
+
+    def admin_token(self, name: Optional[str] = None, password: Optional[str] = None) -> str:
+        """Cached admin token for the given credentials (the zimbra admin from localconfig by default)"""
+        if name is None:
+            name, password = self._zadmin_credentials()
+        key = ('admin', name)
+        cached = self.tokens.get(key)
+        if cached and cached[1] > time.time():
+            return cached[0]
+        token, lifetime = self.authenticate(name, password)
+        self.tokens[key] = (token, time.time() + self._token_ttl(lifetime))
+        if self.debug:
+            debug_print(f"SOAP: authenticated as {name}")
+        return token
+
+    def delegate_token(self, account: str, admin_token: Optional[str] = None) -> str:
+        """Cached delegated (mailbox) token for an account"""
+        key = ('delegate', account)
+        cached = self.tokens.get(key)
+        if cached and cached[1] > time.time():
+            return cached[0]
+        response = self._send(f'<DelegateAuthRequest xmlns="urn:zimbraAdmin"><account by="name">'
+                              f'{xml_escape(account)}</account></DelegateAuthRequest>',
+                              admin_token or self.admin_token())
+        token = response.findtext(f'{ADMIN_NS}authToken')
+        if not token:
+            raise ZimbraSoapError('soap.INVALID_RESPONSE', 'DelegateAuthResponse without authToken')
+        self.tokens[key] = (token, time.time() + self._token_ttl(int(response.findtext(f'{ADMIN_NS}lifetime') or 0)))
+        return token
+
+    def call(self, request: str, account: Optional[str] = None) -> ET.Element:
+        """Send a request as the zimbra admin, on behalf of `account` if given; re-authenticates once if the token expired"""
+        for attempt in range(2):
+            try:
+                return self._send(request, self.admin_token(), account)
+            except ZimbraSoapError as e:
+                if attempt or e.code not in self.AUTH_FAULTS:
+                    raise
+                self.tokens.pop(('admin', self._zadmin_credentials()[0]), None)
+
+    def batch(self, requests: List[str], account: Optional[str] = None) -> List[object]:
+        """
+        Send several requests in one BatchRequest (onerror="continue").
+
+        Returns:
+            The response element, or a ZimbraSoapError, for each request in order
+        """
+        if not requests:
+            return []
+        body = ''.join(re.sub(r'^<([\w:]+)', rf'<\1 requestId="{i}"', request, count=1)
+                       for i, request in enumerate(requests))
+        response = self.call(f'<BatchRequest xmlns="urn:zimbra" onerror="continue">{body}</BatchRequest>', account)
+        results: List[object] = [ZimbraSoapError('soap.NO_RESPONSE')] * len(requests)
+        for element in response:
+            request_id = element.get('requestId')
+            if request_id is None or not request_id.isdigit() or int(request_id) >= len(requests):
+                continue
+            if element.tag == f'{{{SOAP_ENVELOPE_NS}}}Fault':
+                results[int(request_id)] = self._fault(element)
+            else:
+                results[int(request_id)] = element
+        return results
+
+    def get_all_domains(self) -> List[Dict[str, str]]:
+        """Every domain as a dict of its attributes, plus 'name' (GetAllDomainsRequest)"""
+        response = self.call('<GetAllDomainsRequest xmlns="urn:zimbraAdmin"/>')
+        domains = []
+        for domain in response.iter(f'{ADMIN_NS}domain'):
+            attrs = {attr.get('n'): attr.text or '' for attr in domain.iter(f'{ADMIN_NS}a')}
+            attrs['name'] = domain.get('name', '')
+            domains.append(attrs)
+        return domains
+
+    def check_accounts(self, accounts: List[str]) -> Dict[str, bool]:
+        """
+        Whether each account exists, checked with a single BatchRequest.
+        Accounts whose check failed for another reason are left out.
+        """
+        results = self.batch([f'<GetAccountInfoRequest xmlns="urn:zimbraAdmin"><account by="name">'
+                              f'{xml_escape(account)}</account></GetAccountInfoRequest>' for account in accounts])
+        checked = {}
+        for account, result in zip(accounts, results):
+            if not isinstance(result, ZimbraSoapError):
+                checked[account] = True
+            elif result.code == 'account.NO_SUCH_ACCOUNT':
+                checked[account] = False
+        return checked
+
+    def search_message_id(self, account: str, message_id: str) -> Optional[str]:
+        """Internal item ID of the message with this Message-ID in a mailbox, None if not there"""
+        query = f'field[Message-ID]:"<{message_id}>"'
+        response = self.call(f'<SearchRequest xmlns="urn:zimbraMail" types="message" limit="1">'
+                             f'<query>{xml_escape(query)}</query></SearchRequest>', account)
+        hit = response.find(f'{MAIL_NS}m')
+        return hit.get('id') if hit is not None else None
+
+    def get_raw_message(self, account: str, item_id: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Raw RFC822 content of a message (GetMsgRequest raw=1).
+
+        Returns:
+            (content, None), or (None, content URL) when Zimbra only returns a URL
+        """
+        response = self.call(f'<GetMsgRequest xmlns="urn:zimbraMail"><m id={quoteattr(item_id)} raw="1" '
+                             f'useContentUrl="0"/></GetMsgRequest>', account)
+        content = response.find(f'{MAIL_NS}m/{MAIL_NS}content')
+        if content is None:
+            return None, None
+        if content.get('url'):
+            return None, content.get('url')
+        return content.text, None
+
+    def open_content(self, url: str, token: str) -> http.client.HTTPResponse:
+        """
+        GET a content URL with a ZM_AUTH_TOKEN cookie (what curl -k did) and
+        return the response before its body is read, so a large message can be
+        passed on block by block. Closing the response closes the connection.
+        """
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme == 'https':
+            conn = http.client.HTTPSConnection(parts.hostname, parts.port or 443, timeout=self.timeout,
+                                               context=self.ssl_context)
+        else:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=self.timeout)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        try:
+            conn.request('GET', path, headers={'Cookie': f'ZM_AUTH_TOKEN={token}', 'Connection': 'close'})
+            response = conn.getresponse()
+        except socket.timeout:
+            conn.close()
+            raise ZimbraSoapError('service.TIMEOUT', f"No response within {self.timeout} seconds")
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise ZimbraSoapUnavailable(f"{parts.hostname}: {e}")
+        if response.status != 200:
+            response.close()
+            conn.close()
+            raise ZimbraSoapError(f'http.{response.status}', response.reason)
+        return response
+
+    def download(self, url: str, token: str) -> str:
+        """The whole content of a content URL (open_content())"""
+        response = self.open_content(url, token)
+        try:
+            data = response.read()
+        except socket.timeout:
+            raise ZimbraSoapError('service.TIMEOUT', f"No response within {self.timeout} seconds")
+        except (OSError, http.client.HTTPException) as e:
+            raise ZimbraSoapUnavailable(f"{urllib.parse.urlsplit(url).hostname}: {e}")
+        finally:
+            response.close()
+        return data.decode('utf-8', errors='replace')
+
+
+class RWLock:
+    """
+    Readers-writer lock: any number of readers, or one writer. A waiting
+    writer blocks new readers, so a stream of searches cannot starve it.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = False
+        self.writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self.cond:
+            while self.writer or self.writers_waiting:
+                self.cond.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.readers -= 1
+                if not self.readers:
+                    self.cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self.cond:
+            self.writers_waiting += 1
+            while self.writer or self.readers:
+                self.cond.wait()
+            self.writers_waiting -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.writer = False
+                self.cond.notify_all()
+
+
 class WebUI:
     """Web interface for jt_zmmsgtrace"""
 
     def __init__(self, log_files: List[str], year: int, debug: int = 0,
-                 login_attempts: int = 5, login_timeout: int = 10):
+                 login_attempts: int = 5, login_timeout: int = 10,
+                 index: Optional[LogIndex] = None, jobs: int = 0):
         self.log_files = log_files
         self.year = year
         self.debug = debug
+        self.index = index  # Persistent parse index (None = parse log files directly)
+        self.jobs = jobs  # Worker processes for parsing history files (0 = one per CPU)
         self.parser = None
+        self.parser_lock = RWLock()  # Searches read self.parser, refresh_parser() changes it
+        self.refresh_lock = threading.Lock()  # One refresh_parser() at a time (see ensure_parser)
+        self.base_rss = current_rss()  # RSS before any log data is loaded (see memory_report)
         self.is_parsing = False
         self.parsed_with_history = False  # Track if current parser includes history files
-        self.parsed_log_files_mtime = {}  # Track modification times of parsed log files
+        self.refresh_interval = 0  # Seconds between background refreshes (see run_indexer, 0 = off)
+        self.refresh_stats = {  # Last refresh_parser() run that parsed new data (see status)
+            'refreshes': 0, 'last_refresh': None, 'duration': 0.0, 'lines': 0,
+            'lines_per_second': 0.0, 'last_error': None,
+        }
+        self.parsed_log_files_stat = {}  # Track (inode, size, mtime) of parsed log files
         self.progress_store = {}  # Store progress for ongoing email fetch operations
         self.admin_account = None  # Admin account for DelegateAuth
         self.admin_password = None  # Admin password for DelegateAuth
         self.zimbra_public_hostname = None  # Zimbra public service hostname
         self.zimbra_public_port = None  # Zimbra public service port
+        self.soap = ZimbraSoapClient(debug=debug)  # In-process SOAP; zmsoap/zmprov are the fallback
+        self.domain_cache = TTLCache(maxsize=1, ttl=DIRECTORY_CACHE_TTL)  # 'domains' -> set of internal domains
+        self.account_cache = TTLCache(maxsize=10000, ttl=DIRECTORY_CACHE_TTL)  # account -> exists
+        self.location_cache = TTLCache(maxsize=10000, ttl=LOCATION_CACHE_TTL)  # (message_id, account) -> item ID
+        self.message_cache = TTLCache(maxsize=MESSAGE_CACHE_SIZE, ttl=MESSAGE_CACHE_TTL)  # (account, item ID) -> MailboxMessage
+        self.stats_cache = TTLCache(maxsize=32, ttl=STATS_CACHE_TTL)  # (criteria, parser state) -> trace_statistics()
         self.sessions = {}  # Session management: {session_id: {'admin_account': ..., 'admin_password': ...}}
         self.failed_logins = []  # Track failed login attempts: [(timestamp, ip_address), ...]
         self.login_attempts = login_attempts  # Max failed attempts before shutdown
         self.login_timeout = login_timeout  # Time window in minutes
 
+    def ensure_parser(self, log_files: List[str], include_history: bool) -> bool:
+        """
+        refresh_parser() for concurrent requests: only one refresh runs at a
+        time, and callers arriving meanwhile wait for it instead of parsing
+        the same data again. When the parser already covers the requested
+        files and only new lines are being ingested, they do not wait but
+        search the data parsed so far.
+
+        Returns:
+            True if new log data was parsed
+        """
+        if not self.refresh_lock.acquire(blocking=False):
+            if self.covering_log_files(log_files, include_history) is not log_files:
+                return False  # Covered: search the data parsed so far
+            self.refresh_lock.acquire()
+        try:
+            log_files = self.covering_log_files(log_files, include_history)
+            self.is_parsing = True
+            old_parser = self.parser
+            parser_lines = old_parser.lines_read if old_parser else 0
+            index_lines = self.index.lines_read if self.index else 0
+            start = time.time()
+            changed = self.refresh_parser(log_files, include_history)
+            if changed:
+                elapsed = time.time() - start
+                if self.index:
+                    # New lines are read by the index (see refresh_parser)
+                    lines = self.index.lines_read - index_lines
+                else:
+                    lines = self.parser.lines_read - (parser_lines if self.parser is old_parser else 0)
+                self.refresh_stats.update({
+                    'refreshes': self.refresh_stats['refreshes'] + 1,
+                    'last_refresh': time.time(),
+                    'duration': elapsed,
+                    'lines': lines,
+                    'lines_per_second': lines / elapsed if elapsed > 0 else 0.0,
+                })
+            return changed
+        finally:
+            self.is_parsing = False
+            self.refresh_lock.release()
+
+    def search_log_files(self, include_history: bool,
+                         time_window: Optional[Tuple[Optional[int], Optional[int]]] = None) -> List[str]:
+        """
+        Log files a search covers: the current log, or every /var/log/zimbra*
+        file that can overlap the search time window (see prune_log_files)
+        """
+        if not include_history:
+            return [DEFAULT_LOGFILE]
+        log_files = sorted(glob.glob('/var/log/zimbra*')) or [DEFAULT_LOGFILE]
+        if time_window:
+            log_files = prune_log_files(log_files, time_window, self.year, self.index, self.debug)
+        return log_files
+
+    def covering_log_files(self, log_files: List[str], include_history: bool) -> List[str]:
+        """
+        The parsed log files if they include all of log_files (a search with a
+        narrower time window than the parse), else log_files: searches filter
+        by time anyway, so the parser is kept instead of being rebuilt.
+        """
+        parsed = self.parsed_log_files_stat
+        if self.parser is not None and self.parsed_with_history == include_history and set(log_files) <= set(parsed):
+            return list(parsed)
+        return log_files
+
+    def run_indexer(self, interval: int):
+        """
+        Background indexer (thread target, see start_web_server).
+
+        Parses the current log file at start-up, so the first search does not
+        wait for it, and brings the parse index up to date for the rotated files
+        as well when history logs are configured (--all-logs). After that new
+        lines are ingested every `interval` seconds, in the history mode of the
+        last search, for its log files; 0 only pre-warms.
+        """
+        self.refresh_interval = interval
+        tasks = [lambda: self.ensure_parser(self.search_log_files(False), False)]
+        if self.index and len(self.log_files) > 1:
+            tasks.append(lambda: self.index.update(self.search_log_files(True)))
+
+        while True:
+            for task in tasks:
+                try:
+                    task()
+                    self.refresh_stats['last_error'] = None
+                except Exception as e:
+                    self.refresh_stats['last_error'] = str(e)
+                    if self.debug:
+                        print(f"Background refresh failed: {e}", file=sys.stderr)
+            if interval <= 0:
+                return
+            time.sleep(interval)
+            include_history = self.parsed_with_history
+            # The files of the last search (a time window may have narrowed them)
+            tasks = [lambda: self.ensure_parser(
+                self.covering_log_files([], include_history) or self.search_log_files(include_history),
+                include_history)]
+
+    def status(self) -> Dict:
+        """Indexer state for the /status endpoint: parsed files, lag and throughput"""
+        now = time.time()
+        stats = dict(self.refresh_stats)
+        files = []
+        with self.parser_lock.read():
+            parser = self.parser
+            for filepath, (inode, size, mtime) in self.parsed_log_files_stat.items():
+                try:
+                    st = os.stat(filepath)
+                    current_inode, current_size = st.st_ino, st.st_size
+                except OSError:
+                    current_inode, current_size = None, 0
+                position_inode, parsed = parser.file_positions.get(filepath, (inode, size))
+                if position_inode != current_inode:
+                    parsed = 0  # Rotated since the last refresh
+                files.append({
+                    'path': filepath,
+                    'size': current_size,
+                    'parsed': parsed,
+                    'lag_bytes': max(current_size - parsed, 0),
+                })
+            messages = len(parser.messages) if parser else 0
+
+        lag_bytes = sum(f['lag_bytes'] for f in files)
+        last_refresh = stats['last_refresh']
+        return {
+            'parsing': self.is_parsing,
+            'include_history': self.parsed_with_history,
+            'refresh_interval': self.refresh_interval,
+            'files': files,
+            'messages': messages,
+            'lag_bytes': lag_bytes,
+            'lag_seconds': round(now - last_refresh, 1) if lag_bytes and last_refresh else 0,
+            'refreshes': stats['refreshes'],
+            'last_refresh': datetime.fromtimestamp(last_refresh).isoformat(timespec='seconds') if last_refresh else None,
+            'last_duration': round(stats['duration'], 3),
+            'last_lines': stats['lines'],
+            'lines_per_second': round(stats['lines_per_second']),
+            'last_error': stats['last_error'],
+            'caches': self.cache_stats(),
+        }
+
+    def refresh_parser(self, log_files: List[str], include_history: bool) -> bool:
+        """
+        Bring self.parser up to date with the given log files.
+
+        Plain log files that only grew are ingested incrementally, with queue
+        entries still in flight carried over between calls. Anything else (first
+        search, history setting or file set changed, rotation) rebuilds the
+        parser, from the index when one is configured. A rebuild happens on a
+        new parser, so searches keep using the old one until it is swapped in;
+        incremental ingestion holds parser_lock for writing. With the index,
+        new lines are parsed once, by the index, and the parser takes the
+        results (LogParser.ingest_part).
+
+        Returns:
+            True if new log data was parsed
+        """
+        current_stat = {}
+        for filepath in log_files:
+            try:
+                st = os.stat(filepath)
+                current_stat[filepath] = (st.st_ino, st.st_size, st.st_mtime)
+            except OSError:
+                pass
+
+        parser = self.parser
+        if (parser and self.parsed_with_history == include_history
+                and current_stat.keys() == self.parsed_log_files_stat.keys()):
+            grown = []
+            for filepath, (inode, size, mtime) in current_stat.items():
+                old_inode, old_size, old_mtime = self.parsed_log_files_stat[filepath]
+                if (inode, size, mtime) == (old_inode, old_size, old_mtime):
+                    continue
+                if inode != old_inode or size < old_size or LogIndex._is_compressed(filepath):
+                    grown = None  # Rotated or rewritten
+                    break
+                grown.append(filepath)
+
+            if grown is not None:
+                if not grown:
+                    return False
+                if self.debug:
+                    print(f"📝 Ingesting new lines of {', '.join(grown)}...", file=sys.stderr)
+                # The index reads the new lines once, the parser takes its results
+                tails = {}
+                if self.index:
+                    self.index.update(log_files, tails)
+                with self.parser_lock.write():
+                    for filepath in grown:
+                        inode, part = tails.get(filepath, (None, None))
+                        if part and parser.file_positions.get(filepath) == (inode, part['start_offset']):
+                            parser.ingest_part(part, inode)
+                        else:
+                            parser.ingest(filepath)
+                    parser.snapshot_pending()
+                    parser.integrate_amavis_data(only_dirty=True)
+                    parser.update_search_index()
+                    self.parsed_log_files_stat = current_stat
+                return True
+
+        if self.debug:
+            files_info = f"{len(log_files)} files" if include_history else "current log file"
+            print(f"Parsing {files_info}...", file=sys.stderr)
+
+        # Oldest first, so queue IDs spanning a rotation are stitched together
+        by_age = sorted(current_stat, key=lambda f: current_stat[f][2])
+        if self.index:
+            self.index.update(log_files)
+            parser = self.index.load(by_age, resumable=True)
+        else:
+            # Rotated (compressed) files are parsed in parallel; plain files stay open for ingest()
+            compressed = [f for f in log_files if LogIndex._is_compressed(f)]
+            if compressed:
+                parser = parse_files_parallel(compressed, self.year, self.debug, self.jobs, finalize=False)
+            else:
+                parser = LogParser(self.year, self.debug)
+            for filepath in by_age:
+                if not LogIndex._is_compressed(filepath):
+                    parser.ingest(filepath)
+        parser.snapshot_pending()
+        parser.integrate_amavis_data()
+        parser.update_search_index()
+
+        with self.parser_lock.write():
+            self.parser = parser
+            self.parsed_with_history = include_history
+            self.parsed_log_files_stat = current_stat
+        if self.debug:
+            print(memory_report(parser, self.base_rss), file=sys.stderr)
+        return True
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Size, hits and misses of the Zimbra lookup caches"""
+        return {
+            'domains': self.domain_cache.stats(),
+            'accounts': self.account_cache.stats(),
+            'locations': self.location_cache.stats(),
+            'messages': self.message_cache.stats(),
+            'statistics': self.stats_cache.stats(),
+        }
+
     def set_admin_credentials(self, admin_account: str, admin_password: str):
         """Set admin credentials for DelegateAuth"""
         self.admin_account = admin_account
         self.admin_password = admin_password
 
     def verify_admin_credentials(self, admin_account: str, admin_password: str):
-        """Verify admin credentials using zmsoap AuthRequest and return token info"""
+        """Verify admin credentials using AuthRequest and return token info"""
+        try:
+            auth_token, token_lifetime = self.soap.authenticate(admin_account, admin_password)
+            if self.debug:
+                debug_print(f"✓ Admin credentials verified for {admin_account}")
+            return {'valid': True, 'token': auth_token, 'lifetime': token_lifetime or 43200}
+        except ZimbraSoapError as e:
+            # Only a rejected login counts as invalid credentials, other faults
+            # (e.g. service.TIMEOUT) must not count towards the login lockout
+            if e.code == 'account.AUTH_FAILED':
+                if self.debug:
+                    debug_print(f"✗ Admin auth failed: {e}")
+                return {'valid': False}
+            if self.debug:
+                debug_print(f"SOAP AuthRequest failed ({e}), using zmsoap")
+        except ZimbraSoapUnavailable as e:
+            if self.debug:
+                debug_print(f"SOAP client not available ({e}), using zmsoap")
+
         try:
             cmd = [
                 'sudo', '-u', 'zimbra',
@@ -1432,6 +4128,23 @@ class WebUI:
         if self.zimbra_public_hostname and self.zimbra_public_port:
             return  # Already cached
 
+        try:
+            domains = self.soap.get_all_domains()
+            # First domain that sets each attribute, as with the zmsoap output below
+            self.zimbra_public_hostname = next((d['zimbraPublicServiceHostname'] for d in domains
+                                                if d.get('zimbraPublicServiceHostname')), None)
+            self.zimbra_public_port = next((d['zimbraPublicServicePort'] for d in domains
+                                            if d.get('zimbraPublicServicePort')), None)
+            if self.debug:
+                print(f"Zimbra config: {self.zimbra_public_hostname}:{self.zimbra_public_port}", file=sys.stderr)
+            return
+        except ZimbraSoapError as e:
+            if self.debug:
+                print(f"Failed to get Zimbra config: {e}", file=sys.stderr)
+        except ZimbraSoapUnavailable as e:
+            if self.debug:
+                debug_print(f"SOAP client not available ({e}), using zmsoap")
+
         try:
             cmd = ['sudo', '-u', 'zimbra', '/opt/zimbra/bin/zmsoap', '-z', 'GetAllDomainsRequest']
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
@@ -1464,6 +4177,16 @@ class WebUI:
         if not self.admin_account or not self.admin_password:
             return None
 
+        try:
+            return self.soap.admin_token(self.admin_account, self.admin_password)
+        except ZimbraSoapError as e:
+            if self.debug:
+                print(f"Admin auth failed: {e}", file=sys.stderr)
+            return None
+        except ZimbraSoapUnavailable as e:
+            if self.debug:
+                debug_print(f"SOAP client not available ({e}), using zmsoap")
+
         try:
             cmd = [
                 'sudo', '-u', 'zimbra',
@@ -1495,6 +4218,16 @@ class WebUI:
 
     def get_delegate_token(self, admin_token: str, account: str):
         """Get delegated auth token for a user account using admin token"""
+        try:
+            return self.soap.delegate_token(account, admin_token)
+        except ZimbraSoapError as e:
+            if self.debug:
+                print(f"DelegateAuth failed: {e}", file=sys.stderr)
+            return None
+        except ZimbraSoapUnavailable as e:
+            if self.debug:
+                debug_print(f"SOAP client not available ({e}), using curl")
+
         try:
             # Build SOAP request for DelegateAuthRequest
             soap_request = f'''<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
@@ -2130,6 +4863,7 @@ class WebUI:
                         </a>
                     </div>
                 </div>
+                <a href="/stats" class="language-btn" style="text-decoration: none;">📊 {t('statistics')}</a>
                 <a href="/logout" class="logout-btn">◄ {t('logout')}</a>
             </div>
         </div>
@@ -2174,6 +4908,12 @@ class WebUI:
                         <input type="text" id="srchost" name="srchost" placeholder="{t('hint_srchost')}">
                     </div>
 
+                    <div class="form-group">
+                        <label for="subject">✉️ {t('subject')}</label>
+                        <input type="text" id="subject" name="subject" placeholder="{t('hint_subject')}">
+                        <div class="small-text">{t('subject_words')}</div>
+                    </div>
+
                     <div class="form-group">
                         <label for="time_start">📅 {t('time_range')}</label>
                         <div style="display: grid; grid-template-columns: 1fr; gap: 8px; margin-bottom: 8px;">
@@ -2290,6 +5030,142 @@ class WebUI:
                            offset: int = 0, limit: int = 50, total_count: int = 0, has_more: bool = False,
                            lang: str = 'zh_TW') -> str:
         """Format search results as HTML with pagination support"""
+        head, tail = self.format_results_page(search_params, offset, limit, total_count, len(messages),
+                                              has_more, lang)
+        return head + ''.join(self.format_message_html(msg, filter_obj, lang) for msg in messages) + tail
+
+    def format_stats_html(self, stats: Dict, search_params: dict, lang: str = 'zh_TW') -> str:
+        """Statistics dashboard page (see trace_statistics)"""
+        t = lambda key, **kwargs: get_translation(lang, key, **kwargs)
+        html_lang = 'zh-TW' if lang == 'zh_TW' else 'en'
+
+        # Same criteria for the JSON link and the way back to the search results
+        url_params = {k: v for k, v in search_params.items()
+                      if v and k not in ('include_history', 'offset', 'limit')}
+        if search_params.get('include_history'):
+            url_params['include_history'] = '1'
+        query_string = html.escape(urllib.parse.urlencode(url_params))
+
+        def table(title: str, columns: List[Tuple[str, str]], rows: List[Dict]) -> str:
+            head = ''.join(f'<th>{html.escape(label)}</th>' for label, _ in columns)
+            body = ''.join(
+                '<tr>' + ''.join(f'<td>{html.escape(str(row[name]))}</td>' for _, name in columns) + '</tr>'
+                for row in rows)
+            if not rows:
+                body = f'<tr><td colspan="{len(columns)}" class="empty">-</td></tr>'
+            return f'<div class="panel"><h2>{title}</h2><table><tr>{head}</tr>{body}</table></div>'
+
+        statuses = stats['statuses']
+        cards = ''.join(
+            f'<div class="card"><div class="value">{value:,}</div><div class="label">{label}</div></div>'
+            for label, value in (
+                (t('stats_messages'), stats['messages']),
+                (t('stats_recipients'), stats['recipients']),
+                (t('sent'), statuses.get('sent', 0)),
+                (t('deferred'), statuses.get('deferred', 0)),
+                (t('bounced'), statuses.get('bounced', 0)),
+                (t('rejected'), statuses.get('reject', 0)),
+            ))
+
+        peak = max([hour['count'] for hour in stats['hourly']] or [1])
+        bars = ''.join(
+            f'<div class="bar" style="height: {max(hour["count"] * 100 // peak, 1)}%;" '
+            f'title="{html.escape(hour["hour"])}: {hour["count"]:,}"></div>'
+            for hour in stats['hourly'])
+        hourly = f'<div class="chart">{bars}</div>' if bars else '<div class="empty">-</div>'
+        if stats['hourly']:
+            hourly += (f'<div class="chart-range"><span>{html.escape(stats["hourly"][0]["hour"])}</span>'
+                       f'<span>{html.escape(stats["hourly"][-1]["hour"])}</span></div>')
+
+        tables = ''.join((
+            table(t('top_senders'), [(t('sender'), 'sender'), (t('stats_messages'), 'count')],
+                  stats['top_senders']),
+            table(t('top_recipient_domains'), [(t('recipient_domain'), 'domain'), (t('stats_recipients'), 'count')],
+                  stats['top_recipient_domains']),
+            table(t('relay_status'), [(t('relay'), 'relay'), (t('sent'), 'sent'), (t('deferred'), 'deferred'),
+                                      (t('bounced'), 'bounced'), (t('total'), 'total')], stats['relays']),
+            table(t('amavis_results'), [(t('disposition'), 'disposition'), (t('reason'), 'reason'),
+                                        (t('stats_messages'), 'count')], stats['amavis']),
+        ))
+
+        return f"""
+<!DOCTYPE html>
+<html lang="{html_lang}">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{t('statistics')} - jt_zmmsgtrace</title>
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        body {{
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            min-height: 100vh;
+            padding: 20px;
+        }}
+        .container {{ max-width: 1400px; margin: 0 auto; }}
+        .header {{
+            background: white;
+            border-radius: 10px;
+            padding: 20px 30px;
+            margin-bottom: 20px;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
+        }}
+        .header h1 {{ color: #667eea; font-size: 1.6em; }}
+        .header a {{
+            margin-left: 10px;
+            padding: 8px 15px;
+            background: #667eea;
+            color: white;
+            text-decoration: none;
+            border-radius: 5px;
+            font-size: 0.9em;
+        }}
+        .cards {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 15px; margin-bottom: 20px; }}
+        .card {{ background: white; border-radius: 10px; padding: 20px; text-align: center; box-shadow: 0 5px 15px rgba(0,0,0,0.1); }}
+        .card .value {{ font-size: 1.8em; font-weight: bold; color: #333; }}
+        .card .label {{ color: #666; margin-top: 5px; }}
+        .grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(420px, 1fr)); gap: 20px; }}
+        .panel {{ background: white; border-radius: 10px; padding: 20px; box-shadow: 0 5px 15px rgba(0,0,0,0.1); margin-bottom: 20px; overflow-x: auto; }}
+        .panel h2 {{ color: #667eea; font-size: 1.1em; margin-bottom: 12px; }}
+        table {{ width: 100%; border-collapse: collapse; font-size: 0.9em; }}
+        th {{ text-align: left; background: #f5f6fa; color: #555; padding: 8px; }}
+        td {{ padding: 6px 8px; border-top: 1px solid #eee; word-break: break-all; }}
+        .empty {{ color: #999; text-align: center; }}
+        .chart {{ display: flex; align-items: flex-end; gap: 1px; height: 180px; border-bottom: 1px solid #ccc; }}
+        .bar {{ flex: 1; background: #667eea; min-width: 2px; }}
+        .bar:hover {{ background: #764ba2; }}
+        .chart-range {{ display: flex; justify-content: space-between; color: #888; font-size: 0.8em; margin-top: 5px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>📊 {t('statistics')}</h1>
+            <div>
+                <a href="/search?{query_string}">◄ {t('search_results')}</a>
+                <a href="/api/stats?{query_string}">JSON</a>
+            </div>
+        </div>
+        <div class="cards">{cards}</div>
+        <div class="panel">
+            <h2>{t('hourly_volume')}</h2>
+            {hourly}
+        </div>
+        <div class="grid">{tables}</div>
+    </div>
+</body>
+</html>"""
+
+    def format_results_page(self, search_params: dict, offset: int, limit: int, total_count: int,
+                            shown: int, has_more: bool, lang: str = 'zh_TW') -> Tuple[str, str]:
+        """
+        HTML of a results page around the message blocks (see format_message_html),
+        as (head, tail), so the blocks can be streamed in between.
+        """
         t = lambda key, **kwargs: get_translation(lang, key, **kwargs)
         html_lang = 'zh-TW' if lang == 'zh_TW' else 'en'
 
@@ -2303,6 +5179,8 @@ class WebUI:
             search_summary.append(f"{t('message_id')}: {html.escape(search_params['id'])}")
         if search_params.get('srchost'):
             search_summary.append(f"{t('source_host')}: {html.escape(search_params['srchost'])}")
+        if search_params.get('subject'):
+            search_summary.append(f"{t('subject')}: {html.escape(search_params['subject'])}")
         if search_params.get('time'):
             search_summary.append(f"{t('time_range')}: {html.escape(search_params['time'])}")
 
@@ -2319,144 +5197,16 @@ class WebUI:
         next_params = {k: v for k, v in next_params.items() if v}
         next_url = '/search?' + urllib.parse.urlencode(next_params)
 
-        # Generate results HTML
-        results_html = []
-        for msg in messages:
-            # Prepare subject display
-            subject_html = ""
-            if msg.subject:
-                subject_html = f"""
-                    <div class="field-row">
-                        <div class="field-label">{t('subject')}:</div>
-                        <div class="field-value" style="font-style: italic;">{html.escape(msg.subject)}</div>
-                    </div>"""
-
-            # Prepare source file display
-            source_html = ""
-            if msg.source_file:
-                source_html = f"""
-                    <div class="field-row">
-                        <div class="field-label">{t('log')}:</div>
-                        <div class="field-value">{html.escape(msg.source_file)}</div>
-                    </div>"""
-
-            results_html.append(f"""
-                <div class="message-block">
-                    <div class="field-row">
-                        <div class="field-label">{t('message_id')}:</div>
-                        <div class="field-value message-id">{html.escape(msg.message_id)}</div>
-                    </div>{source_html}
-                    <div class="field-row">
-                        <div class="field-label">{t('from')}:</div>
-                        <div class="field-value">{html.escape(msg.sender or 'unknown')}</div>
-                    </div>{subject_html}
-                    <div class="field-row">
-                        <div class="field-label">{t('to')}:</div>
-                        <div class="field-value">
-                            <ul style="margin: 0; padding-left: 20px;">
-            """)
-
-            # Recipients list
-            for recip in sorted(msg.recipients.values(), key=lambda r: r.address):
-                badge = ""
-                if recip.from_amavis_only:
-                    badge = f' <span class="badge badge-dedup">{t("badge_dedup")}</span>'
-                if recip.orig_recip:
-                    badge += f' <span class="badge badge-forward">{t("badge_forward_prefix")}{html.escape(recip.orig_recip)}</span>'
-
-                results_html.append(f"<li>{html.escape(recip.address)}{badge}</li>")
-
-            results_html.append("</ul></div></div>")
-
-            # Delivery details
-            recipient_pattern = filter_obj.recipient_pattern if hasattr(filter_obj, 'recipient_pattern') else None
-
-            for recip in sorted(msg.recipients.values(), key=lambda r: r.address):
-                if recipient_pattern and not recipient_pattern.search(recip.address):
-                    if not (recip.orig_recip and recipient_pattern.search(recip.orig_recip)):
-                        continue
-
-                results_html.append(f'<div class="recipient-detail"><strong>→ {html.escape(recip.address)}</strong>')
-
-                # Collect delivery path
-                delivery_path = self._collect_delivery_path(msg, recip, recip.address)
-
-                for stage in delivery_path:
-                    status_class = "status-sent" if stage.get('status') == 'sent' else "status-other"
-                    # Format the timestamp
-                    formatted_time = self.format_log_date(stage.get('time', ''))
-                    results_html.append(f"""
-                        <div class="delivery-stage">
-                            <div class="stage-time">{html.escape(formatted_time)}</div>
-                            <div class="stage-path">
-                                {html.escape(stage.get('from_host', ''))}
-                                {f" ({html.escape(stage.get('from_ip', ''))})" if stage.get('from_ip') else ''}
-                                {f" → {html.escape(stage.get('to_host', ''))}" if stage.get('to_host') else ''}
-                                {f" ({html.escape(stage.get('to_ip', ''))})" if stage.get('to_ip') else ''}
-                            </div>
-                            <div class="stage-status {status_class}">
-                                {html.escape(stage.get('status', ''))}
-                            </div>
-                        </div>
-                    """)
-
-                    if stage.get('status_msg') and stage.get('status') != 'sent':
-                        results_html.append(f'<div class="status-message">{html.escape(stage["status_msg"])}</div>')
-
-                    if stage.get('amavis_info'):
-                        amav = stage['amavis_info']
-                        results_html.append(f"""
-                            <div class="amavis-info">
-                                🛡️ Amavis: {html.escape(amav['disposition'])} ({html.escape(amav['reason'])})
-                                | Hits: {html.escape(amav['hits'])} | {html.escape(amav['ms'])} ms
-                            </div>
-                        """)
-
-                results_html.append('</div>')
-
-            # Add email action buttons at the end of message block
-            # Build a list of accounts to try (internal accounts only)
-            import urllib.parse
-            accounts_to_try = []
-
-            # Add sender first (if it's an internal account - likely in "Sent" folder)
-            if msg.sender:
-                accounts_to_try.append(msg.sender)
-
-            # Add all recipients
-            if msg.recipients:
-                for recip in msg.recipients.values():
-                    if recip.address not in accounts_to_try:
-                        accounts_to_try.append(recip.address)
-
-            if accounts_to_try:
-                accounts_param = ','.join(accounts_to_try)
-
-                results_html.append(f"""
-                    <div class="email-actions">
-                        <a href="/loading_email?id={urllib.parse.quote(msg.message_id)}&accounts={urllib.parse.quote(accounts_param)}"
-                           class="btn-action btn-view-email" target="_blank"
-                           onclick="var btn=this; btn.innerHTML='⏳ {t("loading")}'; btn.style.opacity='0.6'; setTimeout(function(){{btn.innerHTML='📧 {t("view_email")}'; btn.style.opacity='1';}}, 2000);">
-                            📧 {t("view_email")}
-                        </a>
-                        <a href="javascript:void(0);"
-                           class="btn-action btn-download"
-                           onclick="handleDownload('/view_email?id={urllib.parse.quote(msg.message_id)}&accounts={urllib.parse.quote(accounts_param)}&download=1');">
-                            💾 {t("download_email")}
-                        </a>
-                    </div>
-                """)
-
-            results_html.append('</div>')
-
         # Prepare search_params for URL encoding (convert boolean to string '1' for include_history)
         url_search_params = search_params.copy()
         if url_search_params.get('include_history'):
             url_search_params['include_history'] = '1'
         else:
             url_search_params.pop('include_history', None)  # Remove if False
+        # Statistics of the same messages (all of them, not the page)
+        stats_params = {k: v for k, v in url_search_params.items() if v and k not in ('offset', 'limit')}
 
-        html_content = f"""
+        head = f"""
 <!DOCTYPE html>
 <html lang="{html_lang}">
 <head>
@@ -2951,6 +5701,7 @@ class WebUI:
                         </a>
                     </div>
                 </div>
+                <a href="/stats?{html.escape(urllib.parse.urlencode(stats_params))}" class="language-btn" style="text-decoration: none;">📊 {t('statistics')}</a>
                 <a href="/logout" class="logout-btn">◄ {t('logout')}</a>
             </div>
         </div>
@@ -2995,6 +5746,12 @@ class WebUI:
                         <input type="text" id="srchost" name="srchost" value="{html.escape(search_params.get('srchost', ''))}" placeholder="{t('hint_srchost')}">
                     </div>
 
+                    <div class="form-group">
+                        <label for="subject">✉️ {t('subject')}</label>
+                        <input type="text" id="subject" name="subject" value="{html.escape(search_params.get('subject', ''))}" placeholder="{t('hint_subject')}">
+                        <div class="small-text">{t('subject_words')}</div>
+                    </div>
+
                     <div class="form-group">
                         <label for="time_start">📅 {t('time_range')}</label>
                         <div style="display: grid; grid-template-columns: 1fr; gap: 6px; margin-bottom: 6px;">
@@ -3052,11 +5809,11 @@ class WebUI:
                 </div>
 
                 <div class="results-container">
-                    {f'<div class="results-count">{t("found_messages", count=total_count)} <span style="color: #666; font-size: 0.9em;">{t("showing_range", start=offset + 1, end=min(offset + len(messages), total_count))}</span></div>' if total_count > 0 else ''}
+                    {f'<div class="results-count">{t("found_messages", count=total_count)} <span style="color: #666; font-size: 0.9em;">{t("showing_range", start=offset + 1, end=min(offset + shown, total_count))}</span></div>' if total_count > 0 else ''}
+                    {'' if shown else f'<div class="no-results"><h2>😔 {t("no_results")}</h2><p>{t("try_adjust")}</p></div>'}"""
 
-                    {"".join(results_html) if messages else f'<div class="no-results"><h2>😔 {t("no_results")}</h2><p>{t("try_adjust")}</p></div>'}
-
-                    {f'<div class="pagination-info">{t("showing_pagination", start=offset + 1, end=min(offset + len(messages), total_count), total=total_count)}</div>' if total_count > 0 else ''}
+        tail = f"""
+                    {f'<div class="pagination-info">{t("showing_pagination", start=offset + 1, end=min(offset + shown, total_count), total=total_count)}</div>' if total_count > 0 else ''}
 
                     {f'<div class="load-more-container"><a href="{html.escape(next_url)}" class="btn-load-more">📥 {t("load_more")}</a></div>' if has_more else ''}
                 </div>
@@ -3172,74 +5929,228 @@ class WebUI:
 </body>
 </html>
 """
-        return html_content
+        return head, tail
 
-    def _collect_delivery_path(self, msg: Message, recip: RecipientInfo, recip_addr: str) -> List[dict]:
-        """Recursively collect delivery path for a recipient (no loop detection needed as Postfix queue_id chain is unidirectional)"""
-        stages = []
+    def format_message_html(self, msg: Message, filter_obj, lang: str = 'zh_TW',
+                            parser: Optional[LogParser] = None) -> str:
+        """
+        HTML block of one message in the search results. parser: the one msg
+        comes from, when self.parser may have been replaced since
+        """
+        t = lambda key, **kwargs: get_translation(lang, key, **kwargs)
+        results_html = []
+        # Prepare subject display
+        subject_html = ""
+        if msg.subject:
+            subject_html = f"""
+                <div class="field-row">
+                    <div class="field-label">{t('subject')}:</div>
+                    <div class="field-value" style="font-style: italic;">{html.escape(msg.subject)}</div>
+                </div>"""
+
+        # Prepare source file display
+        source_html = ""
+        if msg.source_file:
+            source_html = f"""
+                <div class="field-row">
+                    <div class="field-label">{t('log')}:</div>
+                    <div class="field-value">{html.escape(msg.source_file)}</div>
+                </div>"""
+
+        results_html.append(f"""
+            <div class="message-block">
+                <div class="field-row">
+                    <div class="field-label">{t('message_id')}:</div>
+                    <div class="field-value message-id">{html.escape(msg.message_id)}</div>
+                </div>{source_html}
+                <div class="field-row">
+                    <div class="field-label">{t('from')}:</div>
+                    <div class="field-value">{html.escape(msg.sender or 'unknown')}</div>
+                </div>{subject_html}
+                <div class="field-row">
+                    <div class="field-label">{t('to')}:</div>
+                    <div class="field-value">
+                        <ul style="margin: 0; padding-left: 20px;">
+        """)
+
+        # Recipients list
+        for recip in sorted(msg.recipients.values(), key=lambda r: r.address):
+            badge = ""
+            if recip.from_amavis_only:
+                badge = f' <span class="badge badge-dedup">{t("badge_dedup")}</span>'
+            if recip.orig_recip:
+                badge += f' <span class="badge badge-forward">{t("badge_forward_prefix")}{html.escape(recip.orig_recip)}</span>'
 
-        # Current stage
-        stage = {
-            'time': msg.arrive_time or '',
-            'from_host': msg.prev_host or msg.host or '',
-            'from_ip': msg.prev_ip or '',
-            'to_host': recip.next_host or '',
-            'to_ip': recip.next_ip or '',
-            'status': recip.status or '',
-            'status_msg': recip.status_msg or ''
-        }
+            results_html.append(f"<li>{html.escape(recip.address)}{badge}</li>")
 
-        # Filter localhost IPs
-        if stage['from_ip'] in ['127.0.0.1', '::1']:
-            stage['from_ip'] = ''
-            if stage['from_host'] == 'localhost':
-                stage['from_host'] = msg.host or 'localhost'
-
-        # Add Amavis info if available
-        if recip.amavis_id and recip.amavis_id in self.parser.amavis_records:
-            amav = self.parser.amavis_records[recip.amavis_id]
-            stage['amavis_info'] = {
-                'disposition': amav.disposition,
-                'reason': amav.reason,
-                'hits': amav.hits,
-                'ms': amav.ms
-            }
+        results_html.append("</ul></div></div>")
 
-        stages.append(stage)
+        # Delivery details
+        recipient_pattern = filter_obj.recipient_pattern if hasattr(filter_obj, 'recipient_pattern') else None
 
-        # Recursively follow next_queue_id
-        if recip.next_queue_id:
-            if self.debug:
-                print(f"DEBUG: Checking next_queue_id: {recip.next_queue_id}", file=sys.stderr)
-                print(f"DEBUG: Is in qid_to_msg? {recip.next_queue_id in self.parser.qid_to_msg}", file=sys.stderr)
+        for recip in sorted(msg.recipients.values(), key=lambda r: r.address):
+            if recipient_pattern and not recipient_pattern.search(recip.address):
+                if not (recip.orig_recip and recipient_pattern.search(recip.orig_recip)):
+                    continue
 
-            if recip.next_queue_id in self.parser.qid_to_msg:
-                next_msg_id, next_msg = self.parser.qid_to_msg[recip.next_queue_id]
-                if self.debug:
-                    print(f"DEBUG: Found next message: {next_msg_id}", file=sys.stderr)
-                    print(f"DEBUG: Looking for recipient: {recip_addr}", file=sys.stderr)
-                    print(f"DEBUG: Available recipients: {list(next_msg.recipients.keys())}", file=sys.stderr)
+            results_html.append(f'<div class="recipient-detail"><strong>→ {html.escape(recip.address)}</strong>')
 
-                if recip_addr in next_msg.recipients:
-                    next_recip = next_msg.recipients[recip_addr]
-                    if self.debug:
-                        print(f"DEBUG: Recursing with next recipient", file=sys.stderr)
-                    stages.extend(self._collect_delivery_path(next_msg, next_recip, recip_addr))
-                elif self.debug:
-                    print(f"DEBUG: Recipient {recip_addr} not found in next message", file=sys.stderr)
+            # Collect delivery path
+            delivery_path = self._collect_delivery_path(msg, recip, recip.address, parser)
+
+            for stage in delivery_path:
+                status_class = "status-sent" if stage.get('status') == 'sent' else "status-other"
+                # Format the timestamp
+                formatted_time = self.format_log_date(stage.get('time', ''))
+                results_html.append(f"""
+                    <div class="delivery-stage">
+                        <div class="stage-time">{html.escape(formatted_time)}</div>
+                        <div class="stage-path">
+                            {html.escape(stage.get('from_host', ''))}
+                            {f" ({html.escape(stage.get('from_ip', ''))})" if stage.get('from_ip') else ''}
+                            {f" → {html.escape(stage.get('to_host', ''))}" if stage.get('to_host') else ''}
+                            {f" ({html.escape(stage.get('to_ip', ''))})" if stage.get('to_ip') else ''}
+                        </div>
+                        <div class="stage-status {status_class}">
+                            {html.escape(stage.get('status', ''))}
+                        </div>
+                    </div>
+                """)
+
+                if stage.get('status_msg') and stage.get('status') != 'sent':
+                    results_html.append(f'<div class="status-message">{html.escape(stage["status_msg"])}</div>')
+
+                if stage.get('amavis_info'):
+                    amav = stage['amavis_info']
+                    results_html.append(f"""
+                        <div class="amavis-info">
+                            🛡️ Amavis: {html.escape(amav['disposition'])} ({html.escape(amav['reason'])})
+                            | Hits: {html.escape(amav['hits'])} | {html.escape(amav['ms'])} ms
+                        </div>
+                    """)
+
+            results_html.append('</div>')
+
+        # Add email action buttons at the end of message block
+        # Build a list of accounts to try (internal accounts only)
+        import urllib.parse
+        accounts_to_try = []
+
+        # Add sender first (if it's an internal account - likely in "Sent" folder)
+        if msg.sender:
+            accounts_to_try.append(msg.sender)
+
+        # Add all recipients
+        if msg.recipients:
+            for recip in msg.recipients.values():
+                if recip.address not in accounts_to_try:
+                    accounts_to_try.append(recip.address)
+
+        if accounts_to_try:
+            accounts_param = ','.join(accounts_to_try)
+
+            results_html.append(f"""
+                <div class="email-actions">
+                    <a href="/loading_email?id={urllib.parse.quote(msg.message_id)}&accounts={urllib.parse.quote(accounts_param)}"
+                       class="btn-action btn-view-email" target="_blank"
+                       onclick="var btn=this; btn.innerHTML='⏳ {t("loading")}'; btn.style.opacity='0.6'; setTimeout(function(){{btn.innerHTML='📧 {t("view_email")}'; btn.style.opacity='1';}}, 2000);">
+                        📧 {t("view_email")}
+                    </a>
+                    <a href="javascript:void(0);"
+                       class="btn-action btn-download"
+                       onclick="handleDownload('/view_email?id={urllib.parse.quote(msg.message_id)}&accounts={urllib.parse.quote(accounts_param)}&download=1');">
+                        💾 {t("download_email")}
+                    </a>
+                </div>
+            """)
+
+        results_html.append('</div>')
+        return ''.join(results_html)
+
+    def _collect_delivery_path(self, msg: Message, recip: RecipientInfo, recip_addr: str,
+                               parser: Optional[LogParser] = None) -> List[dict]:
+        """Collect the delivery path of a recipient, one stage per queue it went through"""
+        parser = parser or self.parser
+        stages = []
+        hops = parser.delivery_hops(msg, recip)
+        if self.debug and len(hops) > 1:
+            print(f"DEBUG: Delivery path of {recip_addr}: "
+                  f"{' -> '.join(m.queue_ids[0] if m.queue_ids else '?' for m, r in hops)}", file=sys.stderr)
+
+        for msg, recip in hops:
+            stage = {
+                'time': msg.arrive_time or '',
+                'from_host': msg.prev_host or msg.host or '',
+                'from_ip': msg.prev_ip or '',
+                'to_host': recip.next_host or '',
+                'to_ip': recip.next_ip or '',
+                'status': recip.status or '',
+                'status_msg': recip.status_msg or ''
+            }
+
+            # Filter localhost IPs
+            if stage['from_ip'] in ['127.0.0.1', '::1']:
+                stage['from_ip'] = ''
+                if stage['from_host'] == 'localhost':
+                    stage['from_host'] = msg.host or 'localhost'
+
+            # Add Amavis info if available
+            if recip.amavis_id and recip.amavis_id in parser.amavis_records:
+                amav = parser.amavis_records[recip.amavis_id]
+                stage['amavis_info'] = {
+                    'disposition': amav.disposition,
+                    'reason': amav.reason,
+                    'hits': amav.hits,
+                    'ms': amav.ms
+                }
+
+            stages.append(stage)
 
         return stages
 
+class WorkerPoolHTTPServer(HTTPServer):
+    """
+    Handle requests on a fixed pool of worker threads instead of one new
+    thread per request. Connections the workers cannot take right away wait
+    in a bounded queue; beyond that the server answers 503 at once rather
+    than piling up threads.
+    """
+
+    BUSY_RESPONSE = (b'HTTP/1.0 503 Service Unavailable\r\nContent-Type: text/plain\r\n'
+                     b'Retry-After: 5\r\nConnection: close\r\n\r\nServer busy, please retry.\n')
+
+    def __init__(self, server_address, handler_class, workers: int = 16, backlog: int = 64):
+        super().__init__(server_address, handler_class)
+        self.pending = queue.Queue(maxsize=backlog)
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f'http-worker-{i}', daemon=True).start()
+
+    def process_request(self, request, client_address):
+        try:
+            self.pending.put_nowait((request, client_address))
+        except queue.Full:
+            try:
+                request.sendall(self.BUSY_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
 
-class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
-    """Handle requests in a separate thread"""
-    pass
+    def _worker(self):
+        while True:
+            request, client_address = self.pending.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
 
 
 class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
     """HTTP request handler for jt_zmmsgtrace web UI"""
 
     web_ui: WebUI = None
+    timeout = 60  # Seconds a client may stall before its worker thread gives up on it
 
     def log_message(self, format, *args):
         """Suppress default logging"""
@@ -3357,7 +6268,10 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
 
         # Protected routes (authentication required)
         if not self.check_auth():
-            self.redirect_to_login()
+            if path.startswith('/api/'):
+                self._send_json(401, {'error': 'Authentication required, log in at /do_login first'})
+            else:
+                self.redirect_to_login()
             return
 
         if path == '/':
@@ -3372,6 +6286,10 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
             # Perform search
             self.handle_search(query)
 
+        elif path == '/api/search':
+            # Search, JSON results
+            self.handle_api_search(query)
+
         elif path == '/loading_email':
             # Show loading page for email
             self.handle_loading_email(query)
@@ -3384,6 +6302,18 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
             # Get progress status
             self.handle_progress(query)
 
+        elif path == '/status':
+            # Background indexer status
+            self.handle_status()
+
+        elif path == '/stats':
+            # Statistics dashboard
+            self.handle_stats(query, as_json=False)
+
+        elif path == '/api/stats':
+            # Statistics, JSON
+            self.handle_stats(query, as_json=True)
+
         elif path == '/view_headers':
             # View email headers
             self.handle_view_headers(query)
@@ -3468,37 +6398,169 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
             if self.web_ui.debug:
                 print(f"✗ Login failed for {admin_account} from {client_ip}", file=sys.stderr)
 
-            # Check if we should shutdown after this failed attempt
-            exceeded, remaining, next_attempt_time = self.web_ui.check_login_attempts()
-            if exceeded:
-                # Shutdown the server
-                import time
-                wait_time = int(next_attempt_time - time.time()) if next_attempt_time else 0
-                error_msg = get_translation(lang, 'login_attempts_exceeded', wait_time=wait_time)
+            # Check if we should shutdown after this failed attempt
+            exceeded, remaining, next_attempt_time = self.web_ui.check_login_attempts()
+            if exceeded:
+                # Shutdown the server
+                import time
+                wait_time = int(next_attempt_time - time.time()) if next_attempt_time else 0
+                error_msg = get_translation(lang, 'login_attempts_exceeded', wait_time=wait_time)
+
+                self.send_response(403)
+                self.send_header('Content-type', 'text/html; charset=utf-8')
+                self.end_headers()
+                self.wfile.write(self.web_ui.get_login_form_html(lang, error_message=error_msg).encode('utf-8'))
+
+                # Shutdown server after sending response
+                import threading
+                threading.Timer(1.0, self.web_ui.shutdown_due_to_failed_logins).start()
+            else:
+                # Show error with remaining attempts
+                error_msg = get_translation(lang, 'invalid_credentials')
+
+                self.send_response(401)
+                self.send_header('Content-type', 'text/html; charset=utf-8')
+                self.end_headers()
+                self.wfile.write(self.web_ui.get_login_form_html(
+                    lang,
+                    error_message=error_msg,
+                    remaining_attempts=remaining
+                ).encode('utf-8'))
+
+    def handle_search(self, query: dict):
+        """Handle search request"""
+        search_params, display_params, filter_params = self._parse_search_query(query)
+
+        # Extract include_history for log file selection
+        include_history = search_params['include_history']
+
+        # Parse pagination parameters with validation
+        try:
+            offset = int(search_params.get('offset', 0))
+            limit = int(search_params.get('limit', 50))
+            # Limit to reasonable values
+            offset = max(0, min(offset, 100000))
+            limit = max(1, min(limit, 500))
+        except (ValueError, TypeError):
+            offset = 0
+            limit = 50
+
+        # Create filter with error handling
+        try:
+            msg_filter = self._build_filter(filter_params)
+        except ValueError as e:
+            # Return error page for invalid regex
+            error_html = f"""
+<!DOCTYPE html>
+<html lang="zh-TW">
+<head><title>Error - jt_zmmsgtrace</title></head>
+<body style="font-family: sans-serif; padding: 20px;">
+    <h1>❌ Invalid Search Parameters</h1>
+    <p style="color: red;">{html.escape(str(e))}</p>
+    <p><a href="/">← Return to search</a></p>
+</body>
+</html>"""
+            self.send_response(400)
+            self.send_header('Content-type', 'text/html; charset=utf-8')
+            self.end_headers()
+            self.wfile.write(error_html.encode('utf-8'))
+            return
+
+        # Determine which log files to use (those that can overlap the time window)
+        log_files = self.web_ui.search_log_files(include_history, msg_filter.time_window)
+
+        # Parse logs if not already done, or ingest what was appended since the last search
+        self.web_ui.ensure_parser(log_files, include_history)
+
+        # Read the parser under its lock: new log lines may be ingested meanwhile.
+        # The messages are rendered with this parser even if a refresh replaces it
+        with self.web_ui.parser_lock.read():
+            parser = self.web_ui.parser
+            valid_messages = self._find_messages(msg_filter)
+
+        # Pagination
+        total_count = len(valid_messages)
+        paginated_messages = valid_messages[offset:offset + limit]
+        has_more = (offset + limit) < total_count
+
+        # Generate HTML response (use display_params to preserve all original search parameters).
+        # The page is streamed: the head goes out at once, message blocks follow as they are rendered
+        lang = self.get_language()
+        head, tail = self.web_ui.format_results_page(
+            display_params, offset, limit, total_count, len(paginated_messages), has_more, lang)
+        self._send_stream_headers('text/html; charset=utf-8')
+        try:
+            self._write_chunk(head.encode('utf-8'))
+            for block in self._render_batches(
+                    paginated_messages, lambda msg: self.web_ui.format_message_html(msg, msg_filter, lang, parser)):
+                self._write_chunk(block.encode('utf-8'))
+            self._write_chunk(tail.encode('utf-8'))
+            self._end_chunks()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Browser left the page
+
+    def handle_api_search(self, query: dict):
+        """
+        Handle JSON search API request (/api/search).
+
+        Takes the search parameters of /search, but pages are addressed by the
+        opaque 'cursor' returned as next_cursor (the sort key of the last
+        message) instead of an offset, so paging is not shifted by messages
+        ingested or a reparse in between. The traces are streamed.
+        """
+        search_params, display_params, filter_params = self._parse_search_query(query)
+        include_history = search_params['include_history']
 
-                self.send_response(403)
-                self.send_header('Content-type', 'text/html; charset=utf-8')
-                self.end_headers()
-                self.wfile.write(self.web_ui.get_login_form_html(lang, error_message=error_msg).encode('utf-8'))
+        try:
+            limit = max(1, min(int(search_params.get('limit') or 50), 500))
+            cursor = query.get('cursor', [''])[0]
+            after = self._decode_cursor(cursor) if cursor else None
+            msg_filter = self._build_filter(filter_params)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
 
-                # Shutdown server after sending response
-                import threading
-                threading.Timer(1.0, self.web_ui.shutdown_due_to_failed_logins).start()
-            else:
-                # Show error with remaining attempts
-                error_msg = get_translation(lang, 'invalid_credentials')
+        log_files = self.web_ui.search_log_files(include_history, msg_filter.time_window)
+        self.web_ui.ensure_parser(log_files, include_history)
+        with self.web_ui.parser_lock.read():
+            parser = self.web_ui.parser
+            valid_messages = self._find_messages(msg_filter)
+
+        # Messages are sorted newest first: the page starts after the cursor
+        start = 0
+        if after is not None:
+            start = next((i for i, msg in enumerate(valid_messages) if self._sort_key(msg) < after),
+                         len(valid_messages))
+        page = valid_messages[start:start + limit]
+        next_cursor = None
+        if start + limit < len(valid_messages):
+            next_cursor = self._encode_cursor(self._sort_key(page[-1]))
+
+        formatter = OutputFormatter(parser, parser.amavis_records, parser.qid_to_msg)
+        head = json.dumps({'total': len(valid_messages), 'count': len(page), 'next_cursor': next_cursor},
+                          ensure_ascii=False)
+        self._send_stream_headers('application/json; charset=utf-8')
+        try:
+            # {"total": ..., "count": ..., "next_cursor": ..., "messages": [...]}
+            self._write_chunk((head[:-1] + ', "messages": [').encode('utf-8'))
+            separator = ''
+            for block in self._render_batches(page, lambda msg: json.dumps(
+                    formatter.message_to_trace(msg, msg_filter.recipient_pattern), ensure_ascii=False), ', '):
+                self._write_chunk((separator + block).encode('utf-8'))
+                separator = ', '
+            self._write_chunk(b']}\n')
+            self._end_chunks()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
 
-                self.send_response(401)
-                self.send_header('Content-type', 'text/html; charset=utf-8')
-                self.end_headers()
-                self.wfile.write(self.web_ui.get_login_form_html(
-                    lang,
-                    error_message=error_msg,
-                    remaining_attempts=remaining
-                ).encode('utf-8'))
+    def _parse_search_query(self, query: dict) -> Tuple[dict, dict, dict]:
+        """
+        Search parameters of a /search or /api/search request.
 
-    def handle_search(self, query: dict):
-        """Handle search request"""
+        Returns:
+            (search_params, display_params, filter_params): sanitized parameters,
+            the same as entered (for the form) and the non-empty filter criteria
+        """
         # Extract and sanitize search parameters
         def sanitize_input(value, max_length=500):
             """Sanitize user input to prevent injection attacks"""
@@ -3516,6 +6578,7 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
             'recipient': sanitize_input(query.get('recipient', [''])[0]),
             'srchost': sanitize_input(query.get('srchost', [''])[0]),
             'desthost': sanitize_input(query.get('desthost', [''])[0]),
+            'subject': sanitize_input(query.get('subject', [''])[0]),
             'time': sanitize_input(query.get('time', [''])[0], 50),
             'time_start': sanitize_input(query.get('time_start', [''])[0], 30),
             'time_end': sanitize_input(query.get('time_end', [''])[0], 30),
@@ -3549,64 +6612,13 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
             if start or end:
                 search_params['time'] = f"{start},{end}" if start and end else start or end
 
-        # Extract include_history for log file selection
-        include_history = search_params['include_history']
-
         # Create filter_params (clean params for filtering, removing empty values)
         filter_params = {k: v for k, v in search_params.items() if v and k not in ['include_history', 'time_start', 'time_end', 'offset', 'limit']}
 
-        # Determine which log files to use
-        import glob
-        import os
-        if include_history:
-            log_files = sorted(glob.glob('/var/log/zimbra*'))
-            if not log_files:
-                log_files = [DEFAULT_LOGFILE]
-        else:
-            log_files = [DEFAULT_LOGFILE]
-
-        # Check if log files have been modified since last parse
-        log_files_changed = False
-        if self.web_ui.parser:
-            # Get current modification times
-            current_mtimes = {}
-            for filepath in log_files:
-                try:
-                    if os.path.exists(filepath):
-                        current_mtimes[filepath] = os.path.getmtime(filepath)
-                except:
-                    pass
-
-            # Compare with stored modification times
-            if current_mtimes != self.web_ui.parsed_log_files_mtime:
-                log_files_changed = True
-                if self.web_ui.debug:
-                    print(f"📝 Log files have been modified, reloading...", file=sys.stderr)
-
-        # Parse logs if not already done, or if history setting changed, or if log files changed
-        need_reparse = (not self.web_ui.parser) or (self.web_ui.parsed_with_history != include_history) or log_files_changed
-
-        if need_reparse:
-            # Parse logs (移除 Loading 訊息，直接解析)
-            if self.web_ui.debug:
-                files_info = f"{len(log_files)} files" if include_history else "current log file"
-                print(f"Parsing {files_info}...", file=sys.stderr)
-
-            self.web_ui.parser = LogParser(self.web_ui.year, self.web_ui.debug)
-            self.web_ui.parsed_with_history = include_history
-            for filepath in log_files:
-                self.web_ui.parser.parse_file(filepath)
-            self.web_ui.parser.integrate_amavis_data()
-
-            # Store modification times after parsing
-            self.web_ui.parsed_log_files_mtime = {}
-            for filepath in log_files:
-                try:
-                    if os.path.exists(filepath):
-                        self.web_ui.parsed_log_files_mtime[filepath] = os.path.getmtime(filepath)
-                except:
-                    pass
+        return search_params, display_params, filter_params
 
+    def _build_filter(self, filter_params: dict) -> MessageFilter:
+        """MessageFilter for the filter criteria (ValueError on an invalid regex)"""
         # Create filter object
         class Args:
             pass
@@ -3617,73 +6629,31 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
         args.recipient = filter_params.get('recipient')
         args.srchost = filter_params.get('srchost')
         args.desthost = filter_params.get('desthost')
+        args.subject = filter_params.get('subject')
         args.year = self.web_ui.year
 
         # Parse time
         if filter_params.get('time'):
             parts = filter_params['time'].split(',')
-            parser_obj = LogParser(self.web_ui.year)
-            start_time = parser_obj.time_to_number(parts[0].strip()) if len(parts) > 0 and parts[0].strip() else None
-            end_time = parser_obj.time_to_number(parts[1].strip(), max_values=True) if len(parts) > 1 and parts[1].strip() else None
+            start_time = time_to_number(parts[0].strip()) if len(parts) > 0 and parts[0].strip() else None
+            end_time = time_to_number(parts[1].strip(), max_values=True) if len(parts) > 1 and parts[1].strip() else None
             args.time = (start_time, end_time)
         else:
             args.time = None
 
-        # Parse pagination parameters with validation
-        try:
-            offset = int(search_params.get('offset', 0))
-            limit = int(search_params.get('limit', 50))
-            # Limit to reasonable values
-            offset = max(0, min(offset, 100000))
-            limit = max(1, min(limit, 500))
-        except (ValueError, TypeError):
-            offset = 0
-            limit = 50
-
-        # Create filter with error handling
-        try:
-            msg_filter = MessageFilter(args)
-        except ValueError as e:
-            # Return error page for invalid regex
-            error_html = f"""
-<!DOCTYPE html>
-<html lang="zh-TW">
-<head><title>Error - jt_zmmsgtrace</title></head>
-<body style="font-family: sans-serif; padding: 20px;">
-    <h1>❌ Invalid Search Parameters</h1>
-    <p style="color: red;">{html.escape(str(e))}</p>
-    <p><a href="/">← Return to search</a></p>
-</body>
-</html>"""
-            self.send_response(400)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
-            self.wfile.write(error_html.encode('utf-8'))
-            return
+        return MessageFilter(args)
 
-        # Filter messages
+    def _find_messages(self, msg_filter: MessageFilter) -> List[Message]:
+        """Messages matching the filter, newest first (hold parser_lock for reading)"""
+        # Filter messages: narrow down with the secondary indexes, then check each candidate
+        parser = self.web_ui.parser
+        candidate_ids = msg_filter.candidates(parser.search_index)
+        if candidate_ids is None:
+            candidate_ids = parser.messages.keys()
         matching_messages = []
-        for msg_id, queue_dict in self.web_ui.parser.messages.items():
-            if not queue_dict:
-                continue
-
-            # Get root queue
-            all_qids = set(queue_dict.keys())
-            referenced_qids = set()
-            for msg in queue_dict.values():
-                for recip in msg.recipients.values():
-                    if recip.next_queue_id:
-                        referenced_qids.add(recip.next_queue_id)
-
-            root_qids = all_qids - referenced_qids
-            if root_qids:
-                first_qid = sorted(root_qids)[0]
-            else:
-                first_qid = sorted(queue_dict.keys())[0]
-
-            first_msg = queue_dict[first_qid]
-
-            if msg_filter.matches(first_msg):
+        for msg_id in candidate_ids:
+            first_msg = parser.root_message(msg_id)
+            if first_msg and msg_filter.matches(first_msg):
                 matching_messages.append(first_msg)
 
         # Filter out invalid/incomplete messages (unknown or reject with no useful data)
@@ -3696,29 +6666,100 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
                 continue
             valid_messages.append(msg)
 
-        # Sort by arrive_time (newest first)
-        valid_messages.sort(key=lambda m: m.arrive_time or '', reverse=True)
+        # Sort by arrival (newest first); message id keeps the order of ties stable
+        valid_messages.sort(key=self._sort_key, reverse=True)
+        return valid_messages
 
-        # Pagination
-        total_count = len(valid_messages)
-        paginated_messages = valid_messages[offset:offset + limit]
-        has_more = (offset + limit) < total_count
+    @staticmethod
+    def _sort_key(msg: Message) -> Tuple[int, str]:
+        """Order of search results (and /api/search cursor)"""
+        return (msg.arrive_num or 0, msg.message_id)
 
-        # Generate HTML response (use display_params to preserve all original search parameters)
-        lang = self.get_language()
-        html_content = self.web_ui.format_results_html(
-            paginated_messages, display_params, msg_filter,
-            offset=offset, limit=limit, total_count=total_count, has_more=has_more,
-            lang=lang
-        )
+    @staticmethod
+    def _encode_cursor(key: Tuple[int, str]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[int, str]:
+        try:
+            arrive_num, message_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return (int(arrive_num), str(message_id))
+        except (ValueError, TypeError, UnicodeError, binascii.Error):
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    def _render_batches(self, messages: List[Message], render: Callable[[Message], str], separator: str = ''):
+        """
+        Yield the rendered messages in batches of STREAM_BATCH_SIZE. Each batch
+        is rendered under parser_lock, which is released while it is sent.
+        """
+        for i in range(0, len(messages), STREAM_BATCH_SIZE):
+            with self.web_ui.parser_lock.read():
+                block = separator.join(render(msg) for msg in messages[i:i + STREAM_BATCH_SIZE])
+            yield block
 
+    def _send_stream_headers(self, content_type: str, headers: Optional[Dict[str, str]] = None):
+        """
+        Start a 200 response whose body is written piece by piece (_write_chunk):
+        chunked transfer encoding for HTTP/1.1 clients, for HTTP/1.0 clients the
+        body ends when the connection is closed.
+        """
+        self.chunked = self.request_version == 'HTTP/1.1'
+        if self.chunked:
+            self.protocol_version = 'HTTP/1.1'
         self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
+        self.send_header('Content-type', content_type)
+        self.send_header('Cache-Control', 'no-cache')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
         self.end_headers()
-        self.wfile.write(html_content.encode('utf-8'))
+
+    def _write_chunk(self, data: bytes):
+        if not data:
+            return  # An empty chunk would end the body
+        if self.chunked:
+            self.wfile.write(b'%X\r\n%s\r\n' % (len(data), data))
+        else:
+            self.wfile.write(data)
+
+    def _end_chunks(self):
+        if self.chunked:
+            self.wfile.write(b'0\r\n\r\n')
+
+    def _send_json(self, code: int, data: dict):
+        """Send a JSON response"""
+        self.send_response(code)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
 
     def _get_internal_domains(self) -> set:
-        """Get all Zimbra internal domains"""
+        """Get all Zimbra internal domains (cached for DIRECTORY_CACHE_TTL seconds)"""
+        domains = self.web_ui.domain_cache.get('domains')
+        if domains is None:
+            domains = self._load_internal_domains()
+            if domains:  # A failed lookup is retried on the next request
+                self.web_ui.domain_cache.set('domains', domains)
+        return domains
+
+    def _load_internal_domains(self) -> set:
+        """Get all Zimbra internal domains from Zimbra"""
+        try:
+            domains = set(domain['name'] for domain in self.web_ui.soap.get_all_domains() if domain['name'])
+            if self.web_ui.debug:
+                debug_print(f"Found {len(domains)} internal domains: {', '.join(sorted(domains))}")
+            return domains
+        except ZimbraSoapError as e:
+            if self.web_ui.debug:
+                debug_print(f"Failed to get domains: {e}")
+            return set()
+        except ZimbraSoapUnavailable as e:
+            if self.web_ui.debug:
+                debug_print(f"SOAP client not available ({e}), using zmprov")
+
         try:
             import subprocess
             # Get all domains using zmprov
@@ -3728,36 +6769,454 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
                 # Parse domain list (one domain per line)
                 domains = set(line.strip() for line in result.stdout.splitlines() if line.strip())
                 if self.web_ui.debug:
-                    debug_print(f"Found {len(domains)} internal domains: {', '.join(sorted(domains))}")
-                return domains
-            else:
+                    debug_print(f"Found {len(domains)} internal domains: {', '.join(sorted(domains))}")
+                return domains
+            else:
+                if self.web_ui.debug:
+                    debug_print(f"Failed to get domains: {result.stderr}")
+                return set()
+        except Exception as e:
+            if self.web_ui.debug:
+                debug_print(f"Error getting internal domains: {e}")
+            return set()
+
+    def _check_account_exists(self, account: str) -> bool:
+        """Check if a Zimbra account exists"""
+        return bool(self._existing_accounts([account]))
+
+    def _existing_accounts(self, accounts: List[str], update_progress=None, t=None) -> Set[str]:
+        """
+        The accounts that exist in Zimbra. Answers are cached for
+        DIRECTORY_CACHE_TTL seconds; the others are checked in one SOAP
+        BatchRequest, or with one zmsoap call per account (reporting progress)
+        when the SOAP client is not available.
+        """
+        cache = self.web_ui.account_cache
+        known = {}
+        unknown = []
+        for account in accounts:
+            exists = cache.get(account)
+            if exists is None:
+                unknown.append(account)
+            else:
+                known[account] = exists
+        if unknown:
+            checked = self._check_accounts(unknown, update_progress, t)
+            for account, exists in checked.items():
+                cache.set(account, exists)
+            known.update(checked)
+        return {account for account in accounts if known.get(account)}
+
+    def _check_accounts(self, accounts: List[str], update_progress=None, t=None) -> Dict[str, bool]:
+        """Check accounts in Zimbra; accounts that could not be checked are left out"""
+        try:
+            return self.web_ui.soap.check_accounts(accounts)
+        except ZimbraSoapError as e:
+            if self.web_ui.debug:
+                debug_print(f"Error checking accounts: {e}")
+            return {}
+        except ZimbraSoapUnavailable as e:
+            if self.web_ui.debug:
+                debug_print(f"SOAP client not available ({e}), using zmsoap")
+
+        checked = {}
+        for i, account in enumerate(accounts, 1):
+            if update_progress and t:
+                update_progress(t('checking_account_x_of_y', current=i, total=len(accounts), account=account))
+            exists = self._check_account_exists_zmsoap(account)
+            if exists is not None:
+                checked[account] = exists
+        return checked
+
+    def _check_account_exists_zmsoap(self, account: str) -> Optional[bool]:
+        """Check if a Zimbra account exists using zmsoap (None if the check failed)"""
+        try:
+            import subprocess
+            # Use zmsoap SearchRequest to check if account exists (simpler and more reliable)
+            # Just search for any message in the account - if it works, account exists
+            check_cmd = [
+                'sudo', '-u', 'zimbra',
+                '/opt/zimbra/bin/zmsoap', '-z', '-m', account, '-t', 'mail',
+                'SearchRequest', '@types=message', '@query=in:inbox', '@limit=1'
+            ]
+            result = subprocess.run(check_cmd, capture_output=True, text=True, timeout=10)
+            # If account exists, zmsoap returns 0 (even if no messages found)
+            if result.returncode == 0:
+                return True
+            # Only a NO_SUCH_ACCOUNT fault means it does not exist; other errors
+            # (timeouts, service down) are not an answer and must not be cached
+            if 'account.NO_SUCH_ACCOUNT' in result.stderr + result.stdout:
+                return False
+            if self.web_ui.debug:
+                print(f"Error checking account {account}: {result.stderr.strip()}", file=sys.stderr)
+            return None
+        except Exception as e:
+            if self.web_ui.debug:
+                print(f"Error checking account {account}: {e}", file=sys.stderr)
+            return None
+
+    def _fetch_email_content(self, account: str, message_id: str, t, update_progress=None,
+                             stop: Optional[threading.Event] = None) -> Tuple[Optional[MailboxMessage], Optional[str]]:
+        """
+        Find a message by Message-ID in a mailbox and read it, or take it from
+        message_cache when it was read in the last MESSAGE_CACHE_TTL seconds.
+
+        Returns:
+            (message, None) on success, (None, error message) otherwise
+        """
+        location_key = (message_id, account)
+        if location_key in self.web_ui.location_cache:
+            cached = self.web_ui.message_cache.get((account, self.web_ui.location_cache.get(location_key)))
+            if cached is not None:
+                return cached, None
+
+        content, error = self._read_email_content(account, message_id, t, update_progress, stop)
+        if not content:
+            return None, error
+        message = MailboxMessage(content)
+        internal_id = self.web_ui.location_cache.get(location_key)
+        if internal_id is not None and len(content) <= MESSAGE_CACHE_MAX_CHARS:
+            self.web_ui.message_cache.set((account, internal_id), message)
+        return message, None
+
+    def _read_email_content(self, account: str, message_id: str, t, update_progress=None,
+                            stop: Optional[threading.Event] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Find a message by Message-ID in a mailbox and read its raw RFC822 content.
+        Uses the in-process SOAP client, or zmsoap when it is not available.
+        If `stop` is set once the message is found, its content is not read.
+
+        Returns:
+            (content, None) on success, (None, error message) otherwise
+        """
+        soap = self.web_ui.soap
+        location_key = (message_id, account)
+        cached = location_key in self.web_ui.location_cache
+        internal_id = None
+        try:
+            internal_id, error = self._locate_message(account, message_id, t)
+            if not internal_id:
+                return None, error
+            if stop and stop.is_set():
+                return None, None
+
+            if update_progress:
+                update_progress(t('reading_email_from_x', account=account))
+            try:
+                email_content, content_url = soap.get_raw_message(account, internal_id)
+            except ZimbraSoapError as e:
+                if self.web_ui.debug:
+                    debug_print(f"GetMsg failed in {account}: {e}")
+                if cached:
+                    # Deleted since it was cached: search the mailbox again
+                    self.web_ui.location_cache.invalidate(location_key)
+                    return self._read_email_content(account, message_id, t, update_progress, stop)
+                return None, t('account_x_cannot_get_content', account=account)
+        except ZimbraSoapUnavailable as e:
+            if self.web_ui.debug:
+                debug_print(f"SOAP client not available ({e}), using zmsoap")
+            return self._fetch_email_content_zmsoap(account, message_id, t, update_progress, stop,
+                                                    internal_id if cached else None)
+
+        if content_url:
+            return self._download_email_content(account, content_url, t)
+        if not email_content:
+            return None, t('account_x_cannot_parse', account=account)
+        return email_content, None
+
+    def _locate_message(self, account: str, message_id: str, t) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Item ID of a message in a mailbox, from location_cache or a SOAP search.
+        Raises ZimbraSoapUnavailable when the SOAP client cannot be used.
+
+        Returns:
+            (item ID, None) when found, (None, error message) otherwise
+        """
+        location_key = (message_id, account)
+        internal_id = self.web_ui.location_cache.get(location_key)
+        if internal_id is not None:
+            return internal_id, None
+        try:
+            internal_id = self.web_ui.soap.search_message_id(account, message_id)
+        except ZimbraSoapError as e:
+            if self.web_ui.debug:
+                debug_print(f"Search failed in {account}: {e}")
+            return None, t('account_x_search_failed', account=account)
+        if not internal_id:
+            if self.web_ui.debug:
+                debug_print(f"Message not found in {account}")
+            return None, t('account_x_email_not_found', account=account)
+        self.web_ui.location_cache.set(location_key, internal_id)
+        return internal_id, None
+
+    def _stream_raw_message(self, account: str, internal_id: str, message_id: str, t, update_progress) -> bool:
+        """
+        Download mode: pass a message's raw content from the mailbox REST URL
+        (?fmt=raw) to the client DOWNLOAD_BLOCK_SIZE bytes at a time as it
+        arrives, so memory use does not grow with the message size.
+
+        Returns:
+            False, with nothing sent yet, when the URL cannot be opened (the
+            caller then reads the message the usual way), True otherwise
+        """
+        soap = self.web_ui.soap
+        try:
+            token = soap.delegate_token(account)
+            self.web_ui.get_zimbra_config()
+            host = self.web_ui.zimbra_public_hostname or soap.host
+            port = self.web_ui.zimbra_public_port or 443
+            url = (f'https://{host}:{port}/service/home/{urllib.parse.quote(account, safe="@")}/'
+                   f'?id={urllib.parse.quote(internal_id)}&fmt=raw')
+            if self.web_ui.debug:
+                debug_print(f"Streaming from: {url}")
+            response = soap.open_content(url, token)
+        except (ZimbraSoapError, ZimbraSoapUnavailable) as e:
+            if self.web_ui.debug:
+                debug_print(f"Cannot stream {internal_id} from {account} ({e}), reading it whole")
+            return False
+
+        update_progress(t('preparing_file'), complete=True)
+        sent = 0
+        try:
+            self._send_stream_headers('message/rfc822', {
+                'Content-Disposition': f'attachment; filename="{message_id}.eml"',
+                # A cookie signals download completion to the loading page
+                'Set-Cookie': 'downloadComplete=true; Path=/; Max-Age=10',
+            })
+            while True:
+                block = response.read(DOWNLOAD_BLOCK_SIZE)
+                if not block:
+                    break
+                self._write_chunk(block)
+                sent += len(block)
+            self._end_chunks()
+        except (OSError, http.client.HTTPException) as e:
+            # Zimbra or the client went away mid-message: the body is left unterminated
+            if self.web_ui.debug:
+                debug_print(f"Download of {internal_id} from {account} stopped after {sent} bytes: {e}")
+        finally:
+            response.close()
+        if self.web_ui.debug:
+            debug_print(f"Streamed {sent} bytes from {account}")
+        return True
+
+    def _download_email_content(self, account: str, content_url: str, t) -> Tuple[Optional[str], Optional[str]]:
+        """Download message content Zimbra returned as a URL, with a delegated token for the mailbox"""
+        if self.web_ui.debug:
+            print(f"Content returned as URL, fetching content from: {content_url}", file=sys.stderr)
+
+        # Get admin token
+        admin_token = self.web_ui.get_admin_token()
+        if not admin_token:
+            if self.web_ui.debug:
+                debug_print(f"Failed to get admin token")
+            return None, t('account_x_no_admin_auth', account=account)
+
+        # Get delegate token for the account
+        user_token = self.web_ui.get_delegate_token(admin_token, account)
+        if not user_token:
+            if self.web_ui.debug:
+                debug_print(f"Failed to get delegate token for {account}")
+            return None, t('account_x_no_delegate_auth', account=account)
+
+        # Get Zimbra public service config
+        self.web_ui.get_zimbra_config()
+
+        # Add fmt=raw to get full RFC822 content
+        download_url = content_url
+        if '?' in download_url:
+            download_url += '&fmt=raw'
+        else:
+            download_url += '?fmt=raw'
+
+        # Build full URL with correct hostname and port
+        full_url = f'https://{self.web_ui.zimbra_public_hostname}:{self.web_ui.zimbra_public_port}{download_url}'
+        if self.web_ui.debug:
+            print(f"Downloading from: {full_url}", file=sys.stderr)
+
+        try:
+            email_content = self.web_ui.soap.download(full_url, user_token)
+            if email_content:
+                return email_content, None
+            return None, t('account_x_cannot_get_from_url', account=account)
+        except ZimbraSoapError as e:
+            if self.web_ui.debug:
+                print(f"Download failed: {e}", file=sys.stderr)
+            return None, t('account_x_cannot_get_from_url', account=account)
+        except ZimbraSoapUnavailable as e:
+            if self.web_ui.debug:
+                debug_print(f"Download failed ({e}), using curl")
+
+        curl_cmd = [
+            'sudo', '-u', 'zimbra',
+            'curl', '-s', '-k',
+            '-H', f'Cookie: ZM_AUTH_TOKEN={user_token}',
+            full_url
+        ]
+        try:
+            curl_result = subprocess.run(curl_cmd, capture_output=True, text=True, timeout=30)
+        except subprocess.TimeoutExpired:
+            return None, f"帳號 {account}: 請求逾時"
+        if self.web_ui.debug:
+            print(f"curl returncode: {curl_result.returncode}", file=sys.stderr)
+            print(f"curl stdout length: {len(curl_result.stdout)}", file=sys.stderr)
+            if curl_result.stderr:
+                print(f"curl stderr: {curl_result.stderr[:200]}", file=sys.stderr)
+
+        if curl_result.returncode == 0 and curl_result.stdout and not 'HTTP ERROR' in curl_result.stdout:
+            return curl_result.stdout, None
+        return None, t('account_x_cannot_get_from_url', account=account)
+
+    def _fetch_email_content_zmsoap(self, account: str, message_id: str, t, update_progress=None,
+                                    stop: Optional[threading.Event] = None,
+                                    internal_id: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """_read_email_content() through zmsoap subprocesses (internal_id: cached item ID, skips the search)"""
+        location_key = (message_id, account)
+        try:
+            if internal_id is None:
+                # Search for the email using zmsoap SearchRequest
+                # Use correct syntax: field[Message-ID]:"<message-id>"
+                search_query = f'field[Message-ID]:"<{message_id}>"'
+
+                search_cmd = [
+                    'sudo', '-u', 'zimbra',
+                    '/opt/zimbra/bin/zmsoap', '-z', '-m', account, '-t', 'mail',
+                    'SearchRequest',
+                    f'@types=message',
+                    f'@query={search_query}'
+                ]
+
+                if self.web_ui.debug:
+                    debug_print(f"Running: {' '.join(search_cmd)}")
+
+                search_result = subprocess.run(search_cmd, capture_output=True, text=True, timeout=30)
+
+                if search_result.returncode != 0:
+                    if self.web_ui.debug:
+                        print(f"Search failed: {search_result.stderr}", file=sys.stderr)
+                    return None, t('account_x_search_failed', account=account)
+
+                # Parse search result to get the internal message ID
+                # zmsoap returns XML like: <m rev="..." id="12345" .../>
+                # id attribute may not be the first attribute
+                match = re.search(r'<m[^>]*\sid="(\d+)"', search_result.stdout)
+                if not match:
+                    if self.web_ui.debug:
+                        print(f"Message not found in {account}", file=sys.stderr)
+                    return None, t('account_x_email_not_found', account=account)
+
+                internal_id = match.group(1)
+                self.web_ui.location_cache.set(location_key, internal_id)
+            if stop and stop.is_set():
+                return None, None
+
+            if update_progress:
+                update_progress(t('reading_email_from_x', account=account))
+
+            # Get the email content using zmsoap GetMsgRequest
+            # Correct syntax: GetMsgRequest m (not /m) with attributes
+            # Try to force inline content with useContentUrl=0
+            get_cmd = [
+                'sudo', '-u', 'zimbra',
+                '/opt/zimbra/bin/zmsoap', '-z', '-m', account, '-t', 'mail',
+                'GetMsgRequest', 'm',
+                f'@id={internal_id}',
+                '@raw=1',
+                '@useContentUrl=0'
+            ]
+
+            if self.web_ui.debug:
+                debug_print(f"Getting email from account: {account}, ID: {internal_id}")
+                debug_print(f"Running: {' '.join(get_cmd)}")
+
+            get_result = subprocess.run(get_cmd, capture_output=True, text=True, timeout=30)
+
+            if get_result.returncode != 0:
+                if self.web_ui.debug:
+                    print(f"GetMsg failed: {get_result.stderr}", file=sys.stderr)
+                self.web_ui.location_cache.invalidate(location_key)
+                return None, t('account_x_cannot_get_content', account=account)
+
+            if self.web_ui.debug:
+                print(f"GetMsg stdout length: {len(get_result.stdout)} chars", file=sys.stderr)
+                print(f"GetMsg stdout (first 500 chars): {get_result.stdout[:500]}", file=sys.stderr)
+
+            # zmsoap returns: <m ...><content>BASE64_OR_TEXT</content></m>
+            # With @raw=1, it should return the raw RFC822 message in <content>
+            # However, some Zimbra versions return <content url="..."/> instead
+            url_match = re.search(r'<content\s+url="([^"]+)"\s*/>', get_result.stdout)
+            if url_match:
+                return self._download_email_content(account, url_match.group(1), t)
+
+            # Try to extract content from XML
+            content_match = re.search(r'<content>(.*?)</content>', get_result.stdout, re.DOTALL)
+            if not content_match:
                 if self.web_ui.debug:
-                    debug_print(f"Failed to get domains: {result.stderr}")
-                return set()
-        except Exception as e:
+                    print(f"Cannot parse email content from XML", file=sys.stderr)
+                    print(f"XML response (full): {get_result.stdout}", file=sys.stderr)
+                return None, t('account_x_cannot_parse', account=account)
+
+            # Unescape XML/HTML entities (zmsoap escapes special characters in XML)
+            email_content = html.unescape(content_match.group(1).strip())
+            if not email_content:
+                return None, t('account_x_cannot_get_content', account=account)
+            return email_content, None
+        except subprocess.TimeoutExpired:
+            return None, f"帳號 {account}: 請求逾時"
+
+    def _search_mailboxes(self, accounts: List[str], message_id: str, t, update_progress=None,
+                          locate_only: bool = False):
+        """
+        Look for a message in several mailboxes at once (MAILBOX_SEARCH_WORKERS
+        at a time) and yield (account, MailboxMessage, error) as the searches finish,
+        so the first mailbox holding the message is returned without waiting
+        for the others. Once the caller stops iterating, searches not started
+        yet are cancelled and running ones skip reading the content.
+        With locate_only the message's item ID is yielded instead of its content.
+        """
+        stop = threading.Event()
+        total = len(accounts)
+        location_cache = self.web_ui.location_cache
+
+        def search(current: int, account: str) -> Tuple[object, Optional[str]]:
+            if stop.is_set():
+                return None, None
+            if update_progress:
+                update_progress(t('searching_account_x_of_y', current=current, total=total, account=account))
             if self.web_ui.debug:
-                debug_print(f"Error getting internal domains: {e}")
-            return set()
+                debug_print(f"Trying account: {account}")
+            try:
+                if locate_only:
+                    return self._locate_message(account, message_id, t)
+                return self._fetch_email_content(account, message_id, t, update_progress, stop)
+            except Exception as e:
+                if self.web_ui.debug:
+                    print(f"Error with account {account}: {e}", file=sys.stderr)
+                return None, f"帳號 {account}: 發生錯誤"
+
+        # Mailboxes the message was found in before are read first, without searching the others
+        numbered = list(enumerate(accounts, 1))
+        known = [(i, account) for i, account in numbered if (message_id, account) in location_cache]
+        for i, account in known:
+            found, error = search(i, account)
+            yield account, found, error
+        numbered = [item for item in numbered if item not in known]
+        if not numbered:
+            return
 
-    def _check_account_exists(self, account: str) -> bool:
-        """Check if a Zimbra account exists using zmsoap"""
+        executor = ThreadPoolExecutor(max_workers=min(MAILBOX_SEARCH_WORKERS, len(numbered)))
+        futures = {executor.submit(search, i, account): account for i, account in numbered}
         try:
-            import subprocess
-            # Use zmsoap SearchRequest to check if account exists (simpler and more reliable)
-            # Just search for any message in the account - if it works, account exists
-            check_cmd = [
-                'sudo', '-u', 'zimbra',
-                '/opt/zimbra/bin/zmsoap', '-z', '-m', account, '-t', 'mail',
-                'SearchRequest', '@types=message', '@query=in:inbox', '@limit=1'
-            ]
-            result = subprocess.run(check_cmd, capture_output=True, text=True, timeout=10)
-            # If account exists, zmsoap returns 0 (even if no messages found)
-            # If account doesn't exist, returns error
-            return result.returncode == 0
-        except Exception as e:
+            for future in as_completed(futures):
+                found, error = future.result()
+                yield futures[future], found, error
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
             if self.web_ui.debug:
-                print(f"Error checking account {account}: {e}", file=sys.stderr)
-            return False
+                debug_print(f"Cache: {self.web_ui.cache_stats()}")
 
     def handle_loading_email(self, query: dict):
         """Show loading page that will load the actual email content"""
@@ -3916,6 +7375,51 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(json.dumps(progress_data).encode('utf-8'))
 
+    def handle_status(self):
+        """Handle indexer status request (JSON)"""
+        self._send_json(200, self.web_ui.status())
+
+    def handle_stats(self, query: dict, as_json: bool):
+        """
+        Handle statistics request (/stats dashboard, /api/stats JSON) over the
+        messages matching the search parameters of /search (all by default).
+        Results are cached until new log lines are parsed.
+        """
+        search_params, display_params, filter_params = self._parse_search_query(query)
+        include_history = search_params['include_history']
+        lang = self.get_language()
+        try:
+            top = max(1, min(int(query.get('top', [''])[0] or STATS_TOP), 100))
+            msg_filter = self._build_filter(filter_params)
+        except ValueError as e:
+            if as_json:
+                self._send_json(400, {'error': str(e)})
+            else:
+                self._send_error_html('Invalid Search Parameters', str(e), lang=lang)
+            return
+
+        log_files = self.web_ui.search_log_files(include_history, msg_filter.time_window)
+        self.web_ui.ensure_parser(log_files, include_history)
+        with self.web_ui.parser_lock.read():
+            parser = self.web_ui.parser
+            key = (tuple(sorted(filter_params.items())), include_history, top,
+                   id(parser), self.web_ui.refresh_stats['refreshes'])
+            stats = self.web_ui.stats_cache.get(key)
+            if stats is None:
+                candidate_ids = msg_filter.candidates(parser.search_index)
+                stats = trace_statistics(parser, candidate_ids, msg_filter, top)
+                self.web_ui.stats_cache.set(key, stats)
+
+        if as_json:
+            self._send_json(200, stats)
+            return
+        body = self.web_ui.format_stats_html(stats, display_params, lang).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def handle_view_email(self, query: dict):
         """Handle view email request"""
         import subprocess
@@ -4000,10 +7504,10 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
 
         # Second pass: verify each internal domain account actually exists
         update_progress(t('checking_x_internal_accounts', count=len(internal_domain_accounts)))
+        found_accounts = self._existing_accounts(internal_domain_accounts, update_progress, t)
 
-        for i, account in enumerate(internal_domain_accounts, 1):
-            update_progress(t('checking_account_x_of_y', current=i, total=len(internal_domain_accounts), account=account))
-            if self._check_account_exists(account):
+        for account in internal_domain_accounts:
+            if account in found_accounts:
                 existing_accounts.append(account)
                 if self.web_ui.debug:
                     debug_print(f"✓ {account} exists")
@@ -4024,159 +7528,33 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
             )
             return
 
-        # Try each existing account until we find the email
+        # Downloads are streamed from the mailbox REST URL when the SOAP client can be used:
+        # the mailboxes are only searched for the message's item ID, its content is not read here
+        locate_only = False
+        if is_download:
+            try:
+                self.web_ui.soap.admin_token()
+                locate_only = True
+            except (ZimbraSoapError, ZimbraSoapUnavailable) as e:
+                if self.web_ui.debug:
+                    debug_print(f"SOAP client not available ({e}), download is read whole")
+
+        # Search all existing accounts at once, the first one holding the email wins
         update_progress(t('searching_x_accounts', count=len(existing_accounts)))
         last_error = None
         tried_accounts = []
 
-        for i, account in enumerate(existing_accounts, 1):
+        for account, found, last_error in self._search_mailboxes(existing_accounts, message_id, t,
+                                                                  update_progress, locate_only):
             tried_accounts.append(account)
-            update_progress(t('searching_account_x_of_y', current=i, total=len(existing_accounts), account=account))
+            if locate_only and found:
+                # found is the item ID here
+                if self._stream_raw_message(account, found, message_id, t, update_progress):
+                    return
+                found, last_error = self._fetch_email_content(account, message_id, t, update_progress)
             try:
-                # Search for the email using zmsoap SearchRequest
-                # Use correct syntax: field[Message-ID]:"<message-id>"
-                search_query = f'field[Message-ID]:"<{message_id}>"'
-
-                search_cmd = [
-                    'sudo', '-u', 'zimbra',
-                    '/opt/zimbra/bin/zmsoap', '-z', '-m', account, '-t', 'mail',
-                    'SearchRequest',
-                    f'@types=message',
-                    f'@query={search_query}'
-                ]
-
-                if self.web_ui.debug:
-                    debug_print(f"Trying account: {account}")
-                    debug_print(f"Running: {' '.join(search_cmd)}")
-
-                search_result = subprocess.run(search_cmd, capture_output=True, text=True, timeout=30)
-
-                if search_result.returncode != 0:
-                    last_error = t('account_x_search_failed', account=account)
-                    if self.web_ui.debug:
-                        print(f"Search failed: {search_result.stderr}", file=sys.stderr)
-                    continue
-
-                # Parse search result to get the internal message ID
-                # zmsoap returns XML like: <m rev="..." id="12345" .../>
-                # id attribute may not be the first attribute
-                match = re.search(r'<m[^>]*\sid="(\d+)"', search_result.stdout)
-                if not match:
-                    last_error = t('account_x_email_not_found', account=account)
-                    if self.web_ui.debug:
-                        print(f"Message not found in {account}", file=sys.stderr)
-                    continue
-
-                internal_id = match.group(1)
-
-                update_progress(t('reading_email_from_x', account=account))
-
-                # Get the email content using zmsoap GetMsgRequest
-                # Correct syntax: GetMsgRequest m (not /m) with attributes
-                # Try to force inline content with useContentUrl=0
-                get_cmd = [
-                    'sudo', '-u', 'zimbra',
-                    '/opt/zimbra/bin/zmsoap', '-z', '-m', account, '-t', 'mail',
-                    'GetMsgRequest', 'm',
-                    f'@id={internal_id}',
-                    '@raw=1',
-                    '@useContentUrl=0'
-                ]
-
-                if self.web_ui.debug:
-                    debug_print(f"Getting email from account: {account}, ID: {internal_id}")
-                    debug_print(f"Running: {' '.join(get_cmd)}")
-
-                get_result = subprocess.run(get_cmd, capture_output=True, text=True, timeout=30)
-
-                if get_result.returncode == 0:
-                    if self.web_ui.debug:
-                        print(f"GetMsg stdout length: {len(get_result.stdout)} chars", file=sys.stderr)
-                        print(f"GetMsg stdout (first 500 chars): {get_result.stdout[:500]}", file=sys.stderr)
-
-                    # Success! Extract email content from XML
-                    # zmsoap returns: <m ...><content>BASE64_OR_TEXT</content></m>
-                    # With @raw=1, it should return the raw RFC822 message in <content>
-                    # However, some Zimbra versions return <content url="..."/> instead
-
-                    # Check if content is returned as URL (need to fetch via URL)
-                    email_content = None
-                    url_match = re.search(r'<content\s+url="([^"]+)"\s*/>', get_result.stdout)
-                    if url_match:
-                        # Content is a URL, need to fetch it with authentication
-                        content_url = url_match.group(1)
-                        if self.web_ui.debug:
-                            print(f"zmsoap returned URL, fetching content from: {content_url}", file=sys.stderr)
-
-                        # Get admin token
-                        admin_token = self.web_ui.get_admin_token()
-                        if not admin_token:
-                            last_error = t('account_x_no_admin_auth', account=account)
-                            if self.web_ui.debug:
-                                debug_print(f"Failed to get admin token")
-                            continue
-
-                        # Get delegate token for the account
-                        user_token = self.web_ui.get_delegate_token(admin_token, account)
-                        if not user_token:
-                            last_error = t('account_x_no_delegate_auth', account=account)
-                            if self.web_ui.debug:
-                                debug_print(f"Failed to get delegate token for {account}")
-                            continue
-
-                        # Get Zimbra public service config
-                        self.web_ui.get_zimbra_config()
-
-                        # Add fmt=raw to get full RFC822 content
-                        download_url = content_url
-                        if '?' in download_url:
-                            download_url += '&fmt=raw'
-                        else:
-                            download_url += '?fmt=raw'
-
-                        # Build full URL with correct hostname and port
-                        full_url = f'https://{self.web_ui.zimbra_public_hostname}:{self.web_ui.zimbra_public_port}{download_url}'
-                        curl_cmd = [
-                            'sudo', '-u', 'zimbra',
-                            'curl', '-s', '-k',
-                            '-H', f'Cookie: ZM_AUTH_TOKEN={user_token}',
-                            full_url
-                        ]
-
-                        if self.web_ui.debug:
-                            print(f"Downloading from: {full_url}", file=sys.stderr)
-
-                        curl_result = subprocess.run(curl_cmd, capture_output=True, text=True, timeout=30)
-                        if self.web_ui.debug:
-                            print(f"curl returncode: {curl_result.returncode}", file=sys.stderr)
-                            print(f"curl stdout length: {len(curl_result.stdout)}", file=sys.stderr)
-                            if curl_result.stderr:
-                                print(f"curl stderr: {curl_result.stderr[:200]}", file=sys.stderr)
-
-                        if curl_result.returncode == 0 and curl_result.stdout and not 'HTTP ERROR' in curl_result.stdout:
-                            email_content = curl_result.stdout
-                        else:
-                            last_error = t('account_x_cannot_get_from_url', account=account)
-                            continue
-                    else:
-                        # Try to extract content from XML
-                        content_match = re.search(r'<content>(.*?)</content>', get_result.stdout, re.DOTALL)
-                        if content_match:
-                            email_content = content_match.group(1).strip()
-                            # Unescape XML/HTML entities (zmsoap escapes special characters in XML)
-                            email_content = html.unescape(email_content)
-                        else:
-                            last_error = t('account_x_cannot_parse', account=account)
-                            if self.web_ui.debug:
-                                print(f"Cannot parse email content from XML", file=sys.stderr)
-                                print(f"XML response (full): {get_result.stdout}", file=sys.stderr)
-                            continue
-
-                    # At this point, email_content should be set (either from zmsoap or zmmailbox)
-                    if not email_content:
-                        last_error = t('account_x_cannot_get_content', account=account)
-                        continue
-
+                if found:
+                    email_content = found.content
                     # Handle both download and view modes
                     self.send_response(200)
                     if is_download:
@@ -4191,15 +7569,13 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
                         return  # Success - download complete
                     else:
                         # View mode: Parse email and return HTML with nice formatting
-                        from email import message_from_string
-                        from email.header import decode_header
                         import quopri
                         import base64
 
-                        # Parse email
+                        # Parse email (parsed once per cached message)
                         try:
                             update_progress(t('rendering_email'), complete=True)
-                            msg = message_from_string(email_content)
+                            msg = found.message
 
                             # Extract headers (using global decode_header_value function)
                             email_from = decode_header_value(msg.get('From', ''))
@@ -4351,18 +7727,8 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
                             raw_headers_content = ''
                             raw_body_content = ''
                             try:
-                                # Find the blank line separator between headers and body
-                                body_start = email_content.find('\n\n')
-                                if body_start == -1:
-                                    body_start = email_content.find('\r\n\r\n')
-                                    if body_start != -1:
-                                        # For \r\n\r\n, skip 4 chars
-                                        raw_headers_content = email_content[:body_start]
-                                        raw_body_content = email_content[body_start + 4:]
-                                else:
-                                    # For \n\n, skip 2 chars
-                                    raw_headers_content = email_content[:body_start]
-                                    raw_body_content = email_content[body_start + 2:]
+                                # Split at the blank line separator between headers and body
+                                raw_headers_content, raw_body_content = found.split()
 
                                 if not raw_headers_content:
                                     # Fallback: use email parser to get headers
@@ -4386,7 +7752,7 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
                                 raw_headers_content = ''
                                 raw_body_content = ''
 
-                            # Dictionary to store inline images (CID -> data URI)
+                            # Inline images (CID -> MIME part), only decoded if the HTML body refers to them
                             inline_images = {}
 
                             if msg.is_multipart():
@@ -4401,24 +7767,8 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
 
                                     # Handle inline images (Content-ID exists and is image type)
                                     if content_id and content_type.startswith('image/'):
-                                        try:
-                                            import base64
-                                            # Get image data
-                                            image_data = part.get_payload(decode=True)
-                                            if image_data:
-                                                # Convert to base64 data URI
-                                                b64_data = base64.b64encode(image_data).decode('ascii')
-                                                data_uri = f"data:{content_type};base64,{b64_data}"
-
-                                                # Extract CID (remove < > brackets if present)
-                                                cid = content_id.strip('<>')
-                                                inline_images[cid] = data_uri
-
-                                                if self.web_ui.debug:
-                                                    print(f"Found inline image: CID={cid}, type={content_type}, size={len(image_data)} bytes", file=sys.stderr)
-                                        except Exception as e:
-                                            if self.web_ui.debug:
-                                                print(f"Error processing inline image {content_id}: {e}", file=sys.stderr)
+                                        # Extract CID (remove < > brackets if present)
+                                        inline_images[content_id.strip('<>')] = part
 
                                     if content_type == 'text/plain' and not email_body_text:
                                         try:
@@ -4446,11 +7796,25 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
 
                                 # Replace CID references in HTML with data URIs
                                 if email_body_html and inline_images:
-                                    for cid, data_uri in inline_images.items():
+                                    for cid, part in inline_images.items():
+                                        if f'cid:{cid}' not in email_body_html:
+                                            continue
+                                        try:
+                                            # Get image data
+                                            image_data = part.get_payload(decode=True)
+                                            if not image_data:
+                                                continue
+                                            # Convert to base64 data URI
+                                            b64_data = base64.b64encode(image_data).decode('ascii')
+                                            data_uri = f"data:{part.get_content_type()};base64,{b64_data}"
+                                        except Exception as e:
+                                            if self.web_ui.debug:
+                                                print(f"Error processing inline image {cid}: {e}", file=sys.stderr)
+                                            continue
                                         # Replace cid: references
                                         email_body_html = email_body_html.replace(f'cid:{cid}', data_uri)
                                         if self.web_ui.debug:
-                                            print(f"Replaced cid:{cid} in HTML", file=sys.stderr)
+                                            print(f"Replaced cid:{cid} in HTML ({len(image_data)} bytes)", file=sys.stderr)
                             else:
                                 # Not multipart - single body
                                 try:
@@ -5364,15 +8728,6 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
                         self.end_headers()
                         self.wfile.write(html_content.encode('utf-8'))
                         return  # Success, exit
-                else:
-                    last_error = f"帳號 {account}: 無法讀取郵件內容"
-                    if self.web_ui.debug:
-                        print(f"GetMsg failed: {get_result.stderr}", file=sys.stderr)
-                    continue
-
-            except subprocess.TimeoutExpired:
-                last_error = f"帳號 {account}: 請求逾時"
-                continue
             except Exception as e:
                 if self.web_ui.debug:
                     print(f"Error with account {account}: {e}", file=sys.stderr)
@@ -5445,8 +8800,9 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
         if self.web_ui.debug:
             debug_print(f"Checking {len(valid_accounts)} accounts...")
 
+        found_accounts = self._existing_accounts(valid_accounts)
         for account in valid_accounts:
-            if self._check_account_exists(account):
+            if account in found_accounts:
                 existing_accounts.append(account)
                 if self.web_ui.debug:
                     debug_print(f"✓ {account} exists")
@@ -5467,150 +8823,15 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
             )
             return
 
-        # Try each existing account until we find the email
+        # Search all existing accounts at once, the first one holding the email wins
         last_error = None
         tried_accounts = []
 
-        for account in existing_accounts:
+        for account, found, last_error in self._search_mailboxes(existing_accounts, message_id, t):
             tried_accounts.append(account)
             try:
-                # Search for the email using zmsoap SearchRequest
-                # Use correct syntax: field[Message-ID]:"<message-id>"
-                search_query = f'field[Message-ID]:"<{message_id}>"'
-
-                search_cmd = [
-                    'sudo', '-u', 'zimbra',
-                    '/opt/zimbra/bin/zmsoap', '-z', '-m', account, '-t', 'mail',
-                    'SearchRequest',
-                    f'@types=message',
-                    f'@query={search_query}'
-                ]
-
-                if self.web_ui.debug:
-                    debug_print(f"Trying account: {account}")
-                    debug_print(f"Running: {' '.join(search_cmd)}")
-
-                search_result = subprocess.run(search_cmd, capture_output=True, text=True, timeout=30)
-
-                if search_result.returncode != 0:
-                    last_error = t('account_x_search_failed', account=account)
-                    if self.web_ui.debug:
-                        print(f"Search failed: {search_result.stderr}", file=sys.stderr)
-                    continue
-
-                # Parse search result to get the internal message ID
-                # zmsoap returns XML like: <m rev="..." id="12345" .../>
-                # id attribute may not be the first attribute
-                match = re.search(r'<m[^>]*\sid="(\d+)"', search_result.stdout)
-                if not match:
-                    last_error = t('account_x_email_not_found', account=account)
-                    if self.web_ui.debug:
-                        print(f"Message not found in {account}", file=sys.stderr)
-                    continue
-
-                internal_id = match.group(1)
-
-                # Get the email headers using zmsoap GetMsgRequest
-                # Correct syntax: GetMsgRequest m (not /m) with attributes
-                # Try to force inline content with useContentUrl=0
-                get_cmd = [
-                    'sudo', '-u', 'zimbra',
-                    '/opt/zimbra/bin/zmsoap', '-z', '-m', account, '-t', 'mail',
-                    'GetMsgRequest', 'm',
-                    f'@id={internal_id}',
-                    '@raw=1',
-                    '@useContentUrl=0'
-                ]
-
-                if self.web_ui.debug:
-                    print(f"Getting headers from account: {account}, ID: {internal_id}", file=sys.stderr)
-                    print(f"Running: {' '.join(get_cmd)}", file=sys.stderr)
-
-                get_result = subprocess.run(get_cmd, capture_output=True, text=True, timeout=30)
-
-                if get_result.returncode == 0:
-                    if self.web_ui.debug:
-                        print(f"GetMsg stdout length: {len(get_result.stdout)} chars", file=sys.stderr)
-                        print(f"GetMsg stdout (first 500 chars): {get_result.stdout[:500]}", file=sys.stderr)
-
-                    # Check if content is returned as URL (need to fetch via URL)
-                    email_content = None
-                    url_match = re.search(r'<content\s+url="([^"]+)"\s*/>', get_result.stdout)
-                    if url_match:
-                        # Content is a URL, need to fetch it with authentication
-                        content_url = url_match.group(1)
-                        if self.web_ui.debug:
-                            print(f"zmsoap returned URL, fetching content from: {content_url}", file=sys.stderr)
-
-                        # Get admin token
-                        admin_token = self.web_ui.get_admin_token()
-                        if not admin_token:
-                            last_error = t('account_x_no_admin_auth', account=account)
-                            if self.web_ui.debug:
-                                debug_print(f"Failed to get admin token")
-                            continue
-
-                        # Get delegate token for the account
-                        user_token = self.web_ui.get_delegate_token(admin_token, account)
-                        if not user_token:
-                            last_error = t('account_x_no_delegate_auth', account=account)
-                            if self.web_ui.debug:
-                                debug_print(f"Failed to get delegate token for {account}")
-                            continue
-
-                        # Get Zimbra public service config
-                        self.web_ui.get_zimbra_config()
-
-                        # Add fmt=raw to get full RFC822 content
-                        download_url = content_url
-                        if '?' in download_url:
-                            download_url += '&fmt=raw'
-                        else:
-                            download_url += '?fmt=raw'
-
-                        # Build full URL with correct hostname and port
-                        full_url = f'https://{self.web_ui.zimbra_public_hostname}:{self.web_ui.zimbra_public_port}{download_url}'
-                        curl_cmd = [
-                            'sudo', '-u', 'zimbra',
-                            'curl', '-s', '-k',
-                            '-H', f'Cookie: ZM_AUTH_TOKEN={user_token}',
-                            full_url
-                        ]
-
-                        if self.web_ui.debug:
-                            print(f"Downloading from: {full_url}", file=sys.stderr)
-
-                        curl_result = subprocess.run(curl_cmd, capture_output=True, text=True, timeout=30)
-                        if self.web_ui.debug:
-                            print(f"curl returncode: {curl_result.returncode}", file=sys.stderr)
-                            print(f"curl stdout length: {len(curl_result.stdout)}", file=sys.stderr)
-                            if curl_result.stderr:
-                                print(f"curl stderr: {curl_result.stderr[:200]}", file=sys.stderr)
-
-                        if curl_result.returncode == 0 and curl_result.stdout and not 'HTTP ERROR' in curl_result.stdout:
-                            email_content = curl_result.stdout
-                        else:
-                            last_error = t('account_x_cannot_get_from_url', account=account)
-                            continue
-                    else:
-                        # Try to extract content from XML
-                        content_match = re.search(r'<content>(.*?)</content>', get_result.stdout, re.DOTALL)
-                        if content_match:
-                            email_content = content_match.group(1).strip()
-                            # Unescape XML/HTML entities (zmsoap escapes special characters in XML)
-                            email_content = html.unescape(email_content)
-                        else:
-                            last_error = t('account_x_cannot_parse', account=account)
-                            if self.web_ui.debug:
-                                print(f"Cannot parse email content from XML", file=sys.stderr)
-                                print(f"XML response (full): {get_result.stdout}", file=sys.stderr)
-                            continue
-
-                    # At this point, email_content should be set
-                    if not email_content:
-                        last_error = t('account_x_cannot_get_content', account=account)
-                        continue
-
+                if found:
+                    email_content = found.content
                     # Extract only headers (RFC 822: headers and body separated by blank line)
                     # DETAILED DEBUG: Analyze email content structure
                     if self.web_ui.debug:
@@ -5644,13 +8865,9 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
                             print(f"\nContext around \\n\\n (pos {nn_pos}):\n{context}", file=sys.stderr)
 
                     # Search for blank line separator in original content
-                    headers_end = email_content.find('\n\n')
+                    headers = found.split()[0]
 
-                    if headers_end == -1:
-                        headers_end = email_content.find('\r\n\r\n')
-
-                    if headers_end != -1:
-                        headers = email_content[:headers_end]
+                    if headers:
 
                         if self.web_ui.debug:
                             print(f"\nHeaders extracted: {len(headers)} characters", file=sys.stderr)
@@ -5678,8 +8895,7 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
                             print(f"No blank line found, using email parser fallback", file=sys.stderr)
 
                         try:
-                            from email import message_from_string
-                            msg_for_headers = message_from_string(email_content)
+                            msg_for_headers = found.message
 
                             # Build headers manually from parsed message
                             headers_list = []
@@ -5865,15 +9081,6 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
                     self.end_headers()
                     self.wfile.write(html_content.encode('utf-8'))
                     return  # Success, exit
-                else:
-                    last_error = f"帳號 {account}: 無法讀取郵件標頭"
-                    if self.web_ui.debug:
-                        print(f"GetMsg failed: {get_result.stderr}", file=sys.stderr)
-                    continue
-
-            except subprocess.TimeoutExpired:
-                last_error = f"帳號 {account}: 請求逾時"
-                continue
             except Exception as e:
                 if self.web_ui.debug:
                     print(f"Error with account {account}: {e}", file=sys.stderr)
@@ -5984,17 +9191,31 @@ class JtZmmsgtraceRequestHandler(BaseHTTPRequestHandler):
         self.wfile.write(html_content.encode('utf-8'))
 
 
+def open_log_index(db_path: Optional[str], year: int, debug: int = 0, jobs: int = 0) -> Optional[LogIndex]:
+    """Open the persistent parse index, or return None if disabled/unavailable"""
+    if not db_path:
+        return None
+    try:
+        return LogIndex(db_path, year, debug, jobs)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: cannot use index '{db_path}' ({e}), parsing log files directly", file=sys.stderr)
+        return None
+
+
 def start_web_server(log_files: List[str], year: int, port: int = 8989, debug: int = 0,
-                     login_attempts: int = 5, login_timeout: int = 10):
+                     login_attempts: int = 5, login_timeout: int = 10,
+                     index_db: Optional[str] = DEFAULT_INDEX_DB, jobs: int = 0, workers: int = 16,
+                     refresh_interval: int = DEFAULT_REFRESH_INTERVAL):
     """Start the web server"""
-    web_ui = WebUI(log_files, year, debug, login_attempts, login_timeout)
+    index = open_log_index(index_db, year, debug, jobs)
+    web_ui = WebUI(log_files, year, debug, login_attempts, login_timeout, index, jobs)
 
     if debug:
         print(f"🔒 Login security: max {login_attempts} attempts within {login_timeout} minutes", file=sys.stderr)
 
     JtZmmsgtraceRequestHandler.web_ui = web_ui
 
-    server = ThreadedHTTPServer(('0.0.0.0', port), JtZmmsgtraceRequestHandler)
+    server = WorkerPoolHTTPServer(('0.0.0.0', port), JtZmmsgtraceRequestHandler, workers=workers)
 
     # Start background thread for cleaning expired sessions
     import threading
@@ -6015,13 +9236,22 @@ def start_web_server(log_files: List[str], year: int, port: int = 8989, debug: i
     cleanup_thread = threading.Thread(target=cleanup_sessions_periodically, daemon=True)
     cleanup_thread.start()
 
+    # Pre-warm the parser and keep it up to date in the background
+    indexer_thread = threading.Thread(target=web_ui.run_indexer, args=(refresh_interval,), daemon=True)
+    indexer_thread.start()
+
     print(f"🌐 jt_zmmsgtrace Web UI started")
     print(f"📡 Server running on http://0.0.0.0:{port}/")
     print(f"🔗 Access from browser: http://localhost:{port}/ or http://<server-ip>:{port}/")
     print(f"📁 Log files ({len(log_files)}): {', '.join(log_files[:3])}")
     if len(log_files) > 3:
         print(f"    ... and {len(log_files) - 3} more files")
+    if index:
+        print(f"🗂️  Parse index: {index.db_path}")
     print(f"🔐 Session lifetime: 12 hours (matches Zimbra auth token)")
+    print(f"🧵 Worker threads: {workers}")
+    if refresh_interval > 0:
+        print(f"🔄 Background refresh: every {refresh_interval} seconds (status: /status)")
     print(f"\n⌨️  Press Ctrl+C to stop the server\n")
 
     try:
@@ -6054,6 +9284,9 @@ Examples:
                         help='Search by source hostname or IP address (supports regex)')
     parser.add_argument('-D', '--desthost',
                         help='Search by destination hostname or IP address (supports regex)')
+    parser.add_argument('-S', '--subject',
+                        help='Search by subject words, all of which must appear (not a regex, case-insensitive). '
+                             'Chinese/Japanese/Korean text matches anywhere in the subject. Example: "會議 通知"')
     parser.add_argument('-t', '--time',
                         help='Time range filter: YYYYMM[DD[HH[MM[SS]]]],YYYYMM[DD[HH[MM[SS]]]]. '
                              'Example: 20250101,20250131 or 202501')
@@ -6072,10 +9305,32 @@ Examples:
     parser.add_argument('--all-logs', action='store_true',
                         help='Load all /var/log/zimbra* files including archived logs. '
                              'Default: only /var/log/zimbra.log. Works in both CLI and Web UI mode.')
+    parser.add_argument('--index-db',
+                        help=f'SQLite index of parsed log files, so rotated logs are parsed only once and '
+                             f'only new lines of the live log are read (Web UI default: {DEFAULT_INDEX_DB}; '
+                             f'the CLI uses no index unless given)')
+    parser.add_argument('--no-index', action='store_true',
+                        help='Do not use the parse index, always parse the log files directly')
+    parser.add_argument('--jobs', type=int, default=0,
+                        help='Worker processes for parsing multiple log files in parallel '
+                             '(default: 0 = one per CPU, 1 = sequential)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Print each message trace as soon as it is complete while the logs are read, '
+                             'instead of after parsing everything (memory stays bounded; CLI mode only)')
+    parser.add_argument('--stream-grace', type=int, default=60,
+                        help='With --stream: seconds of log time to wait for Amavis data of a message '
+                             'before printing it anyway (default: 60)')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Print one JSON object per message trace (newline delimited JSON) instead of text')
     parser.add_argument('--login-attempts', type=int, default=5,
                         help='Maximum failed login attempts before Web UI shutdown (default: 5). Security feature.')
     parser.add_argument('--login-timeout', type=int, default=10,
                         help='Time window in minutes for tracking failed login attempts (default: 10)')
+    parser.add_argument('--web-workers', type=int, default=16,
+                        help='Web UI worker threads, i.e. requests served at the same time (default: 16)')
+    parser.add_argument('--refresh-interval', type=int, default=DEFAULT_REFRESH_INTERVAL,
+                        help=f'Web UI: seconds between background parses of new log lines, so searches do not '
+                             f'wait for them (default: {DEFAULT_REFRESH_INTERVAL}, 0 = only parse at start-up)')
     parser.add_argument('-v', '--version', action='version',
                         version=f'%(prog)s {VERSION}')
     parser.add_argument('files', nargs='*', default=[DEFAULT_LOGFILE],
@@ -6101,7 +9356,10 @@ Examples:
             log_files = args.files
 
         start_web_server(log_files, args.year, args.port, args.debug,
-                         args.login_attempts, args.login_timeout)
+                         args.login_attempts, args.login_timeout,
+                         None if args.no_index else args.index_db or DEFAULT_INDEX_DB,
+                         args.jobs, max(args.web_workers, 1),
+                         args.refresh_interval)
         return
 
     # Determine which log files to load for CLI mode
@@ -6124,36 +9382,110 @@ Examples:
     # Parse time range
     if args.time:
         parts = args.time.split(',')
-        log_parser = LogParser(args.year)
-        start_time = log_parser.time_to_number(parts[0].strip()) if len(parts) > 0 and parts[0].strip() else None
-        end_time = log_parser.time_to_number(parts[1].strip(), max_values=True) if len(parts) > 1 and parts[1].strip() else None
+        start_time = time_to_number(parts[0].strip()) if len(parts) > 0 and parts[0].strip() else None
+        end_time = time_to_number(parts[1].strip(), max_values=True) if len(parts) > 1 and parts[1].strip() else None
         args.time = (start_time, end_time)
     else:
         args.time = None
 
-    # Display search criteria
-    print("Tracing messages")
-    if args.id:
-        print(f"\tID {args.id}")
-    if args.sender:
-        print(f"\tfrom {args.sender}")
-    if args.recipient:
-        print(f"\tto {args.recipient}")
-    if args.srchost:
-        print(f"\treceived from host {args.srchost}")
-    if args.desthost:
-        print(f"\tdelivered to host {args.desthost}")
-    if args.time:
-        print(f"\tduring window (start,end) {args.time[0] or 'any'},{args.time[1] or 'any'}")
-    print()
+    # Display search criteria (NDJSON output carries nothing but the traces)
+    if not args.ndjson:
+        print("Tracing messages")
+        if args.id:
+            print(f"\tID {args.id}")
+        if args.sender:
+            print(f"\tfrom {args.sender}")
+        if args.recipient:
+            print(f"\tto {args.recipient}")
+        if args.srchost:
+            print(f"\treceived from host {args.srchost}")
+        if args.desthost:
+            print(f"\tdelivered to host {args.desthost}")
+        if args.subject:
+            print(f"\twith subject {args.subject}")
+        if args.time:
+            print(f"\tduring window (start,end) {args.time[0] or 'any'},{args.time[1] or 'any'}")
+        print()
 
     if args.debug:
         print(f"Processing {len(files)} file(s)...", file=sys.stderr)
+    base_rss = current_rss()
+
+    msg_filter = MessageFilter(args)
+    recipient_pattern = re.compile(args.recipient, re.IGNORECASE) if args.recipient else None
+    displayed = 0
 
-    # Parse all log files
-    log_parser = LogParser(args.year, args.debug)
-    for filepath in files:
-        log_parser.parse_file(filepath)
+    # Skip the files outside a --time window; without the index, plain files
+    # are also read from close to its start only
+    index = None
+    if not args.stream:
+        index = open_log_index(None if args.no_index else args.index_db, args.year, args.debug, args.jobs)
+    start_offsets = {}
+    cut_files = set()  # Files whose beginning continues log lines that are not read
+    if msg_filter.time_window:
+        kept = prune_log_files(files, msg_filter.time_window, args.year, index, args.debug)
+        by_age = files if args.nosort else files[::-1]
+        cut_files.update(filepath for previous, filepath in zip(by_age, by_age[1:])
+                         if filepath in kept and previous not in kept)
+        files = kept
+        if not index:
+            start_offsets = time_start_offsets(files, msg_filter.time_window, args.year, args.debug)
+            cut_files.update(start_offsets)
+
+    def display(log_parser: LogParser, formatter: OutputFormatter, msg_id: str):
+        """Print the trace of a message if it matches the search criteria"""
+        nonlocal displayed
+        # Display using the root queue (not referenced by any other queue's next_queue_id) as entry point
+        first_msg = log_parser.root_message(msg_id)
+
+        # Skip messages without recipients (e.g., NOQUEUE without actual delivery)
+        if not first_msg or not first_msg.recipients:
+            return
+        # Queue entry begun in a skipped file or before the offset a file was
+        # read from: it arrived before the time window, but its arrival is unknown
+        if not first_msg.arrive_time and first_msg.source_file in cut_files:
+            return
+
+        if msg_filter.matches(first_msg):
+            if args.ndjson:
+                print(json.dumps(formatter.message_to_trace(first_msg, recipient_pattern), ensure_ascii=False))
+            else:
+                formatter.display_message(first_msg, recipient_pattern)
+            displayed += 1
+
+    if args.stream:
+        # Emit traces while parsing; files are read in order, without the index
+        log_parser = LogParser(args.year, args.debug)
+        formatter = OutputFormatter(log_parser, log_parser.amavis_records, log_parser.qid_to_msg)
+
+        def emit(msg_id: str):
+            display(log_parser, formatter, msg_id)
+            sys.stdout.flush()
+
+        tracer = StreamTracer(log_parser, emit, args.stream_grace)
+        # Oldest first (files are sorted newest first unless --nosort), and queue
+        # entries still open at the end of a rotated file continue in the next one
+        stream_files = files if args.nosort else files[::-1]
+        for i, filepath in enumerate(stream_files):
+            log_parser.parse_file(filepath, start_offsets.get(filepath, 0), finalize=(i == len(stream_files) - 1))
+        tracer.flush()
+
+        if args.debug:
+            print(f"Streamed {tracer.emitted_count} message(s), displayed {displayed}", file=sys.stderr)
+        return
+
+    # Parse all log files (through the index when available), oldest first so
+    # queue entries open across a rotation are joined in chronological order
+    chronological = files if args.nosort else files[::-1]
+    if index:
+        index.update(files)
+        log_parser = index.load(chronological)
+    elif len(files) > 1 and args.jobs != 1:
+        log_parser = parse_files_parallel(files, args.year, args.debug, args.jobs, start_offsets=start_offsets)
+    else:
+        log_parser = LogParser(args.year, args.debug)
+        for i, filepath in enumerate(chronological):
+            log_parser.parse_file(filepath, start_offsets.get(filepath, 0), finalize=(i == len(chronological) - 1))
 
     # Integrate Amavis data (KEY STEP!)
     log_parser.integrate_amavis_data()
@@ -6161,46 +9493,12 @@ Examples:
     if args.debug:
         total_msgs = sum(len(queues) for queues in log_parser.messages.values())
         print(f"Total messages parsed: {len(log_parser.messages)} unique message-ids, {total_msgs} queue stages", file=sys.stderr)
+        print(memory_report(log_parser, base_rss), file=sys.stderr)
 
     # Filter and display messages
-    msg_filter = MessageFilter(args)
     formatter = OutputFormatter(log_parser, log_parser.amavis_records, log_parser.qid_to_msg)
-
-    recipient_pattern = re.compile(args.recipient, re.IGNORECASE) if args.recipient else None
-
-    displayed = 0
-    # Iterate through message_id -> queue_dict
-    for msg_id, queue_dict in log_parser.messages.items():
-        if not queue_dict:
-            continue
-
-        # Find the root queue (not referenced by any other queue's next_queue_id)
-        all_qids = set(queue_dict.keys())
-        referenced_qids = set()
-        for msg in queue_dict.values():
-            for recip in msg.recipients.values():
-                if recip.next_queue_id:
-                    referenced_qids.add(recip.next_queue_id)
-
-        # Root queues are those not referenced by others
-        root_qids = all_qids - referenced_qids
-
-        # Use the first root queue (or first queue if no root found)
-        if root_qids:
-            first_qid = sorted(root_qids)[0]  # Use first root in alphabetical order
-        else:
-            first_qid = sorted(queue_dict.keys())[0]
-
-        first_msg = queue_dict[first_qid]
-
-        # Skip messages without recipients (e.g., NOQUEUE without actual delivery)
-        if not first_msg.recipients:
-            continue
-
-        if msg_filter.matches(first_msg):
-            # Display using the root queue as entry point
-            formatter.display_message(first_msg, recipient_pattern)
-            displayed += 1
+    for msg_id in log_parser.messages:
+        display(log_parser, formatter, msg_id)
 
     if args.debug:
         print(f"Displayed {displayed} message(s)", file=sys.stderr)
@@ -6212,6 +9510,11 @@ if __name__ == '__main__':
     except KeyboardInterrupt:
         print("\nInterrupted", file=sys.stderr)
         sys.exit(1)
+    except BrokenPipeError:
+        # Output piped into head, jq, ... which exited early
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         if '--debug' in sys.argv:
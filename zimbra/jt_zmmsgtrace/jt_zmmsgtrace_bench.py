@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+jt_zmmsgtrace_bench.py - Micro-benchmark for the jt_zmmsgtrace log parser
+
+Generates a synthetic zimbra.log (postfix, amavis and unrelated syslog lines,
+with multi-recipient, multi-hop, rejected, bounced and deduplicated-recipient
+messages) and measures parse throughput, search filter speed, search latency,
+memory per message and peak RSS of jt_zmmsgtrace.py.
+Pass --baseline with another copy of jt_zmmsgtrace.py (e.g. an older release)
+to compare both on the same log; the traces of every message and the search
+results must be identical.
+--check verifies that the faster paths of the current version (parallel parse
+of rotated files, parse index, indexed search) give the same traces and
+results as a plain sequential parse and a full scan.
+--compressed also measures reading the log as rotated .gz / .bz2 files: the
+gzip/bz2 module line by line (the old path) against open_log_file().
+
+Usage:
+  python3 jt_zmmsgtrace_bench.py                      # 1M lines, current version
+  python3 jt_zmmsgtrace_bench.py --baseline /tmp/jt_zmmsgtrace_old.py
+  python3 jt_zmmsgtrace_bench.py --lines 200000 --log /tmp/bench.log
+  python3 jt_zmmsgtrace_bench.py --lines 200000 --compressed
+  python3 jt_zmmsgtrace_bench.py --lines 200000 --check
+
+Author: Jason Cheng (Jason Tools)
+License: GNU GPL v2
+"""
+
+import argparse
+import bz2
+import contextlib
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DEFAULT_LINES = 1000000
+YEAR = 2025
+CHECK_SPLITS = 4  # Rotated files the log is cut into for --check
+
+# Searches timed by bench_search (as the Web UI runs them: index candidates, then MessageFilter)
+SEARCHES = [
+    ('message id', {'id': r'^4242\.'}),
+    ('sender', {'sender': r'@ext1\.example\.com$'}),
+    ('recipient', {'recipient': r'^u42@local\.example\.tw$'}),
+    ('dedup recipient', {'recipient': r'^alias42'}),
+    ('subject', {'subject': 'Report 4242'}),
+    ('time window', {'time': (f"{YEAR}1101010000", f"{YEAR}1101020000")}),
+    ('sender + time', {'sender': r'@ext1\.', 'time': (f"{YEAR}1101000000", f"{YEAR}1101020000")}),
+]
+
+
+def load_module(path: str, name: str):
+    """Import a jt_zmmsgtrace.py file as a module"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # parse_files_parallel() pickles its worker function by module name, worker
+    # processes import it again (from this directory for the current version)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_qid(n: int) -> str:
+    """Short format postfix queue ID"""
+    return "%X" % (0x1000000000 + n)
+
+
+def generate_log(path: str, lines: int, seed: int = 1) -> int:
+    """
+    Write a synthetic zimbra.log with about the given number of lines.
+    Each message goes through smtpd -> amavis -> lmtp (two queue stages);
+    some messages have several recipients, deferred or bounced deliveries,
+    and roughly a quarter of the lines belong to other services. Less common
+    cases are mixed in:
+      - multi-hop: a third queue stage behind a second content filter
+      - deduplicated: amavis lists an alias Zimbra delivered only once, with
+        no postfix record of its own
+      - rejected: NOQUEUE rejects, and spam blocked (discarded) by amavis
+
+    Returns:
+        Number of lines written
+    """
+    rnd = random.Random(seed)
+    written = 0
+    i = 0
+    with open(path, 'w') as fh:
+        while written < lines:
+            ts = "Nov %2d %02d:%02d:%02d" % (1 + i // 86400 % 28, i // 3600 % 24, i // 60 % 60, i % 60)
+            q1 = make_qid(i * 3)
+            q2 = make_qid(i * 3 + 1)
+            q3 = make_qid(i * 3 + 2)
+            msg_id = f"{i}.{rnd.randint(1000, 9999)}@ext{i % 50}.example.com"
+            sender = f"user{rnd.randint(0, 999)}@ext{i % 50}.example.com"
+            recipients = [f"u{rnd.randint(0, 4999)}@local.example.tw" for _ in range(rnd.choice((1, 1, 1, 2, 3)))]
+            ip = f"203.0.113.{rnd.randint(1, 254)}"
+            case = rnd.random()
+            blocked = case < 0.03
+            multi_hop = 0.03 <= case < 0.11
+            # Aliases of the same mailbox: amavis lists both, Zimbra delivers once
+            scanned = recipients + ([f"alias{i}@local.example.tw"] if 0.11 <= case < 0.16 else [])
+
+            out = [
+                f"{ts} mail postfix/smtpd[1101]: connect from mx{i % 20}.example.com[{ip}]",
+                f"{ts} mail postfix/smtpd[1101]: {q1}: client=mx{i % 20}.example.com[{ip}]",
+                f"{ts} mail postfix/cleanup[1102]: {q1}: message-id=<{msg_id}>",
+                f"{ts} mail postfix/cleanup[1102]: {q1}: warning: header Subject: Report {i} "
+                f"from mx{i % 20}.example.com[{ip}]; from=<{sender}> to=<{recipients[0]}> proto=ESMTP",
+                f"{ts} mail postfix/qmgr[1103]: {q1}: from=<{sender}>, size={2000 + i % 5000}, "
+                f"nrcpt={len(recipients)} (queue active)",
+            ]
+            if blocked:
+                for recip in recipients:
+                    out.append(
+                        f"{ts} mail postfix/smtp[1104]: {q1}: to=<{recip}>, relay=127.0.0.1[127.0.0.1]:10032, "
+                        f"delay=1.2, delays=0.1/0/0/1.1, dsn=2.7.0, status=sent (250 2.7.0 Ok, discarded, "
+                        f"id={i:05d}-01 - spam)")
+                out.append(
+                    f"{ts} mail amavis[2201]: ({i:05d}-01) Blocked SPAM {{DiscardedInbound,Quarantined}}, "
+                    f"[{ip}] [{ip}] <{sender}> -> {','.join('<%s>' % r for r in scanned)}, "
+                    f"quarantine: spam-m{i}.gz, Queue-ID: {q1}, mail_id: m{i}, Hits: 1{i % 10}.2, "
+                    f"size: {2000 + i % 5000}, {100 + i % 900} ms")
+                out.append(f"{ts} mail postfix/qmgr[1103]: {q1}: removed")
+            else:
+                for recip in recipients:
+                    out.append(
+                        f"{ts} mail postfix/smtp[1104]: {q1}: to=<{recip}>, relay=127.0.0.1[127.0.0.1]:10032, "
+                        f"delay=0.8, delays=0.1/0/0/0.7, dsn=2.0.0, status=sent (250 2.0.0 from "
+                        f"MTA(smtp:[127.0.0.1]:10030): 250 2.0.0 Ok: queued as {q2})")
+                out.append(
+                    f"{ts} mail amavis[2201]: ({i:05d}-01) Passed CLEAN {{RelayedInbound}}, [{ip}] [{ip}] "
+                    f"<{sender}> -> {','.join('<%s>' % r for r in scanned)}, Queue-ID: {q1}, "
+                    f"mail_id: m{i}, Hits: -0.{i % 10}, size: {2000 + i % 5000}, queued_as: {q2}, {100 + i % 900} ms")
+                out.append(f"{ts} mail postfix/qmgr[1103]: {q1}: removed")
+                hops = [(q2, q3), (q3, None)] if multi_hop else [(q2, None)]
+                for qid, next_qid in hops:
+                    out.append(f"{ts} mail postfix/smtpd[1105]: {qid}: client=localhost[127.0.0.1]")
+                    out.append(f"{ts} mail postfix/cleanup[1102]: {qid}: message-id=<{msg_id}>")
+                    out.append(f"{ts} mail postfix/qmgr[1103]: {qid}: from=<{sender}>, size={2500 + i % 5000}, "
+                               f"nrcpt={len(recipients)} (queue active)")
+                    for recip in recipients:
+                        if next_qid:
+                            out.append(
+                                f"{ts} mail postfix/smtp[1108]: {qid}: to=<{recip}>, relay=127.0.0.1[127.0.0.1]:10026, "
+                                f"delay=0.3, delays=0/0/0/0.3, dsn=2.0.0, status=sent (250 2.0.0 Ok: queued as {next_qid})")
+                            continue
+                        chance = rnd.random()
+                        if chance < 0.02:
+                            out.append(
+                                f"{ts} mail postfix/lmtp[1106]: {qid}: to=<{recip}>, relay=mail.example.tw[10.0.0.5]:7025, "
+                                f"delay=0.2, delays=0/0/0/0.2, dsn=5.1.1, status=bounced (host mail.example.tw[10.0.0.5] "
+                                f"said: 550 5.1.1 <{recip}>: Recipient address rejected: User unknown (in reply to RCPT TO command))")
+                        else:
+                            status = "deferred" if chance < 0.07 else "sent"
+                            out.append(
+                                f"{ts} mail postfix/lmtp[1106]: {qid}: to=<{recip}>, relay=mail.example.tw[10.0.0.5]:7025, "
+                                f"delay=0.2, delays=0/0/0/0.2, dsn=2.0.0, status={status} (250 2.1.5 Delivery OK)")
+                    out.append(f"{ts} mail postfix/qmgr[1103]: {qid}: removed")
+            if rnd.random() < 0.1:
+                out.append(
+                    f"{ts} mail postfix/smtpd[1107]: NOQUEUE: reject: RCPT from bad{i}.example.net"
+                    f"[198.51.100.{i % 250}]: 554 5.7.1 Service unavailable; from=<spam{i}@example.net> "
+                    f"to=<{recipients[0]}> proto=ESMTP helo=<bad{i}>")
+            # Unrelated services share the log
+            for _ in range(len(out) // 3):
+                out.append(rnd.choice((
+                    f"{ts} mail zimbramon[3301]: 3301:info: zmstat mtaqueue.csv: 0, 0, 0, 0, 0",
+                    f"{ts} mail slapd[3302]: conn={i} op=1 SRCH base=\"\" scope=0 deref=0 filter=\"(objectClass=*)\"",
+                    f"{ts} mail saslauthd[3303]: zmauth: authenticating against elected url",
+                    f"{ts} mail postfix/smtpd[1101]: disconnect from mx{i % 20}.example.com[{ip}] ehlo=1 mail=1 quit=1",
+                )))
+
+            fh.write('\n'.join(out))
+            fh.write('\n')
+            written += len(out)
+            i += 1
+    return written
+
+
+def bench_parse(module, log_path: str, repeat: int):
+    """Best-of-N wall time of parse_file + integrate_amavis_data"""
+    best = None
+    parser = None
+    for _ in range(repeat):
+        parser = module.LogParser(YEAR)
+        start = time.perf_counter()
+        parser.parse_file(log_path)
+        parser.integrate_amavis_data()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, parser
+
+
+def make_filter(module, **criteria):
+    """MessageFilter for the given criteria (id, sender, recipient, subject, time...)"""
+    class Args:
+        pass
+
+    args = Args()
+    for name in ('id', 'sender', 'recipient', 'srchost', 'desthost', 'subject', 'time'):
+        setattr(args, name, criteria.get(name))
+    args.year = YEAR
+    return module.MessageFilter(args)
+
+
+def bench_filter(module, parser, repeat: int):
+    """Best-of-N wall time of MessageFilter.matches over every message (time + sender)"""
+    # Message i arrives i seconds after Nov 1 00:00 from ext{i % 50}: both terms
+    # match from the second message on, whatever the size of the log
+    msg_filter = make_filter(module, sender=r'@ext1\.example\.com$',
+                             time=(f"{YEAR}1101000000", f"{YEAR}1101120000"))
+
+    msgs = [m for queues in parser.messages.values() for m in queues.values()]
+    best = None
+    hits = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = sum(1 for m in msgs if msg_filter.matches(m))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, hits, len(msgs)
+
+
+def root_message(parser, msg_id: str):
+    """The queue a trace starts from (the first queue on versions without LogParser.root_message)"""
+    if hasattr(parser, 'root_message'):
+        return parser.root_message(msg_id)
+    queues = parser.messages.get(msg_id)
+    return next(iter(queues.values())) if queues else None
+
+
+def find_messages(parser, msg_filter, msg_ids) -> list:
+    """Message ids among msg_ids whose trace matches, as the CLI and the Web UI select them"""
+    found = []
+    for msg_id in msg_ids:
+        msg = root_message(parser, msg_id)
+        if msg and msg.recipients and msg_filter.matches(msg):
+            found.append(msg_id)
+    return sorted(found)
+
+
+def bench_search(module, parser, repeat: int):
+    """
+    Best-of-N latency of each of SEARCHES: SearchIndex candidates checked
+    with MessageFilter, or a scan of every message on versions without the
+    index. Indexed results must equal the scan.
+
+    Returns:
+        (seconds to build the index or None, {search: (seconds, matching message ids)})
+    """
+    index_time = None
+    index = None
+    if hasattr(module, 'SearchIndex'):
+        start = time.perf_counter()
+        index = module.SearchIndex(YEAR)
+        index.update(parser, list(parser.messages))
+        index_time = time.perf_counter() - start
+
+    results = {}
+    for name, criteria in SEARCHES:
+        try:
+            msg_filter = make_filter(module, **criteria)
+        except TypeError:
+            continue  # Criterion this version does not know
+        if criteria.get('subject') and not hasattr(msg_filter, 'subject_terms'):
+            continue
+        best = None
+        found = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            candidates = msg_filter.candidates(index) if index is not None else None
+            found = find_messages(parser, msg_filter, parser.messages if candidates is None else candidates)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if index is not None and found != find_messages(parser, msg_filter, parser.messages):
+            print(f"ERROR: indexed search '{name}' differs from a full scan", file=sys.stderr)
+            sys.exit(1)
+        results[name] = (best, found)
+    return index_time, results
+
+
+class TraceDigest:
+    """
+    SHA-256 of the CLI trace of every message (OutputFormatter output, in
+    message id order), to check that two parses found exactly the same.
+    "Log:" lines are left out, so a log split into rotated files gives the
+    same digest as the whole log.
+    """
+
+    def __init__(self, module, parser):
+        formatter = module.OutputFormatter(parser, parser.amavis_records, parser.qid_to_msg)
+        digest = hashlib.sha256()
+        self.traces = 0
+        for msg_id in sorted(parser.messages):
+            msg = root_message(parser, msg_id)
+            if not msg or not msg.recipients:
+                continue
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                formatter.display_message(msg)
+            trace = ''.join(line for line in out.getvalue().splitlines(True) if not line.startswith('Log: '))
+            digest.update(trace.encode('utf-8'))
+            self.traces += 1
+        self.hexdigest = digest.hexdigest()
+
+    def __eq__(self, other) -> bool:
+        return (self.traces, self.hexdigest) == (other.traces, other.hexdigest)
+
+
+def split_log(log_path: str, parts: int) -> list:
+    """
+    Cut the log into rotated files (oldest first, mtimes in that order) at
+    arbitrary lines, so queues span the cuts as they do at log rotation.
+    """
+    with open(log_path, 'rb') as fh:
+        lines = fh.readlines()
+    files = []
+    size = -(-len(lines) // parts)
+    now = time.time()
+    for n in range(parts):
+        path = f"{log_path}.part{n}"
+        with open(path, 'wb') as fh:
+            fh.writelines(lines[n * size:(n + 1) * size])
+        os.utime(path, (now - parts + n, now - parts + n))
+        files.append(path)
+    return files
+
+
+def check_traces(module, log_path: str) -> bool:
+    """
+    Traces of the log cut into rotated files against a sequential parse: a
+    parallel parse, and the parse index (built with the live file growing in
+    between, then loaded again from the database). Also checks that the file
+    time ranges of the index are right under another --year.
+    """
+    parser = module.LogParser(YEAR)
+    parser.parse_file(log_path)
+    parser.integrate_amavis_data()
+    expected = TraceDigest(module, parser)
+    del parser
+
+    def same_traces(name: str, parser) -> bool:
+        parser.integrate_amavis_data()
+        digest = TraceDigest(module, parser)
+        same = digest == expected
+        print(f"  {name}: {'identical' if same else 'DIFFERENT'} ({digest.traces:,} traces)")
+        return same
+
+    files = split_log(log_path, CHECK_SPLITS)
+    tmp_dir = tempfile.mkdtemp(prefix='jt_zmmsgtrace_bench_')
+    try:
+        for jobs in (1, CHECK_SPLITS):
+            parser = module.parse_files_parallel(files, YEAR, jobs=jobs)
+            if not same_traces(f"parallel parse of {CHECK_SPLITS} files, {jobs} job(s)", parser):
+                return False
+
+        # The live (last) file is indexed half written, then its tail once it grew
+        live = files[-1]
+        with open(live, 'rb') as fh:
+            data = fh.read()
+        cut = data.rfind(b'\n', 0, len(data) // 2) + 1
+        mtime = os.path.getmtime(live)
+        with open(live, 'wb') as fh:
+            fh.write(data[:cut])
+        os.utime(live, (mtime, mtime))
+        db_path = os.path.join(tmp_dir, 'index.db')
+        index = module.LogIndex(db_path, YEAR, jobs=CHECK_SPLITS)
+        index.update(files)
+        with open(live, 'ab') as fh:
+            fh.write(data[cut:])
+        os.utime(live, (mtime, mtime))
+        index.update(files)
+        if not same_traces(f"index of {CHECK_SPLITS} files", index.load(files)):
+            return False
+        if not same_traces("index reloaded", module.LogIndex(db_path, YEAR).load(files)):
+            return False
+
+        # Time ranges stored under one --year, then used under another
+        window = (int(f"{YEAR - 1}1101000000"), int(f"{YEAR - 1}1101010000"))
+        kept = module.prune_log_files(files, window, YEAR - 1, module.LogIndex(db_path, YEAR - 1))
+        expected_kept = module.prune_log_files(files, window, YEAR - 1)
+        same = kept == expected_kept and bool(kept)
+        print(f"  index under --year {YEAR - 1}: {'identical' if same else 'DIFFERENT'} "
+              f"({len(kept)} of {len(files)} files in the time window)")
+        if not same:
+            return False
+    finally:
+        for path in files:
+            os.unlink(path)
+        shutil.rmtree(tmp_dir)
+    return True
+
+
+def read_lines(fh) -> int:
+    """Iterate a log file like LogParser.parse_file, up to the line pre-filter"""
+    count = 0
+    try:
+        for raw in fh:
+            if b'postfix' not in raw and b'amavis' not in raw:
+                continue
+            count += 1
+    finally:
+        fh.close()
+    return count
+
+
+def bench_compressed(module, log_path: str, repeat: int):
+    """Read and parse the log as .gz and .bz2: gzip/bz2 module against open_log_file()"""
+    for suffix, opener, compress in (('.gz', gzip.open, gzip.open), ('.bz2', bz2.open, bz2.open)):
+        compressed_path = log_path + suffix
+        start = time.perf_counter()
+        with open(log_path, 'rb') as src, compress(compressed_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        print(f"{suffix}: compressed to {os.path.getsize(compressed_path) / 1048576:.1f} MB "
+              f"in {time.perf_counter() - start:.1f} s")
+        tool = next((t for t in module.DECOMPRESS_TOOLS[suffix] if shutil.which(t)), None)
+        try:
+            methods = [
+                ('module', lambda: opener(compressed_path, 'rb')),
+                ('thread', lambda: module.open_log_file(compressed_path, external=False)),
+            ]
+            if tool:
+                methods.append((tool, lambda: module.open_log_file(compressed_path)))
+            counts = set()
+            base = None
+            for name, open_file in methods:
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    counts.add(read_lines(open_file()))
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                base = base or best
+                print(f"  read {name + ':':8s} {best:8.2f} s  x{base / best:.2f}")
+            if len(counts) != 1:
+                print("ERROR: decompressors read different lines", file=sys.stderr)
+                sys.exit(1)
+            parse_time, parser = bench_parse(module, compressed_path, repeat)
+            print(f"  parse:         {parse_time:8.2f} s  ({len(parser.messages):,} messages)")
+        finally:
+            os.unlink(compressed_path)
+
+
+# Run in a fresh interpreter: RSS rarely shrinks after a previous parse is freed
+MEMORY_PROBE = """
+import gc, importlib.util, json, os, resource, sys
+def rss():
+    with open('/proc/self/statm') as fh:
+        return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+spec = importlib.util.spec_from_file_location('jt_zmmsgtrace_probe', sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+gc.collect()
+before = rss()
+parser = module.LogParser(%d)
+parser.parse_file(sys.argv[2])
+parser.integrate_amavis_data()
+gc.collect()
+print(json.dumps({'rss': rss() - before, 'messages': len(parser.messages),
+                  'peak': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}))
+""" % YEAR
+
+
+def measure_memory(module_path: str, log_path: str):
+    """
+    RSS growth per message and peak RSS (bytes) of a parse in a separate
+    process; (None, None) where /proc is not available
+    """
+    if not os.path.exists('/proc/self/statm'):
+        return None, None
+    result = subprocess.run([sys.executable, '-c', MEMORY_PROBE, module_path, log_path],
+                            stdout=subprocess.PIPE, check=True)
+    data = json.loads(result.stdout.decode())
+    return data['rss'] / max(data['messages'], 1), data['peak']
+
+
+def run(name: str, module, module_path: str, log_path: str, lines: int, repeat: int) -> dict:
+    parse_time, parser = bench_parse(module, log_path, repeat)
+    filter_time, hits, total = bench_filter(module, parser, repeat)
+    index_time, searches = bench_search(module, parser, repeat)
+    digest = TraceDigest(module, parser)
+    message_count = len(parser.messages)
+    amavis_count = len(parser.amavis_records)
+    del parser
+    per_message, peak = measure_memory(module_path, log_path)
+    print(f"{name}:")
+    print(f"  parse:  {parse_time:8.2f} s  {lines / parse_time:12,.0f} lines/s  "
+          f"({message_count:,} messages, {amavis_count:,} amavis records)")
+    print(f"  filter: {filter_time:8.2f} s  {total / filter_time:12,.0f} messages/s  ({hits:,} matches)")
+    if index_time is not None:
+        print(f"  index:  {index_time:8.2f} s")
+    for search, (elapsed, found) in searches.items():
+        print(f"  search {search + ':':17s} {elapsed * 1000:9.2f} ms  ({len(found):,} matches)")
+    if per_message is not None:
+        print(f"  memory: {per_message:8.0f} bytes per message, peak RSS {peak / 1048576:.0f} MB")
+    print(f"  traces: {digest.traces:,} ({digest.hexdigest[:16]})")
+    return {
+        'parse': parse_time,
+        'filter': filter_time,
+        'memory': per_message,
+        'messages': message_count,
+        'queues': total,
+        'hits': hits,
+        'searches': {search: found for search, (_, found) in searches.items()},
+        'digest': digest,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Micro-benchmark for the jt_zmmsgtrace log parser')
+    arg_parser.add_argument('--lines', type=int, default=DEFAULT_LINES,
+                            help=f'Number of synthetic log lines (default: {DEFAULT_LINES})')
+    arg_parser.add_argument('--seed', type=int, default=1, help='Random seed for the generator (default: 1)')
+    arg_parser.add_argument('--log', help='Write the synthetic log to this file and keep it '
+                                          '(reused as is if it already exists)')
+    arg_parser.add_argument('--baseline', help='Another jt_zmmsgtrace.py to compare against')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, best is reported (default: 3)')
+    arg_parser.add_argument('--compressed', action='store_true',
+                            help='Also measure reading the log as .gz and .bz2 (rotated logs)')
+    arg_parser.add_argument('--check', action='store_true',
+                            help='Also check that a parallel parse and the parse index of the log cut into '
+                                 'rotated files give the same traces as a sequential parse')
+    args = arg_parser.parse_args()
+
+    current_path = str(Path(__file__).resolve().parent / 'jt_zmmsgtrace.py')
+    current = load_module(current_path, 'jt_zmmsgtrace')
+    baseline = load_module(args.baseline, 'jt_zmmsgtrace_baseline') if args.baseline else None
+
+    log_path = args.log
+    cleanup = False
+    if not log_path:
+        fd, log_path = tempfile.mkstemp(prefix='jt_zmmsgtrace_bench_', suffix='.log')
+        os.close(fd)
+        cleanup = True
+    try:
+        if cleanup or not os.path.exists(log_path):
+            start = time.perf_counter()
+            lines = generate_log(log_path, args.lines, args.seed)
+            print(f"Generated {lines:,} lines ({os.path.getsize(log_path) / 1048576:.1f} MB) "
+                  f"in {time.perf_counter() - start:.1f} s: {log_path}")
+        else:
+            with open(log_path, 'rb') as fh:
+                lines = sum(1 for _ in fh)
+            print(f"Using {log_path} ({lines:,} lines)")
+
+        result = run('current', current, current_path, log_path, lines, args.repeat)
+        if baseline:
+            base = run('baseline', baseline, args.baseline, log_path, lines, args.repeat)
+            print(f"speedup: parse x{base['parse'] / result['parse']:.2f}, "
+                  f"filter x{base['filter'] / result['filter']:.2f}")
+            if base['memory'] and result['memory']:
+                print(f"memory: x{result['memory'] / base['memory']:.2f} of the baseline")
+            if (base['messages'], base['queues'], base['hits']) != (result['messages'], result['queues'], result['hits']):
+                print("ERROR: results differ from the baseline", file=sys.stderr)
+                sys.exit(1)
+            if base['digest'] != result['digest']:
+                print("ERROR: message traces differ from the baseline", file=sys.stderr)
+                sys.exit(1)
+            for search, found in base['searches'].items():
+                if search in result['searches'] and result['searches'][search] != found:
+                    print(f"ERROR: search '{search}' differs from the baseline", file=sys.stderr)
+                    sys.exit(1)
+        if args.check:
+            print("check:")
+            if not check_traces(current, log_path):
+                print("ERROR: the rotated files or the index differ from the sequential parse", file=sys.stderr)
+                sys.exit(1)
+        if args.compressed:
+            bench_compressed(current, log_path, args.repeat)
+    finally:
+        if cleanup:
+            os.unlink(log_path)
+
+
+if __name__ == '__main__':
+    main()